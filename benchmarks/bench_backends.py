@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+执行后端基准测试
+
+在由多个互不依赖的CPU密集型节点组成的宽DAG上，对比 inline、thread 和
+process 三种执行后端的墙钟耗时。线程后端受GIL限制，进程后端在多核机器上
+应接近线性加速。
+
+运行方式:
+    python benchmarks/bench_backends.py [节点数] [每节点迭代次数]
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutor
+from src.dag.pool import WorkerPool
+
+
+def cpu_task(n):
+    """纯Python的CPU密集型任务"""
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+
+def merge(**partials):
+    return sum(partials.values())
+
+
+def build_fan_in(width, iterations):
+    """width个CPU密集型节点汇聚到一个合并节点"""
+    dag = DAG()
+    dag.add_node("merge", data={'func': merge, 'backend': 'inline'})
+    for i in range(width):
+        dag.add_node(f"cpu{i}", data={'func': cpu_task, 'args': (iterations,)})
+        dag.add_edge(f"cpu{i}", "merge")
+    return dag
+
+
+def measure(backend, width, iterations, pool):
+    dag = build_fan_in(width, iterations)
+    executor = DAGExecutor(dag, pool=pool, backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        executor.execute(parallel=True)
+        return time.perf_counter() - start
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+    cpus = os.cpu_count() or 1
+    
+    with WorkerPool(max_workers=width, max_processes=cpus) as pool:
+        # 预热进程池，排除进程启动开销
+        pool.submit_process(cpu_task, 1).result()
+        
+        baseline = measure('inline', width, iterations, pool)
+        print(f"CPU数: {cpus}, 节点数: {width}, 每节点迭代: {iterations}")
+        print(f"{'后端':<10}{'耗时(秒)':>10}{'加速比':>10}")
+        for backend in ('inline', 'thread', 'process'):
+            elapsed = baseline if backend == 'inline' else measure(backend, width, iterations, pool)
+            print(f"{backend:<10}{elapsed:>10.3f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+批量请求基准测试
+
+对比逐个调用 AIAgent.process_request 与一次调用 AIAgent.process_batch
+（所有请求合并为一个共享DAG）处理同一批请求的总耗时。任务模板中的 delay
+按比例缩小，以便快速运行。
+
+运行方式:
+    python benchmarks/bench_batch.py
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agent.agent import AIAgent
+from src.agent.tasks import TaskLibrary
+from src.dag import events
+
+DELAY_SCALE = 0.02
+REQUEST_TYPES = ['analyze_data', 'send_report']
+
+
+def scale_default_template(scale):
+    """按比例缩小默认模板中所有任务的 delay"""
+    template = TaskLibrary.templates.thaw('default')
+    for config in template.values():
+        config['delay'] = config.get('delay', 1) * scale
+    TaskLibrary.register_template('default', template)
+
+
+def make_requests(count):
+    return [
+        {'type': REQUEST_TYPES[i % len(REQUEST_TYPES)], 'params': {'query': f"查询{i}"}}
+        for i in range(count)
+    ]
+
+
+def measure(count, workers):
+    agent = AIAgent(max_workers=workers, pool_limits={'io': workers, 'cpu': workers})
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for request in make_requests(count):
+                agent.process_request(request)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            agent.process_batch(make_requests(count))
+            batched = time.perf_counter() - start
+    finally:
+        agent.shutdown()
+    return sequential, batched
+
+
+def main():
+    events.set_level('silent')
+    scale_default_template(DELAY_SCALE)
+
+    print(f"{'请求数':>8}{'线程数':>8}{'逐个(秒)':>12}{'批量(秒)':>12}{'加速比':>10}")
+    for count, workers in [(10, 4), (10, 16), (50, 16), (50, 64)]:
+        sequential, batched = measure(count, workers)
+        print(f"{count:>8}{workers:>8}{sequential:>12.3f}{batched:>12.3f}{sequential / batched:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+DAG构建基准测试
+
+对比三种方式构建随机DAG的耗时：
+- 旧版环检测：每次 add_edge 复制边列表并从所有节点做全图DFS
+- 增量环检测：每次 add_edge 只从目标节点搜索能否到达源节点
+- 批量模式：dag.bulk() 中跳过逐条检测，结束时统一校验一次
+
+运行方式:
+    python benchmarks/bench_build.py
+"""
+
+import sys
+import os
+import random
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dag.dag import DAG
+from src.dag.edge import Edge
+
+EDGES_PER_NODE = 3
+
+
+class LegacyDAG(DAG):
+    """
+    使用旧版全图环检测的DAG
+    """
+    
+    def _would_cause_cycle(self, source_id, target_id):
+        temp_edges = list(self.edges)
+        temp_edges.append(Edge(source_id, target_id))
+        visited = set()
+        recursion_stack = set()
+        
+        def has_cycle(node_id):
+            if node_id not in visited:
+                visited.add(node_id)
+                recursion_stack.add(node_id)
+                for neighbor in [edge.target for edge in temp_edges if edge.source == node_id]:
+                    if neighbor not in visited:
+                        if has_cycle(neighbor):
+                            return True
+                    elif neighbor in recursion_stack:
+                        return True
+            recursion_stack.discard(node_id)
+            return False
+        
+        return any(has_cycle(node_id) for node_id in self.nodes)
+
+
+def random_edges(num_nodes, seed=0):
+    rng = random.Random(seed)
+    return [
+        (f"n{j}", f"n{i}")
+        for i in range(1, num_nodes)
+        for j in sorted({rng.randrange(i) for _ in range(EDGES_PER_NODE)})
+    ]
+
+
+def build(dag_cls, num_nodes, edges, bulk=False):
+    start = time.perf_counter()
+    dag = dag_cls()
+    for i in range(num_nodes):
+        dag.add_node(f"n{i}")
+    if bulk:
+        with dag.bulk():
+            for source, target in edges:
+                dag.add_edge(source, target)
+    else:
+        for source, target in edges:
+            dag.add_edge(source, target)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'节点数':>8}{'边数':>10}{'旧版(秒)':>12}{'增量(秒)':>12}{'批量(秒)':>12}")
+    for num_nodes in (200, 1000, 10000, 50000):
+        edges = random_edges(num_nodes)
+        legacy = f"{build(LegacyDAG, num_nodes, edges):.3f}" if num_nodes <= 200 else "-"
+        incremental = build(DAG, num_nodes, edges)
+        bulk = build(DAG, num_nodes, edges, bulk=True)
+        print(f"{num_nodes:>8}{len(edges):>10}{legacy:>12}{incremental:>12.3f}{bulk:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
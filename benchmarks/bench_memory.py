@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+图内存占用基准测试
+
+使用 tracemalloc 分别测量 DAG（__slots__ 的 Node/Edge + 邻接集合）和
+CompactDAG（整数下标 + array 缓冲区 + CSR 索引）每个节点和每条边占用的字节数。
+
+运行方式:
+    python benchmarks/bench_memory.py [节点数]
+"""
+
+import sys
+import os
+import gc
+import random
+import tracemalloc
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dag.dag import DAG
+from src.dag.compact import CompactDAG
+
+EDGES_PER_NODE = 4
+
+
+def random_edges(node_ids, seed=0):
+    rng = random.Random(seed)
+    return [
+        (node_ids[j], node_ids[i])
+        for i in range(1, len(node_ids))
+        for j in sorted({rng.randrange(i) for _ in range(EDGES_PER_NODE)})
+    ]
+
+
+def measure(graph_cls, node_ids, edges):
+    """
+    返回 (每节点字节数, 每条边字节数)，节点ID字符串本身不计入
+    """
+    gc.collect()
+    tracemalloc.start()
+    graph = graph_cls()
+    
+    base = tracemalloc.get_traced_memory()[0]
+    for node_id in node_ids:
+        graph.add_node(node_id)
+    after_nodes = tracemalloc.get_traced_memory()[0]
+    
+    if isinstance(graph, DAG):
+        with graph.bulk():
+            for source, target in edges:
+                graph.add_edge(source, target)
+    else:
+        for source, target in edges:
+            graph.add_edge(source, target)
+        # 包含按需构建的CSR索引
+        graph.get_roots()
+    after_edges = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    return (after_nodes - base) / len(node_ids), (after_edges - after_nodes) / len(edges)
+
+
+def main():
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    node_ids = [f"n{i}" for i in range(num_nodes)]
+    edges = random_edges(node_ids)
+    
+    print(f"节点数: {num_nodes}, 边数: {len(edges)}")
+    print(f"{'表示':<12}{'字节/节点':>12}{'字节/边':>12}")
+    for graph_cls in (DAG, CompactDAG):
+        per_node, per_edge = measure(graph_cls, node_ids, edges)
+        print(f"{graph_cls.__name__:<12}{per_node:>12.1f}{per_edge:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+并行调度器基准测试
+
+对比事件驱动的就绪队列调度器与旧版轮询调度器（time.sleep(0.1) 忙等）
+在关键路径上的墙钟耗时。
+
+运行方式:
+    python benchmarks/bench_scheduler.py
+"""
+
+import sys
+import os
+import io
+import time
+import threading
+import contextlib
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dag import events
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutor
+
+TASK_DELAY = 0.01
+
+
+class PollingDAGExecutor(DAGExecutor):
+    """
+    旧版并行执行器：按拓扑顺序逐个轮询等待依赖完成后再启动节点
+    """
+    
+    def _execute_parallel(self, topological_order):
+        threads = []
+        for node_id in topological_order:
+            for dep_id in self.dag.get_predecessors(node_id):
+                while dep_id not in self.results:
+                    time.sleep(0.1)
+            thread = threading.Thread(target=self._run_node, args=(node_id,))
+            threads.append(thread)
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.results
+    
+    def _run_node(self, node_id):
+        result = self._execute_node(node_id)
+        with self.lock:
+            self.results[node_id] = result
+
+
+def sleep_task(*args, **kwargs):
+    time.sleep(TASK_DELAY)
+    return TASK_DELAY
+
+
+def build_chain(length):
+    """构建一条长度为length的链"""
+    dag = DAG()
+    for i in range(length):
+        dag.add_node(f"n{i}", data={'func': sleep_task})
+        if i:
+            dag.add_edge(f"n{i - 1}", f"n{i}")
+    return dag, length
+
+
+def build_layers(width, depth):
+    """构建depth层、每层width个节点、相邻层全连接的DAG"""
+    dag = DAG()
+    for layer in range(depth):
+        for i in range(width):
+            dag.add_node(f"l{layer}_{i}", data={'func': sleep_task})
+            if layer:
+                for j in range(width):
+                    dag.add_edge(f"l{layer - 1}_{j}", f"l{layer}_{i}")
+    return dag, depth
+
+
+def build_uneven(branches, length):
+    """构建多条长度不同的并行分支：第k条分支长度为k+1"""
+    dag = DAG()
+    dag.add_node("root", data={'func': sleep_task})
+    for b in range(branches):
+        prev = "root"
+        for i in range(length * (b + 1) // branches):
+            node_id = f"b{b}_{i}"
+            dag.add_node(node_id, data={'func': sleep_task})
+            dag.add_edge(prev, node_id)
+            prev = node_id
+    return dag, 1 + length
+
+
+def measure(executor_cls, dag):
+    executor = executor_cls(dag, max_workers=64)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        executor.execute(parallel=True)
+        return time.perf_counter() - start
+
+
+def main():
+    events.set_level('silent')
+    cases = [
+        ("chain(20)", build_chain(20)),
+        ("layers(8x5)", build_layers(8, 5)),
+        ("uneven(6x12)", build_uneven(6, 12)),
+    ]
+    print(f"{'DAG':<16}{'关键路径下限':>12}{'轮询(秒)':>12}{'事件驱动(秒)':>14}{'加速比':>10}")
+    for name, (dag, critical_path) in cases:
+        lower_bound = critical_path * TASK_DELAY
+        polling = measure(PollingDAGExecutor, dag)
+        event_driven = measure(DAGExecutor, dag)
+        print(f"{name:<16}{lower_bound:>12.3f}{polling:>12.3f}{event_driven:>14.3f}{polling / event_driven:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+拓扑排序扩展性基准测试
+
+在10k~100k节点的随机DAG上测量 DAG.topological_sort 的耗时，
+每节点耗时应基本保持不变（线性复杂度）。DAG会缓存FIFO拓扑顺序，
+每次计时前清除缓存，测量的是实际排序而不是缓存命中。
+
+运行方式:
+    python benchmarks/bench_topological_sort.py
+"""
+
+import sys
+import os
+import random
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dag.dag import DAG
+
+EDGES_PER_NODE = 3
+
+
+def build_random_dag(num_nodes, seed=0):
+    """
+    构建随机DAG：每个节点最多连接到EDGES_PER_NODE个编号更小的节点，保证无环
+    """
+    rng = random.Random(seed)
+    dag = DAG()
+    for i in range(num_nodes):
+        dag.add_node(f"n{i}")
+    with dag.bulk():
+        for i in range(1, num_nodes):
+            for j in {rng.randrange(i) for _ in range(EDGES_PER_NODE)}:
+                dag.add_edge(f"n{j}", f"n{i}")
+    return dag
+
+
+def uncached_sort(dag, priority=None):
+    """
+    清除DAG缓存的拓扑顺序后排序
+    """
+    dag._order = None
+    return dag.topological_sort(priority=priority)
+
+
+def measure(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'节点数':>8}{'边数':>10}{'FIFO(毫秒)':>12}{'优先级(毫秒)':>14}{'微秒/(V+E)':>12}")
+    for num_nodes in (10000, 25000, 50000, 100000):
+        dag = build_random_dag(num_nodes)
+        num_edges = len(dag.edges)
+        priority = {node_id: hash(node_id) % 100 for node_id in dag.nodes}
+        fifo = measure(lambda: uncached_sort(dag))
+        prioritized = measure(lambda: uncached_sort(dag, priority))
+        per_element = fifo / (num_nodes + num_edges) * 1e6
+        print(f"{num_nodes:>8}{num_edges:>10}{fifo * 1000:>12.1f}{prioritized * 1000:>14.1f}{per_element:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
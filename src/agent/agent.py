@@ -1,9 +1,16 @@
 import time
+from ..dag.blueprint import Blueprint, Param
 from ..dag.dag import DAG
 from ..dag.executor import DAGExecutor
-from ..dag.visualizer import DAGVisualizer
+from ..dag.optimizer import eliminate_common_subexpressions
+from ..dag.pool import WorkerPool
+from ..dag.scheduling import DurationHistory
+from ..dag.trace import ExecutionTrace
 from .tasks import TaskLibrary
 
+# 批量处理时请求序号与节点ID之间的分隔符
+BATCH_SEPARATOR = '/'
+
 class AIAgent:
     """
     AI Agent核心类，负责接收用户请求，构建DAG，并执行任务
@@ -11,19 +18,46 @@ class AIAgent:
     Attributes:
         name (str): Agent名称
         task_library (TaskLibrary): 任务库对象
+        worker_pool (WorkerPool): 在所有请求间复用的工作线程池
+        cpu_backend (str): CPU密集型节点（清洗、分析）使用的执行后端
+        cache (MemoryCache or DiskCache): 在所有请求间共享的节点结果缓存
+        duration_history (DurationHistory): 在所有请求间累积的节点执行耗时，用于关键路径调度
+    
+    每种请求的DAG结构只在第一次使用时编译成蓝图（Blueprint），之后的请求只绑定参数。
     """
     
-    def __init__(self, name="DAG AI Agent"):
+    def __init__(self, name="DAG AI Agent", max_workers=None, pool_limits=None, cpu_backend='thread', max_processes=None, cache=None):
         """
         初始化AI Agent
         
         Args:
             name (str, optional): Agent名称，默认"DAG AI Agent"
+            max_workers (int, optional): 工作线程池的最大线程数
+            pool_limits (dict, optional): 子池并发上限，例如 {'io': 32, 'cpu': 4}
+            cpu_backend (str, optional): CPU密集型节点的执行后端 (thread, process, inline)，默认'thread'
+            max_processes (int, optional): 进程池的最大进程数，默认CPU数
+            cache (MemoryCache or DiskCache, optional): 节点结果缓存，相同参数的重复请求直接复用结果，默认None
         """
         self.name = name
         self.task_library = TaskLibrary()
+        self.cpu_backend = cpu_backend
+        self.cache = cache
+        self.duration_history = DurationHistory()
+        self._last_executors = {}  # 请求类型 -> 上一次使用的执行器，用于增量执行
+        self._blueprints = {}  # (请求类型, 模板名称) -> 已编译的蓝图
+        self._blueprint_version = TaskLibrary.templates.version
+        self.worker_pool = WorkerPool(max_workers=max_workers, limits=pool_limits, max_processes=max_processes)
+    
+    def shutdown(self, wait=True):
+        """
+        关闭Agent持有的工作线程池和进程池
+        
+        Args:
+            wait (bool, optional): 是否等待正在执行的任务完成，默认True
+        """
+        self.worker_pool.shutdown(wait=wait)
     
-    def process_request(self, request, parallel=True, visualize=False, visualize_filename=None, save_report=False, report_output_dir=None):
+    def process_request(self, request, parallel=True, visualize=False, visualize_filename=None, save_report=False, report_output_dir=None, incremental=False, trace_filename=None):
         """
         处理用户请求
         
@@ -34,6 +68,10 @@ class AIAgent:
             visualize_filename (str, optional): 可视化文件名，默认None
             save_report (bool, optional): 是否保存报告到文件，默认False
             report_output_dir (str, optional): 报告输出目录，默认None
+            incremental (bool, optional): 是否基于同类型上一次请求的结果增量执行，
+                只重新执行参数发生变化的节点及其下游节点，默认False
+            trace_filename (str, optional): 节点级执行追踪的输出路径（Chrome Trace Event JSON，
+                可在Perfetto中打开），默认None不追踪
         
         Returns:
             dict: 处理结果
@@ -49,21 +87,33 @@ class AIAgent:
         params['report_output_dir'] = report_output_dir
         
         # 根据请求类型构建DAG
-        if request_type == 'analyze_data':
-            dag, final_node_id = self._build_analyze_data_dag(params)
-        elif request_type == 'send_report':
-            dag, final_node_id = self._build_send_report_dag(params)
-        elif request_type == 'learn_agent_architecture':
-            dag, final_node_id = self._build_learn_architecture_dag(params)
+        dag, final_node_id = self._build_dag(request_type, params)
+        
+        # 执行DAG（增量执行时复用上一次的执行器及其结果）
+        executor = self._last_executors.get(request_type) if incremental else None
+        if executor is None:
+            executor = DAGExecutor(
+                dag,
+                pool=self.worker_pool,
+                cache=self.cache,
+                scheduling='critical_path',
+                history=self.duration_history
+            )
         else:
-            raise ValueError(f"不支持的请求类型: {request_type}")
+            executor.dag = dag
+        executor.trace = ExecutionTrace() if trace_filename else None
+        results = dict(executor.execute(parallel=parallel, incremental=incremental))
+        self._last_executors[request_type] = executor
         
-        # 执行DAG
-        executor = DAGExecutor(dag)
-        results = executor.execute(parallel=parallel)
+        # 导出执行追踪
+        if trace_filename:
+            trace_path = executor.trace.export_chrome_trace(trace_filename)
+            print(f"执行追踪已保存到: {trace_path}")
         
         # 可视化DAG
         if visualize:
+            # graphviz 是可选依赖，只在需要可视化时导入
+            from ..dag.visualizer import DAGVisualizer
             filename = visualize_filename or f"{request_type}_{int(time.time())}"
             visualization_path = DAGVisualizer.visualize_with_results(
                 dag, 
@@ -80,181 +130,388 @@ class AIAgent:
             'final_result': final_result
         }
     
-    def _build_analyze_data_dag(self, params):
+    def process_batch(self, requests, parallel=True, save_report=False, report_output_dir=None, dedupe=True):
         """
-        构建数据分析请求的DAG
+        批量处理用户请求：所有请求的节点合并到一个共享DAG中（节点ID加上请求序号前缀），
+        由一个执行器在共享的工作线程池上一次执行，吞吐量随工作线程数扩展
+        
+        单个请求失败时只跳过该请求的后续节点，不影响其他请求。开启 dedupe 时，不同请求中
+        结构完全相同的节点（例如相同 query 的数据收集、清洗和分析链）只执行一次。
         
         Args:
-            params (dict): 请求参数，包含query等
+            requests (list): 用户请求列表，格式与 process_request 相同
+            parallel (bool, optional): 是否并行执行任务，默认True
+            save_report (bool, optional): 是否保存报告到文件，默认False
+            report_output_dir (str, optional): 报告输出目录，默认None
+            dedupe (bool, optional): 是否合并重复节点（公共子表达式消除），默认True
         
         Returns:
-            tuple: (DAG对象, 最终节点ID)
+            list: 与 requests 顺序一致的处理结果，每项包含 request、results（节点ID不带前缀）、
+                final_result 和 errors（失败节点的错误信息，成功时为空字典）
+        
+        Raises:
+            ValueError: 存在不支持的请求类型
         """
-        query = params.get('query', '示例查询')
+        requests = list(requests)
+        print(f"\n{self.name} 接收到 {len(requests)} 个批量请求")
         
-        # 创建DAG
         dag = DAG()
+        final_node_ids = []
+        # 蓝图已校验无环，各请求的节点互不相连，退出时无需再整体校验
+        with dag.bulk(validate=False):
+            for index, request in enumerate(requests):
+                params = dict(request.get('params', {}))
+                params['save_report'] = save_report
+                params['report_output_dir'] = report_output_dir
+                _, final_node_id = self._build_dag(
+                    request.get('type', 'analyze_data'), params, dag, prefix=f"{index}{BATCH_SEPARATOR}"
+                )
+                final_node_ids.append(final_node_id)
+        
+        # 带前缀的同类节点共享同一份历史耗时
+        for node_id, node in dag.nodes.items():
+            node.data.setdefault('history_key', node_id.partition(BATCH_SEPARATOR)[2])
+        
+        aliases = eliminate_common_subexpressions(dag) if dedupe else {}
+        if aliases:
+            print(f"合并了 {len(aliases)} 个重复节点")
+        
+        executor = DAGExecutor(
+            dag,
+            pool=self.worker_pool,
+            cache=self.cache,
+            scheduling='critical_path',
+            history=self.duration_history,
+            failure_policy='skip_descendants'
+        )
+        results = executor.execute(parallel=parallel)
+        failed = dict(executor.report['failed'])
+        
+        # 被合并的节点共享保留节点的结果和错误
+        for node_id, kept_id in aliases.items():
+            if kept_id in results:
+                results[node_id] = results[kept_id]
+            if kept_id in failed:
+                failed[node_id] = failed[kept_id]
+        
+        # 按请求序号拆分结果
+        outputs = [
+            {'request': request, 'results': {}, 'final_result': None, 'errors': {}}
+            for request in requests
+        ]
+        for node_id, result in results.items():
+            index, _, local_id = node_id.partition(BATCH_SEPARATOR)
+            outputs[int(index)]['results'][local_id] = result
+        for node_id, error in failed.items():
+            index, _, local_id = node_id.partition(BATCH_SEPARATOR)
+            outputs[int(index)]['errors'][local_id] = error
+        for output, final_node_id in zip(outputs, final_node_ids):
+            output['final_result'] = results.get(final_node_id)
+        
+        return outputs
+    
+    def _build_dag(self, request_type, params, dag=None, prefix=''):
+        """
+        根据请求类型构建DAG：从编译好的蓝图实例化，只绑定请求参数
+        
+        Args:
+            request_type (str): 请求类型
+            params (dict): 请求参数
+            dag (DAG, optional): 要添加节点的DAG，默认创建新的DAG
+            prefix (str, optional): 节点ID前缀
+        
+        Returns:
+            tuple: (DAG对象, 最终节点ID)
+        
+        Raises:
+            ValueError: 不支持的请求类型
+        """
+        blueprint = self._get_blueprint(request_type, params.get('template_name', 'default'))
+        dag = blueprint.instantiate(params, dag, prefix)
+        return dag, f"{prefix}{blueprint.output}"
+    
+    def _get_blueprint(self, request_type, template_name='default'):
+        """
+        获取请求类型的DAG蓝图，每种 (请求类型, 模板) 只编译一次
+        
+        内置请求类型之外的类型按名称查找模板文件中声明的工作流（TaskLibrary.get_workflow）。
+        蓝图中的预估耗时和超时重试设置来自任务模板，模板被修改后
+        （TaskLibrary.templates.version 变化）已编译的蓝图全部失效并按需重新编译。
+        
+        Args:
+            request_type (str): 请求类型
+            template_name (str, optional): 模板名称，默认'default'
+        
+        Returns:
+            Blueprint: 已编译的蓝图
+        
+        Raises:
+            ValueError: 不支持的请求类型
+        """
+        if self._blueprint_version != TaskLibrary.templates.version:
+            self._blueprints = {}
+            self._blueprint_version = TaskLibrary.templates.version
+        
+        key = (request_type, template_name)
+        blueprint = self._blueprints.get(key)
+        if blueprint is None:
+            # 数据分析和发送报告的任务不读取模板，模板只提供预估耗时和超时重试设置，
+            # 未知模板沿用default模板（与 get_task_config 一致），不拒绝请求
+            settings_template = template_name if template_name in TaskLibrary.templates else 'default'
+            if request_type == 'analyze_data':
+                blueprint = self._analyze_data_blueprint(settings_template)
+            elif request_type == 'send_report':
+                blueprint = self._send_report_blueprint(settings_template)
+            elif request_type == 'learn_agent_architecture':
+                blueprint = self._learn_architecture_blueprint(template_name)
+            else:
+                # 模板文件中声明的工作流在加载时已经编译
+                blueprint = self.task_library.get_workflow(request_type, template_name)
+                if blueprint is None:
+                    raise ValueError(f"不支持的请求类型: {request_type}")
+            self._blueprints[key] = blueprint.compile()
+        return blueprint
+    
+    def _estimate_duration(self, task_name, template_name='default'):
+        """
+        根据任务模板中的 delay 估计任务耗时，作为没有历史耗时时的关键路径调度依据
+        
+        Args:
+            task_name (str): 任务名称
+            template_name (str, optional): 模板名称，默认'default'
+        
+        Returns:
+            float: 估计耗时（秒）
+        """
+        return self.task_library.get_resolved_config(task_name, template_name).delay
+    
+    def _retry_settings(self, task_name, template_name='default'):
+        """
+        从任务模板中读取节点的超时与重试默认值（timeout、retries、backoff等）
+        
+        Args:
+            task_name (str): 任务名称
+            template_name (str, optional): 模板名称，默认'default'
+        
+        Returns:
+            dict: 模板中设置了的超时与重试项
+        """
+        return self.task_library.get_resolved_config(task_name, template_name).retry_settings()
+    
+    def _analyze_data_blueprint(self, template_name='default'):
+        """
+        编译数据分析请求的DAG蓝图
+        
+        Args:
+            template_name (str, optional): 模板名称，决定预估耗时和超时重试设置
+        
+        Returns:
+            Blueprint: 蓝图，实例化参数为 query、save_report 和 report_output_dir
+        """
+        blueprint = Blueprint('analyze_data', output='generate_report')
         
         # 添加节点
-        collect_node = dag.add_node(
-            'collect_data',
+        blueprint.add_node(
+            "collect_data",
             data={
                 'func': self.task_library.collect_data,
-                'args': (query,)
+                'estimated_duration': self._estimate_duration('collect_data', template_name),
+                **self._retry_settings('collect_data', template_name),
+                'pool': 'io',
+                'args': (Param('query', '示例查询'),)
             }
         )
         
-        clean_node = dag.add_node(
-            'clean_data',
+        blueprint.add_node(
+            "clean_data",
             data={
                 'func': self.task_library.clean_data,
+                'estimated_duration': self._estimate_duration('clean_data', template_name),
+                **self._retry_settings('clean_data', template_name),
+                'pool': 'cpu',
+                'backend': self.cpu_backend,
                 'args': (None,)  # 将在执行时从依赖节点获取
             }
         )
         
-        analyze_node = dag.add_node(
-            'analyze_data',
+        blueprint.add_node(
+            "analyze_data",
             data={
                 'func': self.task_library.analyze_data,
+                'estimated_duration': self._estimate_duration('analyze_data', template_name),
+                **self._retry_settings('analyze_data', template_name),
+                'pool': 'cpu',
+                'backend': self.cpu_backend,
                 'args': (None,)  # 将在执行时从依赖节点获取
             }
         )
         
-        report_node = dag.add_node(
-            'generate_report',
+        blueprint.add_node(
+            "generate_report",
             data={
                 'func': self.task_library.generate_report,
+                'cse': False,  # 可能写入报告文件，批量去重时不合并
+                'cache': False,  # 可能写入报告文件，不能从结果缓存中返回
+                'estimated_duration': self._estimate_duration('generate_report', template_name),
+                **self._retry_settings('generate_report', template_name),
+                'pool': 'io',
                 'args': (None,),  # 将在执行时从依赖节点获取
                 'kwargs': {
-                    'save_to_file': params.get('save_report', None),
-                    'output_dir': params.get('report_output_dir', None)
+                    'save_to_file': Param('save_report', None),
+                    'output_dir': Param('report_output_dir', None)
                 }
             }
         )
         
         # 添加边（依赖关系）
-        dag.add_edge('collect_data', 'clean_data')
-        dag.add_edge('clean_data', 'analyze_data')
-        dag.add_edge('analyze_data', 'generate_report')
+        blueprint.add_edge("collect_data", "clean_data")
+        blueprint.add_edge("clean_data", "analyze_data")
+        blueprint.add_edge("analyze_data", "generate_report")
         
-        return dag, 'generate_report'
+        return blueprint
     
-    def _build_send_report_dag(self, params):
+    def _send_report_blueprint(self, template_name='default'):
         """
-        构建发送报告请求的DAG
+        编译发送报告请求的DAG蓝图
         
         Args:
-            params (dict): 请求参数，包含query和recipient等
+            template_name (str, optional): 模板名称，决定预估耗时和超时重试设置
         
         Returns:
-            tuple: (DAG对象, 最终节点ID)
+            Blueprint: 蓝图，实例化参数为 query、recipient、save_report 和 report_output_dir
         """
-        query = params.get('query', '示例查询')
-        recipient = params.get('recipient', 'user@example.com')
-        
-        # 创建DAG
-        dag = DAG()
+        blueprint = Blueprint('send_report', output='send_email')
         
         # 添加节点
-        collect_node = dag.add_node(
-            'collect_data',
+        blueprint.add_node(
+            "collect_data",
             data={
                 'func': self.task_library.collect_data,
-                'args': (query,)
+                'estimated_duration': self._estimate_duration('collect_data', template_name),
+                **self._retry_settings('collect_data', template_name),
+                'pool': 'io',
+                'args': (Param('query', '示例查询'),)
             }
         )
         
-        clean_node = dag.add_node(
-            'clean_data',
+        blueprint.add_node(
+            "clean_data",
             data={
                 'func': self.task_library.clean_data,
+                'estimated_duration': self._estimate_duration('clean_data', template_name),
+                **self._retry_settings('clean_data', template_name),
+                'pool': 'cpu',
+                'backend': self.cpu_backend,
                 'args': (None,)  # 将在执行时从依赖节点获取
             }
         )
         
-        analyze_node = dag.add_node(
-            'analyze_data',
+        blueprint.add_node(
+            "analyze_data",
             data={
                 'func': self.task_library.analyze_data,
+                'estimated_duration': self._estimate_duration('analyze_data', template_name),
+                **self._retry_settings('analyze_data', template_name),
+                'pool': 'cpu',
+                'backend': self.cpu_backend,
                 'args': (None,)  # 将在执行时从依赖节点获取
             }
         )
         
-        report_node = dag.add_node(
-            'generate_report',
+        blueprint.add_node(
+            "generate_report",
             data={
                 'func': self.task_library.generate_report,
+                'cse': False,  # 可能写入报告文件，批量去重时不合并
+                'cache': False,  # 可能写入报告文件，不能从结果缓存中返回
+                'estimated_duration': self._estimate_duration('generate_report', template_name),
+                **self._retry_settings('generate_report', template_name),
+                'pool': 'io',
                 'args': (None,),  # 将在执行时从依赖节点获取
                 'kwargs': {
-                    'save_to_file': params.get('save_report', None),
-                    'output_dir': params.get('report_output_dir', None)
+                    'save_to_file': Param('save_report', None),
+                    'output_dir': Param('report_output_dir', None)
                 }
             }
         )
         
-        send_email_node = dag.add_node(
-            'send_email',
+        blueprint.add_node(
+            "send_email",
             data={
                 'func': self.task_library.send_email,
-                'args': (None, recipient)  # 将在执行时从依赖节点获取报告
+                'cse': False,  # 有外部副作用，批量去重时不合并
+                'cache': False,  # 有外部副作用，不能从结果缓存中返回
+                'estimated_duration': self._estimate_duration('send_email', template_name),
+                **self._retry_settings('send_email', template_name),
+                'pool': 'io',
+                'args': (None, Param('recipient', 'user@example.com'))  # 将在执行时从依赖节点获取报告
             }
         )
         
-        save_db_node = dag.add_node(
-            'save_to_database',
+        blueprint.add_node(
+            "save_to_database",
             data={
                 'func': self.task_library.save_to_database,
+                'cse': False,  # 有外部副作用，批量去重时不合并
+                'cache': False,  # 有外部副作用，不能从结果缓存中返回
+                'estimated_duration': self._estimate_duration('save_to_database', template_name),
+                **self._retry_settings('save_to_database', template_name),
+                'pool': 'io',
                 'args': (None, 'analysis_results')  # 将在执行时从依赖节点获取分析结果
             }
         )
         
         # 添加边（依赖关系）
-        dag.add_edge('collect_data', 'clean_data')
-        dag.add_edge('clean_data', 'analyze_data')
-        dag.add_edge('analyze_data', 'generate_report')
-        dag.add_edge('analyze_data', 'save_to_database')  # 分析结果可以并行保存到数据库
-        dag.add_edge('generate_report', 'send_email')  # 报告生成后发送邮件
+        blueprint.add_edge("collect_data", "clean_data")
+        blueprint.add_edge("clean_data", "analyze_data")
+        blueprint.add_edge("analyze_data", "generate_report")
+        blueprint.add_edge("analyze_data", "save_to_database")  # 分析结果可以并行保存到数据库
+        blueprint.add_edge("generate_report", "send_email")  # 报告生成后发送邮件
         
-        return dag, 'send_email'
+        return blueprint
     
-    def _build_learn_architecture_dag(self, params):
+    def _learn_architecture_blueprint(self, template_name='default'):
         """
-        构建学习AI Agent架构知识的DAG
+        编译学习AI Agent架构知识的DAG蓝图
         
         Args:
-            params (dict): 请求参数，包含topic和template_name等
+            template_name (str, optional): 模板名称，同时作为任务函数的模板参数
         
         Returns:
-            tuple: (DAG对象, 最终节点ID)
+            Blueprint: 蓝图，实例化参数为 topic、save_report 和 report_output_dir
         """
-        topic = params.get('topic', 'AI Agent架构')
-        template_name = params.get('template_name', 'default')
-        
-        # 创建DAG
-        dag = DAG()
+        blueprint = Blueprint('learn_agent_architecture', output='generate_report')
         
         # 添加节点
-        learn_node = dag.add_node(
-            'learn_agent_architecture',
+        blueprint.add_node(
+            "learn_agent_architecture",
             data={
                 'func': self.task_library.learn_agent_architecture,
-                'args': (topic, template_name)
+                'estimated_duration': self._estimate_duration('learn_agent_architecture', template_name),
+                **self._retry_settings('learn_agent_architecture', template_name),
+                'pool': 'io',
+                'args': (Param('topic', 'AI Agent架构'), template_name)
             }
         )
         
-        report_node = dag.add_node(
-            'generate_report',
+        blueprint.add_node(
+            "generate_report",
             data={
                 'func': self.task_library.generate_report,
+                'cse': False,  # 可能写入报告文件，批量去重时不合并
+                'cache': False,  # 可能写入报告文件，不能从结果缓存中返回
+                'estimated_duration': self._estimate_duration('generate_report', template_name),
+                **self._retry_settings('generate_report', template_name),
+                'pool': 'io',
                 'args': (None, template_name),  # 将在执行时从依赖节点获取
                 'kwargs': {
-                    'save_to_file': params.get('save_report', None),
-                    'output_dir': params.get('report_output_dir', None)
+                    'save_to_file': Param('save_report', None),
+                    'output_dir': Param('report_output_dir', None)
                 }
             }
         )
         
         # 添加边（依赖关系）
-        dag.add_edge('learn_agent_architecture', 'generate_report')
+        blueprint.add_edge("learn_agent_architecture", "generate_report")
         
-        return dag, 'generate_report'
\ No newline at end of file
+        return blueprint
@@ -0,0 +1,225 @@
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+def freeze(value):
+    """
+    将模板配置递归转换为不可变结构：字典转为只读映射，列表转为元组
+    
+    Args:
+        value (any): 模板配置
+    
+    Returns:
+        any: 不可变的配置
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    将不可变的模板配置递归转换回普通的字典和列表，用于保存为JSON或编辑后重新注册
+    
+    Args:
+        value (any): 不可变的配置
+    
+    Returns:
+        any: 可修改的配置副本
+    """
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class TemplateRegistry:
+    """
+    写时复制的模板注册表
+    
+    当前状态是一个 (版本号, 快照, 继承关系) 元组，快照是 模板名称 -> 只读模板 的只读映射，
+    继承关系是 模板名称 -> 父模板名称 的只读映射（只包含声明了 extends 的模板）。
+    读操作只读取一次当前状态再做字典查找，不加锁，也不会看到写到一半的模板；
+    写操作在写锁内基于当前快照构造新快照（未修改的模板直接共享），
+    然后一次性替换状态并递增版本号。已经取得的快照永远不会改变。
+    
+    Attributes:
+        version (int): 版本号，每次修改模板时递增，可用于失效依赖模板的缓存
+        snapshot (MappingProxyType): 当前快照
+        parents (MappingProxyType): 当前的继承关系
+        state (tuple): 一致的 (版本号, 快照, 继承关系)
+    """
+    
+    def __init__(self, templates=None, parents=None):
+        """
+        初始化模板注册表
+        
+        Args:
+            templates (dict, optional): 初始模板，模板名称 -> 模板配置
+            parents (dict, optional): 初始继承关系，模板名称 -> 父模板名称
+        """
+        self._write_lock = threading.Lock()
+        self._state = (0, freeze(templates or {}), freeze(parents or {}))
+    
+    @property
+    def version(self):
+        """
+        当前版本号
+        """
+        return self._state[0]
+    
+    @property
+    def snapshot(self):
+        """
+        当前快照，模板名称 -> 只读模板
+        """
+        return self._state[1]
+    
+    @property
+    def parents(self):
+        """
+        当前的继承关系，模板名称 -> 父模板名称
+        """
+        return self._state[2]
+    
+    @property
+    def state(self):
+        """
+        一致的 (版本号, 快照, 继承关系)，需要同时使用多项时应一次取出
+        """
+        return self._state
+    
+    def get(self, name, default=None):
+        """
+        获取模板（无锁读取）
+        
+        Args:
+            name (str): 模板名称
+            default (any, optional): 模板不存在时的返回值
+        
+        Returns:
+            MappingProxyType: 只读模板，任务名称 -> 任务配置
+        """
+        return self._state[1].get(name, default)
+    
+    def __contains__(self, name):
+        return name in self._state[1]
+    
+    def names(self):
+        """
+        获取所有模板名称
+        
+        Returns:
+            list: 模板名称列表
+        """
+        return list(self._state[1])
+    
+    def _commit(self, name, template, parent=None):
+        """
+        在写锁内以新模板替换（template 为None时删除）并发布新快照
+        
+        Args:
+            name (str): 模板名称
+            template (MappingProxyType): 已冻结的模板，None表示删除
+            parent (str, optional): 父模板名称，None表示不继承
+        """
+        version, snapshot, parents = self._state
+        templates = dict(snapshot)
+        parents = dict(parents)
+        if template is None:
+            del templates[name]
+        else:
+            templates[name] = template
+        if template is None or parent is None:
+            parents.pop(name, None)
+        else:
+            parents[name] = parent
+        self._state = (version + 1, MappingProxyType(templates), MappingProxyType(parents))
+    
+    def set(self, name, template, extends=None):
+        """
+        注册或替换模板
+        
+        Args:
+            name (str): 模板名称
+            template (dict): 模板配置，注册时复制并冻结，之后修改原字典不影响注册表
+            extends (str, optional): 父模板名称
+        """
+        frozen = freeze(template)
+        with self._write_lock:
+            self._commit(name, frozen, extends)
+    
+    def delete(self, name):
+        """
+        删除模板，被其他模板继承的模板不能删除
+        
+        Args:
+            name (str): 模板名称
+        
+        Returns:
+            bool: 模板存在、没有被继承并被删除时返回True
+        """
+        with self._write_lock:
+            if name not in self._state[1] or name in self._state[2].values():
+                return False
+            self._commit(name, None)
+            return True
+    
+    def copy(self, source_name, new_name):
+        """
+        复制模板，新旧模板共享同一份不可变配置和父模板
+        
+        Args:
+            source_name (str): 源模板名称
+            new_name (str): 新模板名称
+        
+        Returns:
+            bool: 源模板存在并复制成功时返回True
+        """
+        with self._write_lock:
+            template = self._state[1].get(source_name)
+            if template is None:
+                return False
+            self._commit(new_name, template, self._state[2].get(source_name))
+            return True
+    
+    def update_task(self, name, task_name, config_updates):
+        """
+        更新模板中某个任务的配置，其他任务的配置原样共享
+        
+        Args:
+            name (str): 模板名称
+            task_name (str): 任务名称，不存在时新建
+            config_updates (dict): 要更新的配置
+        
+        Returns:
+            bool: 模板存在并更新成功时返回True
+        """
+        updates = freeze(config_updates)
+        with self._write_lock:
+            template = self._state[1].get(name)
+            if template is None:
+                return False
+            task_config = dict(template.get(task_name, {}))
+            task_config.update(updates)
+            tasks = dict(template)
+            tasks[task_name] = MappingProxyType(task_config)
+            self._commit(name, MappingProxyType(tasks), self._state[2].get(name))
+            return True
+    
+    def thaw(self, name):
+        """
+        获取模板的可修改副本
+        
+        Args:
+            name (str): 模板名称
+        
+        Returns:
+            dict: 模板配置副本，模板不存在时返回None
+        """
+        template = self.get(name)
+        return None if template is None else thaw(template)
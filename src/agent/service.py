@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+AI Agent 常驻服务
+
+基于asyncio的本地服务，通过HTTP（TCP或Unix socket）接收请求。服务进程
+常驻一个 AIAgent，其任务模板、工作线程池、结果缓存和历史耗时在请求间复用；
+请求先进入有界队列，队列满时立即返回 503（准入控制），由固定数量的工作协程
+取出执行，队列中同时等待的多个请求会合并为一次 process_batch。
+
+接口:
+    POST /requests   提交请求，请求体为 {"type": ..., "params": {...}}，执行完成后返回结果
+    GET  /stats      队列深度、正在执行的请求数和累计计数
+    GET  /health     健康检查
+
+运行方式:
+    python -m src.agent.service --port 8080 --templates templates
+    python -m src.agent.service --unix-socket /tmp/agent.sock
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.dag.executor import DAGExecutionError
+
+HTTP_STATUS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable'
+}
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class AgentService:
+    """
+    AI Agent 常驻服务
+    
+    Attributes:
+        agent (AIAgent): 常驻的Agent，所有请求共享
+        max_queue (int): 等待队列的最大长度，超过时拒绝新请求
+        concurrency (int): 同时执行的批次数量
+        batch_size (int): 单个批次最多合并的请求数，1表示逐个调用 process_request
+        stats (dict): 累计计数（accepted, rejected, completed, failed）
+    """
+    
+    def __init__(self, agent, max_queue=100, concurrency=4, batch_size=8):
+        """
+        初始化服务
+        
+        Args:
+            agent (AIAgent): 常驻的Agent
+            max_queue (int, optional): 等待队列的最大长度，默认100
+            concurrency (int, optional): 同时执行的批次数量，默认4
+            batch_size (int, optional): 单个批次最多合并的请求数，默认8
+        """
+        if max_queue < 1 or concurrency < 1 or batch_size < 1:
+            raise ValueError("max_queue、concurrency 和 batch_size 必须为正整数")
+        self.agent = agent
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.stats = {'accepted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+        self._queue = None
+        self._in_flight = 0
+        self._workers = []
+        self._servers = []
+        self._started_at = None
+        # 执行批次的驱动线程，与Agent的工作线程池分开，避免占用节点的执行线程
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='agent-service')
+    
+    @property
+    def queue_depth(self):
+        """
+        当前排队等待的请求数
+        
+        Returns:
+            int: 队列深度
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def get_stats(self):
+        """
+        获取服务状态
+        
+        Returns:
+            dict: 队列深度、队列上限、正在执行的请求数、累计计数和运行时长
+        """
+        return {
+            'queue_depth': self.queue_depth,
+            'max_queue': self.max_queue,
+            'in_flight': self._in_flight,
+            'concurrency': self.concurrency,
+            'uptime': time.time() - self._started_at if self._started_at else 0.0,
+            **self.stats
+        }
+    
+    async def start(self, host='127.0.0.1', port=8080, unix_socket=None):
+        """
+        启动工作协程和监听
+        
+        Args:
+            host (str, optional): TCP监听地址，默认'127.0.0.1'
+            port (int, optional): TCP监听端口，None表示不监听TCP，0表示随机端口，默认8080
+            unix_socket (str, optional): Unix socket路径，默认None
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._started_at = time.time()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+        
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_connection, host, port))
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.remove(unix_socket)
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, unix_socket))
+    
+    @property
+    def addresses(self):
+        """
+        服务实际监听的地址
+        
+        Returns:
+            list: TCP为 (host, port)，Unix socket为路径
+        """
+        return [sock.getsockname() for server in self._servers for sock in server.sockets]
+    
+    async def stop(self):
+        """
+        停止监听和工作协程，已排队但未执行的请求以错误结束，并等待正在执行的批次结束
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("服务已停止"))
+        
+        # 等待正在执行的批次结束；在其他线程中等待，不阻塞事件循环上的其他协程
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+    
+    async def serve_forever(self, host='127.0.0.1', port=8080, unix_socket=None):
+        """
+        启动服务并一直运行，直到被取消（例如 Ctrl+C）
+        
+        Args:
+            host (str, optional): TCP监听地址
+            port (int, optional): TCP监听端口
+            unix_socket (str, optional): Unix socket路径
+        """
+        await self.start(host, port, unix_socket)
+        for address in self.addresses:
+            print(f"AI Agent 服务已启动: {address}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+    
+    async def submit(self, request):
+        """
+        提交请求并等待执行完成
+        
+        Args:
+            request (dict): 用户请求
+        
+        Returns:
+            dict: 处理结果
+        
+        Raises:
+            asyncio.QueueFull: 等待队列已满
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((request, future))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            raise
+        self.stats['accepted'] += 1
+        return await future
+    
+    async def _worker(self):
+        """
+        工作协程：取出一个请求，再合并队列中已在等待的请求（最多 batch_size 个）一起执行
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            self._in_flight += len(batch)
+            try:
+                outputs = await loop.run_in_executor(self._executor, self._run_batch, [request for request, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("服务已停止"))
+                raise
+            except Exception as e:
+                outputs = [e] * len(batch)
+            finally:
+                self._in_flight -= len(batch)
+            
+            for (_, future), output in zip(batch, outputs):
+                if future.done():
+                    continue
+                if isinstance(output, Exception):
+                    self.stats['failed'] += 1
+                    future.set_exception(output)
+                else:
+                    self.stats['completed'] += 1
+                    future.set_result(output)
+    
+    def _run_batch(self, requests):
+        """
+        在驱动线程中执行一个批次；批量执行失败（例如其中有不支持的请求类型）时
+        退回逐个执行，使错误只影响对应的请求。批次中有节点失败的请求转换为
+        DAGExecutionError，与单独执行时一样返回错误状态，响应不取决于是否被合并执行
+        
+        Args:
+            requests (list): 用户请求列表
+        
+        Returns:
+            list: 与 requests 顺序一致的处理结果，失败的请求为异常对象
+        """
+        if len(requests) > 1:
+            try:
+                outputs = self.agent.process_batch(requests)
+            except Exception:
+                pass
+            else:
+                return [
+                    DAGExecutionError(
+                        f"DAG执行失败: {len(output['errors'])} 个节点失败", {'status': 'failed', 'failed': output['errors']}
+                    ) if output.get('errors') else output
+                    for output in outputs
+                ]
+        
+        outputs = []
+        for request in requests:
+            try:
+                outputs.append(self.agent.process_request(request))
+            except Exception as e:
+                outputs.append(e)
+        return outputs
+    
+    async def _handle_connection(self, reader, writer):
+        """
+        处理一个HTTP连接，支持 keep-alive 连续处理多个请求
+        
+        Args:
+            reader (asyncio.StreamReader): 读取流
+            writer (asyncio.StreamWriter): 写入流
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': '无效的请求行'}, keep_alive=False)
+                    break
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': '无效的 Content-Length'}, keep_alive=False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {'error': '请求体过大'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                status, payload, extra_headers = await self._dispatch(method, path.split('?', 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _dispatch(self, method, path, body):
+        """
+        路由请求
+        
+        Args:
+            method (str): HTTP方法
+            path (str): 请求路径
+            body (bytes): 请求体
+        
+        Returns:
+            tuple: (状态码, 响应对象, 额外的响应头)
+        """
+        if path == '/health':
+            return 200, {'status': 'ok'}, {}
+        if path == '/stats':
+            return 200, self.get_stats(), {}
+        if path != '/requests':
+            return 404, {'error': f"未知路径: {path}"}, {}
+        if method != 'POST':
+            return 405, {'error': '只支持POST'}, {}
+        
+        try:
+            request = json.loads(body or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("请求必须是JSON对象")
+        except ValueError as e:
+            return 400, {'error': f"无效的请求: {e}"}, {}
+        
+        start = time.perf_counter()
+        try:
+            output = await self.submit(request)
+        except asyncio.QueueFull:
+            return 503, {'error': '请求队列已满', 'queue_depth': self.queue_depth}, {'Retry-After': '1'}
+        except ValueError as e:
+            return 400, {'error': str(e)}, {}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}, {}
+        
+        return 200, {**output, 'latency': time.perf_counter() - start}, {}
+    
+    async def _respond(self, writer, status, payload, keep_alive=True, extra_headers=None):
+        """
+        写入JSON响应
+        
+        Args:
+            writer (asyncio.StreamWriter): 写入流
+            status (int): 状态码
+            payload (dict): 响应对象
+            keep_alive (bool, optional): 是否保持连接
+            extra_headers (dict, optional): 额外的响应头
+        """
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive' if keep_alive else 'close',
+            **(extra_headers or {})
+        }
+        head = f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode('latin-1') + b'\r\n' + body)
+        await writer.drain()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='AI Agent 常驻服务')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP监听地址')
+    parser.add_argument('--port', type=int, default=8080, help='TCP监听端口，-1表示不监听TCP')
+    parser.add_argument('--unix-socket', help='Unix socket路径')
+    parser.add_argument('--max-queue', type=int, default=100, help='等待队列的最大长度')
+    parser.add_argument('--concurrency', type=int, default=4, help='同时执行的批次数量')
+    parser.add_argument('--batch-size', type=int, default=8, help='单个批次最多合并的请求数')
+    parser.add_argument('--workers', type=int, help='Agent工作线程池的最大线程数')
+    parser.add_argument('--templates', help='启动时加载的模板目录')
+    parser.add_argument('--reload-interval', type=float, default=2.0, help='模板目录的轮询间隔（秒），0表示不自动重新加载')
+    args = parser.parse_args()
+    
+    from src.agent.agent import AIAgent
+    from src.agent.tasks import TaskLibrary
+    
+    # 运行期间修改、新增或删除的模板文件在一个轮询间隔内生效
+    store = None
+    if args.templates and args.reload_interval > 0:
+        store = TaskLibrary.watch_templates(args.templates, args.reload_interval)
+    elif args.templates:
+        TaskLibrary.load_templates_from_directory(args.templates)
+    
+    agent = AIAgent(max_workers=args.workers)
+    service = AgentService(agent, max_queue=args.max_queue, concurrency=args.concurrency, batch_size=args.batch_size)
+    try:
+        asyncio.run(service.serve_forever(args.host, None if args.port < 0 else args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        print("\n服务已停止")
+    finally:
+        if store is not None:
+            store.stop()
+        agent.shutdown()
+
+
+if __name__ == '__main__':
+    main()
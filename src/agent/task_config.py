@@ -0,0 +1,221 @@
+from collections import ChainMap, namedtuple
+from collections.abc import Mapping
+from ..dag.retry import RETRY_KEYS, get_retry_settings
+
+# 各任务支持的配置项及默认值，模板中没有设置的项使用这里的默认值；
+# 默认值的类型决定配置项的类型（整数默认值要求整数，浮点数默认值也接受整数）
+TASK_DEFAULTS = {
+    'collect_data': {
+        'delay': 1.0,
+        'message': '收集数据...',
+        'sources': ('数据库', 'API', '文件系统')
+    },
+    'clean_data': {
+        'delay': 0.5,
+        'message': '清洗数据...',
+        'min_duplicates': 0,
+        'max_duplicates': 50,
+        'min_invalid': 0,
+        'max_invalid': 20
+    },
+    'analyze_data': {
+        'delay': 1.5,
+        'message': '分析数据...',
+        'min_insights': 5,
+        'max_insights': 15,
+        'min_accuracy': 0.8,
+        'max_accuracy': 0.99
+    },
+    'generate_report': {
+        'delay': 1.0,
+        'message': '生成报告...',
+        'default_save_to_file': False,
+        'default_output_dir': 'reports',
+        'default_file_extension': '.md'
+    },
+    'send_email': {
+        'delay': 0.8,
+        'message': '发送邮件...',
+        'default_subject': '数据分析报告'
+    },
+    'save_to_database': {
+        'delay': 1.2,
+        'message': '保存数据...'
+    },
+    'learn_agent_architecture': {
+        'delay': 2.0,
+        'message': '学习...',
+        'components': ('感知模块', '决策模块', '执行模块'),
+        'architectures': ('分层架构', '模块化架构')
+    }
+}
+
+# 需要满足 min_x <= max_x 的配置项
+RANGE_KEYS = ('duplicates', 'invalid', 'insights', 'accuracy')
+
+# learn_agent_architecture 每次选取的组件数量
+ARCHITECTURE_COMPONENTS = 3
+
+_FIELDS = tuple(dict.fromkeys(key for defaults in TASK_DEFAULTS.values() for key in defaults)) + RETRY_KEYS
+
+
+class TaskConfig(namedtuple('TaskConfig', _FIELDS, defaults=(None,) * len(_FIELDS))):
+    """
+    解析后的任务配置：继承链已展开、默认值已填入、类型已校验
+    
+    任务函数在热路径上直接使用属性访问（config.delay），不再逐项调用 dict.get。
+    任务不支持的配置项为None；超时与重试项（timeout、retries等）没有设置时为None。
+    """
+    
+    __slots__ = ()
+    
+    def retry_settings(self):
+        """
+        模板中设置了的超时与重试项
+        
+        Returns:
+            dict: 配置项 -> 值，可以直接合并到节点数据中
+        """
+        return {key: getattr(self, key) for key in RETRY_KEYS if getattr(self, key) is not None}
+
+
+def _check_value(template_name, task_name, key, value, default):
+    """
+    按默认值的类型校验配置项，列表转换为元组
+    
+    Args:
+        template_name (str): 模板名称，用于错误信息
+        task_name (str): 任务名称，用于错误信息
+        key (str): 配置项
+        value (any): 模板中的值
+        default (any): 默认值，决定期望的类型
+    
+    Returns:
+        any: 校验后的值
+    
+    Raises:
+        ValueError: 类型不匹配
+    """
+    where = f"模板 {template_name} 的任务 {task_name} 的配置项 {key}"
+    if isinstance(default, bool):
+        valid = isinstance(value, bool)
+    elif isinstance(default, int):
+        valid = isinstance(value, int) and not isinstance(value, bool) and value >= 0
+    elif isinstance(default, float):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+    elif isinstance(default, str):
+        valid = isinstance(value, str)
+    else:
+        if isinstance(value, list):
+            value = tuple(value)
+        valid = isinstance(value, tuple) and bool(value) and all(isinstance(item, str) for item in value)
+    if not valid:
+        raise ValueError(f"{where} 的值无效: {value!r}")
+    return value
+
+
+def make_task_config(template_name, task_name, values):
+    """
+    校验合并后的任务配置并生成 TaskConfig
+    
+    Args:
+        template_name (str): 模板名称，用于错误信息
+        task_name (str): 任务名称
+        values (dict): 合并后的配置项（不含默认值）
+    
+    Returns:
+        TaskConfig: 解析后的任务配置
+    
+    Raises:
+        ValueError: 未知配置项、类型错误、范围错误或超时重试设置无效
+    """
+    defaults = TASK_DEFAULTS[task_name]
+    unknown = set(values) - set(defaults) - set(RETRY_KEYS)
+    if unknown:
+        raise ValueError(f"模板 {template_name} 的任务 {task_name} 包含未知配置项: {sorted(unknown)}")
+    
+    resolved = {
+        key: _check_value(template_name, task_name, key, values[key], default) if key in values else default
+        for key, default in defaults.items()
+    }
+    for suffix in RANGE_KEYS:
+        low, high = resolved.get(f"min_{suffix}"), resolved.get(f"max_{suffix}")
+        if low is not None and low > high:
+            raise ValueError(f"模板 {template_name} 的任务 {task_name} 的 min_{suffix} 大于 max_{suffix}")
+    if task_name == 'learn_agent_architecture' and len(resolved['components']) < ARCHITECTURE_COMPONENTS:
+        raise ValueError(
+            f"模板 {template_name} 的任务 {task_name} 至少需要 {ARCHITECTURE_COMPONENTS} 个 components"
+        )
+    
+    retry = {key: values[key] for key in RETRY_KEYS if key in values}
+    try:
+        get_retry_settings(retry)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"模板 {template_name} 的任务 {task_name} 的超时重试设置无效: {e}") from e
+    return TaskConfig(**resolved, **retry)
+
+
+def resolve_template(name, templates, parents):
+    """
+    展开模板的继承链，生成每个任务的 TaskConfig
+    
+    子模板按配置项覆盖父模板：子模板只设置了 delay 时，该任务的其他配置项沿用父模板。
+    模板中没有出现的任务使用父模板的配置，整个继承链都没有时使用默认值。
+    
+    Args:
+        name (str): 模板名称
+        templates (Mapping): 模板名称 -> 模板配置
+        parents (Mapping): 模板名称 -> 父模板名称
+    
+    Returns:
+        dict: 任务名称 -> TaskConfig，包含所有已知任务
+    
+    Raises:
+        ValueError: 模板或父模板不存在、继承关系有环、包含未知任务或配置无效
+    """
+    chain = []
+    current = name
+    while current is not None:
+        if current in chain:
+            raise ValueError(f"模板继承关系存在环: {' -> '.join(chain + [current])}")
+        if current not in templates:
+            if chain:
+                raise ValueError(f"模板 {chain[-1]} 的父模板 {current} 不存在")
+            raise ValueError(f"模板 {current} 不存在")
+        chain.append(current)
+        current = parents.get(current)
+    
+    # 从最顶层的父模板开始逐层覆盖
+    merged = {task_name: {} for task_name in TASK_DEFAULTS}
+    for template_name in reversed(chain):
+        for task_name, config in templates[template_name].items():
+            if task_name not in TASK_DEFAULTS:
+                raise ValueError(f"模板 {template_name} 包含未知任务 {task_name}")
+            if not isinstance(config, Mapping):
+                raise ValueError(f"模板 {template_name} 的任务 {task_name} 的配置必须是对象")
+            merged[task_name].update(config)
+    
+    return {
+        task_name: make_task_config(name, task_name, values)
+        for task_name, values in merged.items()
+    }
+
+
+def validate_template(name, template, extends, templates, parents):
+    """
+    校验尚未注册的模板（注册前调用，使配置错误在加载时而不是执行时暴露）
+    
+    Args:
+        name (str): 模板名称
+        template (Mapping): 模板配置
+        extends (str): 父模板名称，None表示不继承
+        templates (Mapping): 当前已注册的模板
+        parents (Mapping): 当前的继承关系
+    
+    Returns:
+        dict: 任务名称 -> TaskConfig
+    
+    Raises:
+        ValueError: 模板无效
+    """
+    return resolve_template(name, ChainMap({name: template}, templates), ChainMap({name: extends}, parents))
@@ -2,14 +2,40 @@ import time
 import random
 import os
 import json
+import hashlib
+from ..dag.events import get_default_dispatcher
+from .registry import TemplateRegistry
+from .task_config import ARCHITECTURE_COMPONENTS, resolve_template, validate_template
+from .template_store import TemplateStore
+from .workflows import compile_workflows
 
 class TaskLibrary:
     """
     AI Agent的预定义任务库
     """
     
-    # 任务模板注册表
-    _task_templates = {
+    # 任务执行消息的事件分发器，可替换为自定义分发器或设置为静默
+    events = get_default_dispatcher()
+    
+    # 模板文件中声明的工作流：模板名称 -> {工作流名称: 已编译的Blueprint}
+    _workflows = {}
+    
+    # 工作流的原始定义，保存模板时写回：模板名称 -> {工作流名称: 定义}
+    _workflow_specs = {}
+    
+    # 每个模板最近一次的编译结果：模板名称 -> ((内容sha256, 解析后的任务配置), {工作流名称: Blueprint})，
+    # 内容和父模板配置都未变时重复加载不再编译；重新加载时替换旧条目，缓存大小不随修改次数增长
+    _compiled_workflows = {}
+    
+    # 解析后的任务配置缓存：(模板版本号, {模板名称: {任务名称: TaskConfig}})，版本号变化时整体失效
+    _resolved = (None, {})
+    
+    # 已索引的模板目录：目录绝对路径 -> TemplateStore
+    _stores = {}
+    
+    # 任务模板注册表（写时复制）：任务执行时无锁读取当前快照，修改模板时整体替换快照，
+    # 版本号 templates.version 用于失效依赖模板配置的缓存（如DAG蓝图）
+    templates = TemplateRegistry({
         'default': {
             'collect_data': {
                 'delay': 1,
@@ -42,11 +68,17 @@ class TaskLibrary:
             'send_email': {
                 'delay': 0.8,
                 'message': '发送报告到 {recipient}...',
-                'default_subject': '数据分析报告'
+                'default_subject': '数据分析报告',
+                'timeout': 10,
+                'retries': 3,
+                'backoff': 0.5
             },
             'save_to_database': {
                 'delay': 1.2,
-                'message': '保存数据到 {table_name} 表...'
+                'message': '保存数据到 {table_name} 表...',
+                'timeout': 10,
+                'retries': 3,
+                'backoff': 0.5
             },
             'learn_agent_architecture': {
                 'delay': 2,
@@ -95,7 +127,7 @@ class TaskLibrary:
             'learn_agent_architecture': {
                 'delay': 0.5,
                 'message': '[快速] 学习 AI Agent 架构知识...',
-                'components': ['感知模块', '执行模块'],
+                'components': ['感知模块', '决策模块', '执行模块'],
                 'architectures': ['分层架构']
             }
         },
@@ -177,18 +209,27 @@ class TaskLibrary:
                 'default_subject': '客户数据分析报告'
             }
         }
-    }
+    })
+    
+    # 内置模板的定义：模板文件覆盖内置模板后，文件被删除时恢复为内置定义
+    _builtin_templates = templates.snapshot
     
     @classmethod
-    def register_template(cls, name, template):
+    def register_template(cls, name, template, extends=None):
         """
         注册任务模板
         
         Args:
             name (str): 模板名称
-            template (dict): 模板配置
+            template (dict): 模板配置，注册时复制并冻结
+            extends (str, optional): 父模板名称，模板中没有设置的任务和配置项沿用父模板
+        
+        Raises:
+            ValueError: 模板配置无效或父模板不存在
         """
-        cls._task_templates[name] = template
+        version, snapshot, parents = cls.templates.state
+        validate_template(name, template, extends, snapshot, parents)
+        cls.templates.set(name, template, extends)
     
     @classmethod
     def get_template(cls, name='default'):
@@ -199,9 +240,11 @@ class TaskLibrary:
             name (str, optional): 模板名称，默认'default'
         
         Returns:
-            dict: 模板配置
+            MappingProxyType: 只读的模板配置，需要修改时使用 templates.thaw(name) 获取副本
         """
-        return cls._task_templates.get(name, cls._task_templates['default'])
+        snapshot = cls.templates.snapshot
+        template = snapshot.get(name)
+        return snapshot['default'] if template is None else template
     
     @classmethod
     def get_task_config(cls, task_name, template_name='default'):
@@ -213,11 +256,44 @@ class TaskLibrary:
             template_name (str, optional): 模板名称，默认'default'
         
         Returns:
-            dict: 任务配置
+            MappingProxyType: 只读的任务配置
         """
         template = cls.get_template(template_name)
         return template.get(task_name, {})
     
+    @classmethod
+    def get_resolved_config(cls, task_name, template_name='default'):
+        """
+        获取解析后的任务配置：继承链已展开、默认值已填入、类型已校验
+        
+        模板在第一次使用时整体解析一次，结果按注册表版本号缓存，之后的查找只是两次字典访问。
+        与 get_task_config 不同，模板不存在时不会回退到default模板。
+        
+        Args:
+            task_name (str): 任务名称
+            template_name (str, optional): 模板名称，默认'default'
+        
+        Returns:
+            TaskConfig: 解析后的任务配置，通过属性访问配置项（config.delay）
+        
+        Raises:
+            ValueError: 模板或任务不存在，或者模板配置无效
+        """
+        version, snapshot, parents = cls.templates.state
+        cached_version, resolved = cls._resolved
+        if cached_version != version:
+            resolved = {}
+            cls._resolved = (version, resolved)
+        
+        configs = resolved.get(template_name)
+        if configs is None:
+            configs = resolve_template(template_name, snapshot, parents)
+            resolved[template_name] = configs
+        try:
+            return configs[task_name]
+        except KeyError:
+            raise ValueError(f"未知任务 {task_name}") from None
+    
     @classmethod
     def get_all_templates(cls):
         """
@@ -226,7 +302,7 @@ class TaskLibrary:
         Returns:
             list: 模板名称列表
         """
-        return list(cls._task_templates.keys())
+        return cls.templates.names()
     
     @classmethod
     def get_template_info(cls, template_name='default'):
@@ -242,6 +318,7 @@ class TaskLibrary:
         template = cls.get_template(template_name)
         return {
             'name': template_name,
+            'extends': cls.templates.parents.get(template_name),
             'tasks': list(template.keys()),
             'config': template
         }
@@ -259,13 +336,8 @@ class TaskLibrary:
         Returns:
             bool: 是否成功复制
         """
-        if source_name not in cls._task_templates:
-            return False
-        
-        # 深拷贝模板
-        import copy
-        cls._task_templates[new_name] = copy.deepcopy(cls._task_templates[source_name])
-        return True
+        # 模板不可变，新模板直接共享源模板的配置
+        return cls.templates.copy(source_name, new_name)
     
     @classmethod
     def update_task_config(cls, template_name, task_name, config_updates):
@@ -279,21 +351,28 @@ class TaskLibrary:
         
         Returns:
             bool: 是否成功更新
+        
+        Raises:
+            ValueError: 更新后的任务配置无效
         """
-        if template_name not in cls._task_templates:
+        version, snapshot, parents = cls.templates.state
+        template = snapshot.get(template_name)
+        if template is None:
             return False
         
-        if task_name not in cls._task_templates[template_name]:
-            cls._task_templates[template_name][task_name] = {}
+        # 先校验更新后的模板，配置错误不会进入注册表
+        candidate = dict(template)
+        candidate[task_name] = {**template.get(task_name, {}), **config_updates}
+        validate_template(template_name, candidate, parents.get(template_name), snapshot, parents)
         
-        # 更新配置
-        cls._task_templates[template_name][task_name].update(config_updates)
-        return True
+        # 基于当前快照生成新模板并原子替换，正在执行的任务继续读取旧快照
+        return cls.templates.update_task(template_name, task_name, config_updates)
     
     @classmethod
     def delete_template(cls, template_name):
         """
-        删除模板（不能删除default模板）
+        删除模板（不能删除default模板，也不能删除被其他模板继承的模板，
+        否则子模板要到执行时才发现父模板不存在）
         
         Args:
             template_name (str): 模板名称
@@ -301,17 +380,86 @@ class TaskLibrary:
         Returns:
             bool: 是否成功删除
         """
-        if template_name == 'default' or template_name not in cls._task_templates:
+        if template_name == 'default' or not cls.templates.delete(template_name):
             return False
         
-        del cls._task_templates[template_name]
+        cls._drop_workflows(template_name)
         return True
     
+    @classmethod
+    def unload_template(cls, template_name):
+        """
+        撤销从模板文件加载的模板（模板文件被删除时由 TemplateStore 调用）
+        
+        覆盖了内置模板的模板恢复为内置定义，其他模板被删除。
+        
+        Args:
+            template_name (str): 模板名称
+        
+        Returns:
+            bool: 模板被恢复或删除时返回True，模板不存在或仍被其他模板继承时返回False
+        """
+        builtin = cls._builtin_templates.get(template_name)
+        if builtin is None:
+            return cls.delete_template(template_name)
+        
+        cls.templates.set(template_name, builtin)
+        cls._drop_workflows(template_name)
+        return True
+    
+    @classmethod
+    def _drop_workflows(cls, template_name):
+        """
+        移除模板文件中声明的工作流及其编译缓存
+        
+        Args:
+            template_name (str): 模板名称
+        """
+        cls._workflows.pop(template_name, None)
+        cls._workflow_specs.pop(template_name, None)
+        cls._compiled_workflows.pop(template_name, None)
+    
+    @classmethod
+    def get_workflow(cls, name, template_name='default'):
+        """
+        获取模板文件中声明的工作流
+        
+        优先在指定模板中查找，找不到时返回任意已加载模板中的同名工作流。
+        
+        Args:
+            name (str): 工作流名称
+            template_name (str, optional): 模板名称，默认'default'
+        
+        Returns:
+            Blueprint: 已编译的工作流蓝图，不存在时返回None
+        """
+        workflows = cls._workflows.get(template_name, {})
+        if name in workflows:
+            return workflows[name]
+        for workflows in cls._workflows.values():
+            if name in workflows:
+                return workflows[name]
+        return None
+    
+    @classmethod
+    def get_all_workflows(cls):
+        """
+        获取所有已加载的工作流名称
+        
+        Returns:
+            dict: 模板名称 -> 工作流名称列表
+        """
+        return {template_name: list(workflows) for template_name, workflows in cls._workflows.items()}
+    
     @classmethod
     def load_template_from_file(cls, file_path):
         """
         从JSON文件加载模板
         
+        模板中的 'workflows' 字段在加载时编译为已校验、已拓扑排序的工作流蓝图，
+        编译结果按文件内容的sha256缓存。'extends' 字段指定父模板。
+        任务配置或工作流定义无效时整个模板加载失败。
+        
         Args:
             file_path (str): JSON文件路径
         
@@ -319,18 +467,8 @@ class TaskLibrary:
             bool: 是否成功加载
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 验证文件格式
-            if 'name' not in data:
-                raise ValueError("模板文件缺少'name'字段")
-            if 'tasks' not in data:
-                raise ValueError("模板文件缺少'tasks'字段")
-            
-            # 加载模板
-            template_name = data['name']
-            cls._task_templates[template_name] = data['tasks']
+            with open(file_path, 'rb') as f:
+                template_name = cls.load_template_content(f.read())
             
             print(f"模板 {template_name} 已从 {file_path} 加载成功")
             return True
@@ -338,6 +476,51 @@ class TaskLibrary:
             print(f"加载模板失败: {e}")
             return False
     
+    @classmethod
+    def load_template_content(cls, content, digest=None):
+        """
+        解析并注册模板文件的内容
+        
+        Args:
+            content (bytes): 模板文件内容（UTF-8编码的JSON）
+            digest (str, optional): 内容的sha256，调用方已经计算过时传入
+        
+        Returns:
+            str: 模板名称
+        
+        Raises:
+            ValueError: 内容不是有效的模板，父模板不存在，或者任务配置、工作流定义无效
+        """
+        data = json.loads(content.decode('utf-8'))
+        
+        # 验证文件格式
+        if 'name' not in data:
+            raise ValueError("模板文件缺少'name'字段")
+        if 'tasks' not in data:
+            raise ValueError("模板文件缺少'tasks'字段")
+        
+        # 校验任务配置并展开继承链，配置错误在加载时而不是任务执行时暴露
+        template_name = data['name']
+        extends = data.get('extends')
+        version, snapshot, parents = cls.templates.state
+        configs = validate_template(template_name, data['tasks'], extends, snapshot, parents)
+        
+        # 编译工作流（内容和父模板配置都相同时直接复用编译结果）
+        digest = digest or hashlib.sha256(content).hexdigest()
+        key = (digest, tuple(configs.items()))
+        cached = cls._compiled_workflows.get(template_name)
+        if cached is not None and cached[0] == key:
+            workflows = cached[1]
+        else:
+            workflows = compile_workflows(template_name, data, configs, cls)
+            cls._compiled_workflows[template_name] = (key, workflows)
+        
+        # 加载模板
+        cls._workflows[template_name] = workflows
+        cls._workflow_specs[template_name] = data.get('workflows', {})
+        cls.templates.set(template_name, data['tasks'], extends)
+        return template_name
+    
     @classmethod
     def save_template_to_file(cls, template_name, file_path):
         """
@@ -351,15 +534,20 @@ class TaskLibrary:
             bool: 是否成功保存
         """
         try:
-            if template_name not in cls._task_templates:
+            tasks = cls.templates.thaw(template_name)
+            if tasks is None:
                 raise ValueError(f"模板 {template_name} 不存在")
             
             # 准备保存的数据
             data = {
                 'name': template_name,
                 'description': f"{template_name} 任务模板",
-                'tasks': cls._task_templates[template_name]
+                'tasks': tasks
             }
+            if template_name in cls.templates.parents:
+                data['extends'] = cls.templates.parents[template_name]
+            if cls._workflow_specs.get(template_name):
+                data['workflows'] = cls._workflow_specs[template_name]
             
             # 创建目录（如果不存在）
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -375,50 +563,70 @@ class TaskLibrary:
             return False
     
     @classmethod
-    def load_templates_from_directory(cls, directory):
+    def get_template_store(cls, directory):
         """
-        从目录加载所有JSON模板文件
+        获取模板目录的索引（TemplateStore），同一目录只创建一次
         
         Args:
             directory (str): 模板文件目录
         
         Returns:
-            dict: 加载结果统计
+            TemplateStore: 模板目录索引
         """
-        result = {
-            'total_files': 0,
-            'loaded': 0,
-            'failed': 0,
-            'errors': []
-        }
+        path = os.path.abspath(directory)
+        store = cls._stores.get(path)
+        if store is None:
+            store = cls._stores.setdefault(path, TemplateStore(path, cls))
+        return store
+    
+    @classmethod
+    def load_templates_from_directory(cls, directory):
+        """
+        从目录加载JSON模板文件
         
+        目录的文件索引在多次调用之间保留，再次调用时只重新加载修改过的文件，
+        并移除已删除文件对应的模板。
+        
+        Args:
+            directory (str): 模板文件目录
+        
+        Returns:
+            dict: 加载结果统计，包含 total_files、loaded、unchanged、removed、failed 和 errors
+        """
         try:
-            if not os.path.exists(directory):
-                raise ValueError(f"目录 {directory} 不存在")
-            
-            # 获取所有JSON文件
-            json_files = [f for f in os.listdir(directory) if f.endswith('.json')]
-            result['total_files'] = len(json_files)
-            
-            # 加载每个模板文件
-            for json_file in json_files:
-                file_path = os.path.join(directory, json_file)
-                try:
-                    if cls.load_template_from_file(file_path):
-                        result['loaded'] += 1
-                    else:
-                        result['failed'] += 1
-                        result['errors'].append(f"文件 {json_file} 加载失败")
-                except Exception as e:
-                    result['failed'] += 1
-                    result['errors'].append(f"文件 {json_file} 加载失败: {e}")
-            
-            print(f"从 {directory} 加载模板完成: 共 {result['total_files']} 个文件，成功 {result['loaded']} 个，失败 {result['failed']} 个")
+            result = cls.get_template_store(directory).refresh()
+            print(
+                f"从 {directory} 加载模板完成: 共 {result['total_files']} 个文件，成功 {result['loaded']} 个，"
+                f"未变化 {result['unchanged']} 个，移除 {result['removed']} 个，失败 {result['failed']} 个"
+            )
             return result
         except Exception as e:
             print(f"从目录加载模板失败: {e}")
-            result['errors'].append(str(e))
-            return result
+            return {
+                'total_files': 0,
+                'loaded': 0,
+                'unchanged': 0,
+                'removed': 0,
+                'failed': 0,
+                'errors': [str(e)]
+            }
+    
+    @classmethod
+    def watch_templates(cls, directory, interval=2.0):
+        """
+        加载模板目录并启动后台轮询，文件修改、新增或删除后在一个轮询间隔内生效
+        
+        Args:
+            directory (str): 模板文件目录
+            interval (float, optional): 轮询间隔（秒），默认2.0
+        
+        Returns:
+            TemplateStore: 模板目录索引，调用 stop() 停止监视
+        """
+        cls.load_templates_from_directory(directory)
+        store = cls.get_template_store(directory)
+        store.start(interval)
+        return store
 
     """
     AI Agent的预定义任务库
@@ -437,16 +645,16 @@ class TaskLibrary:
             dict: 收集到的数据
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('collect_data', template_name)
+        config = TaskLibrary.get_resolved_config('collect_data', template_name)
         
         # 使用模板参数
-        time.sleep(config.get('delay', 1))
-        print(config.get('message', '收集数据...').format(query=query))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='collect_data', message=config.message.format(query=query))
         
         # 模拟收集到的数据
         data = {
             'query': query,
-            'sources': config.get('sources', ['数据库', 'API', '文件系统']),
+            'sources': list(config.sources),
             'data_points': random.randint(100, 1000),
             'timestamp': time.time()
         }
@@ -466,23 +674,23 @@ class TaskLibrary:
             dict: 清洗后的数据
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('clean_data', template_name)
+        config = TaskLibrary.get_resolved_config('clean_data', template_name)
         
         # 使用模板参数
-        time.sleep(config.get('delay', 0.5))
-        print(config.get('message', '清洗数据...'))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='clean_data', message=config.message)
         
         # 模拟数据清洗过程
         cleaned_data = {
             **data,
             'cleaned': True,
             'duplicates_removed': random.randint(
-                config.get('min_duplicates', 0),
-                config.get('max_duplicates', 50)
+                config.min_duplicates,
+                config.max_duplicates
             ),
             'invalid_entries_removed': random.randint(
-                config.get('min_invalid', 0),
-                config.get('max_invalid', 20)
+                config.min_invalid,
+                config.max_invalid
             )
         }
         
@@ -501,16 +709,16 @@ class TaskLibrary:
             dict: 分析结果
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('analyze_data', template_name)
+        config = TaskLibrary.get_resolved_config('analyze_data', template_name)
         
         # 使用模板参数
-        time.sleep(config.get('delay', 1.5))
-        print(config.get('message', '分析数据...'))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='analyze_data', message=config.message)
         
         # 生成洞察数量
         insight_count = random.randint(
-            config.get('min_insights', 5),
-            config.get('max_insights', 15)
+            config.min_insights,
+            config.max_insights
         )
         
         # 模拟数据分析结果
@@ -527,8 +735,8 @@ class TaskLibrary:
             ],
             'metrics': {
                 'accuracy': round(random.uniform(
-                    config.get('min_accuracy', 0.8),
-                    config.get('max_accuracy', 0.99)
+                    config.min_accuracy,
+                    config.max_accuracy
                 ), 2),
                 'completeness': round(random.uniform(0.7, 0.95), 2),
                 'relevance': round(random.uniform(0.85, 0.98), 2)
@@ -552,17 +760,17 @@ class TaskLibrary:
             dict: 包含报告内容和存储信息的字典
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('generate_report', template_name)
+        config = TaskLibrary.get_resolved_config('generate_report', template_name)
         
         # 使用模板中的默认值（如果未提供）
         if save_to_file is None:
-            save_to_file = config.get('default_save_to_file', False)
+            save_to_file = config.default_save_to_file
         if output_dir is None:
-            output_dir = config.get('default_output_dir', 'reports')
+            output_dir = config.default_output_dir
         
         # 使用模板参数
-        time.sleep(config.get('delay', 1))
-        print(config.get('message', '生成报告...'))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='generate_report', message=config.message)
         
         # 检查分析结果的类型
         report_title = ""
@@ -677,14 +885,14 @@ class TaskLibrary:
                     'file_name': filename
                 })
                 
-                print(f"报告已保存到: {filepath}")
+                TaskLibrary.events.emit('task_message', task='generate_report', message=f"报告已保存到: {filepath}")
             except Exception as e:
                 result.update({
                     'save_status': 'error',
                     'error_message': str(e)
                 })
                 
-                print(f"保存报告时出错: {e}")
+                TaskLibrary.events.emit('task_message', task='generate_report', level='error', message=f"保存报告时出错: {e}")
         
         return result
     
@@ -702,11 +910,11 @@ class TaskLibrary:
             dict: 发送结果
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('send_email', template_name)
+        config = TaskLibrary.get_resolved_config('send_email', template_name)
         
         # 使用模板参数
-        time.sleep(config.get('delay', 0.8))
-        print(config.get('message', '发送邮件...').format(recipient=recipient))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='send_email', message=config.message.format(recipient=recipient))
         
         # 提取报告内容（兼容旧格式和新格式）
         report_content = report['content'] if isinstance(report, dict) else report
@@ -716,7 +924,7 @@ class TaskLibrary:
             'recipient': recipient,
             'status': 'sent',
             'timestamp': time.time(),
-            'subject': config.get('default_subject', '数据分析报告'),
+            'subject': config.default_subject,
             'message_id': f"msg-{random.randint(10000, 99999)}"
         }
         
@@ -736,11 +944,11 @@ class TaskLibrary:
             dict: 保存结果
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('save_to_database', template_name)
+        config = TaskLibrary.get_resolved_config('save_to_database', template_name)
         
         # 使用模板参数
-        time.sleep(config.get('delay', 1.2))
-        print(config.get('message', '保存数据...').format(table_name=table_name))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='save_to_database', message=config.message.format(table_name=table_name))
         
         # 模拟保存数据到数据库
         result = {
@@ -766,17 +974,17 @@ class TaskLibrary:
             dict: 学习结果
         """
         # 获取模板配置
-        config = TaskLibrary.get_task_config('learn_agent_architecture', template_name)
+        config = TaskLibrary.get_resolved_config('learn_agent_architecture', template_name)
         
         # 使用模板参数
-        time.sleep(config.get('delay', 2))
-        print(config.get('message', '学习...').format(topic=topic))
+        time.sleep(config.delay)
+        TaskLibrary.events.emit('task_message', task='learn_agent_architecture', message=config.message.format(topic=topic))
         
         # 随机选择组件和架构
-        components = config.get('components', ['感知模块', '决策模块', '执行模块'])
-        selected_components = random.sample(components, min(3, len(components)))
+        components = config.components
+        selected_components = random.sample(components, ARCHITECTURE_COMPONENTS)
         
-        architectures = config.get('architectures', ['分层架构', '模块化架构'])
+        architectures = config.architectures
         selected_architecture = random.choice(architectures)
         
         # 生成学习结果
@@ -0,0 +1,220 @@
+import os
+import hashlib
+import threading
+from collections import namedtuple
+
+
+class TemplateFile(namedtuple('TemplateFile', ['mtime_ns', 'size', 'sha256', 'template_name'])):
+    """
+    模板文件的索引项
+    
+    Attributes:
+        mtime_ns (int): 上次检查时文件的修改时间（纳秒）
+        size (int): 上次检查时文件的大小（字节）
+        sha256 (str): 上次读取时文件内容的sha256
+        template_name (str): 文件中定义的模板名称，文件从未成功加载时为None
+    """
+    
+    __slots__ = ()
+
+
+class TemplateStore:
+    """
+    带索引的模板目录，支持增量重新加载和轮询监视
+    
+    索引记录每个JSON文件的修改时间、大小和内容哈希。refresh() 只对目录做一次
+    扫描并读取文件元数据：修改时间和大小都没变的文件不会被打开；变了的文件读取后
+    比较内容哈希，内容确实变化时才解析并注册。被删除的文件对应的模板会从任务库中移除
+    （覆盖内置模板的恢复为内置定义；仍被其他模板继承的，等子模板移除后再移除），
+    解析失败的文件保留之前加载的模板，直到文件再次变化。
+    
+    start() 启动后台线程按固定间隔调用 refresh()，长时间运行的进程无需重启
+    即可在几秒内用上修改后的模板。
+    
+    Attributes:
+        directory (str): 模板目录
+        library (type): 注册模板的任务库类（TaskLibrary）
+        index (dict): 文件名 -> TemplateFile
+    """
+    
+    def __init__(self, directory, library):
+        """
+        初始化模板目录
+        
+        Args:
+            directory (str): 模板目录
+            library (type): 注册模板的任务库类，需要提供 templates、load_template_content 和 unload_template
+        """
+        self.directory = directory
+        self.library = library
+        self.index = {}
+        self._pending = set()  # 文件已删除或改名、尚未移除的模板名称
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    @property
+    def watching(self):
+        """
+        后台监视线程是否在运行
+        """
+        return self._thread is not None
+    
+    def refresh(self):
+        """
+        增量重新加载目录中变化的模板文件
+        
+        Returns:
+            dict: 加载结果统计，包含 total_files、loaded、unchanged、removed、failed 和 errors
+        
+        Raises:
+            ValueError: 模板目录不存在
+        """
+        if not os.path.isdir(self.directory):
+            raise ValueError(f"目录 {self.directory} 不存在")
+        
+        result = {
+            'total_files': 0,
+            'loaded': 0,
+            'unchanged': 0,
+            'removed': 0,
+            'failed': 0,
+            'errors': []
+        }
+        
+        with self._lock:
+            seen = set()
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json') or not entry.is_file():
+                        continue
+                    seen.add(entry.name)
+                    result['total_files'] += 1
+                    self._refresh_file(entry, result)
+            
+            # 已删除的文件
+            for file_name in set(self.index) - seen:
+                template_name = self.index.pop(file_name).template_name
+                if template_name is not None:
+                    self._pending.add(template_name)
+            result['removed'] += self._remove_pending()
+        
+        if result['loaded'] or result['removed'] or result['failed']:
+            self.library.events.emit(
+                'templates_reloaded',
+                level='warning' if result['failed'] else 'info',
+                directory=self.directory,
+                loaded=result['loaded'],
+                removed=result['removed'],
+                failed=result['failed'],
+                errors=result['errors']
+            )
+        return result
+    
+    def _refresh_file(self, entry, result):
+        """
+        检查单个模板文件，有变化时重新加载
+        
+        Args:
+            entry (os.DirEntry): 目录项
+            result (dict): 加载结果统计，原地更新
+        """
+        stat = entry.stat()
+        previous = self.index.get(entry.name)
+        if previous is not None and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+            result['unchanged'] += 1
+            return
+        
+        try:
+            with open(entry.path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            result['failed'] += 1
+            result['errors'].append(f"文件 {entry.name} 读取失败: {e}")
+            return
+        
+        # 只是修改时间变化（例如 touch 或保存了相同内容），不重新解析
+        digest = hashlib.sha256(content).hexdigest()
+        if previous is not None and previous.sha256 == digest:
+            self.index[entry.name] = previous._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            result['unchanged'] += 1
+            return
+        
+        previous_name = previous.template_name if previous is not None else None
+        try:
+            template_name = self.library.load_template_content(content, digest)
+        except Exception as e:
+            # 记录失败文件的状态，文件再次变化前不重复解析，之前加载的模板保持不变
+            self.index[entry.name] = TemplateFile(stat.st_mtime_ns, stat.st_size, digest, previous_name)
+            result['failed'] += 1
+            result['errors'].append(f"文件 {entry.name} 加载失败: {e}")
+            return
+        
+        self.index[entry.name] = TemplateFile(stat.st_mtime_ns, stat.st_size, digest, template_name)
+        if previous_name is not None and previous_name != template_name:
+            self._pending.add(previous_name)
+        result['loaded'] += 1
+    
+    def _remove_pending(self):
+        """
+        移除不再由任何文件提供的模板
+        
+        仍被其他模板继承的模板留在待移除集合中，同一次刷新中子模板移除后再次尝试，
+        子模板来自其他目录或代码注册时等到之后的刷新。
+        
+        Returns:
+            int: 本次移除（或恢复为内置定义）的模板数量
+        """
+        removed = 0
+        progress = True
+        while progress:
+            progress = False
+            for template_name in list(self._pending):
+                if any(item.template_name == template_name for item in self.index.values()):
+                    # 又由其他文件提供
+                    self._pending.discard(template_name)
+                elif self.library.unload_template(template_name):
+                    self._pending.discard(template_name)
+                    removed += 1
+                    progress = True
+                elif template_name not in self.library.templates:
+                    self._pending.discard(template_name)
+        return removed
+    
+    def start(self, interval=2.0):
+        """
+        启动后台监视线程，按固定间隔调用 refresh()
+        
+        Args:
+            interval (float, optional): 轮询间隔（秒），默认2.0
+        """
+        if interval <= 0:
+            raise ValueError("interval 必须大于0")
+        if self._thread is not None:
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._watch, args=(interval,), name='template-watcher', daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self):
+        """
+        停止后台监视线程
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join()
+        self._thread = None
+    
+    def _watch(self, interval):
+        while not self._stop_event.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.library.events.emit(
+                    'templates_reload_failed', level='error', directory=self.directory, error=e
+                )
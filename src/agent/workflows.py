@@ -0,0 +1,161 @@
+from ..dag.blueprint import Blueprint, Param
+from ..dag.retry import RETRY_KEYS, get_retry_settings
+
+# 工作流节点可以调用的任务函数（TaskLibrary 上的静态方法）
+WORKFLOW_TASKS = (
+    'collect_data',
+    'clean_data',
+    'analyze_data',
+    'generate_report',
+    'send_email',
+    'save_to_database',
+    'learn_agent_architecture'
+)
+
+# 有外部副作用的任务（generate_report 可能写入报告文件），默认不参与批量去重，也不使用结果缓存
+SIDE_EFFECT_TASKS = ('send_email', 'save_to_database', 'generate_report')
+
+# 节点定义中除任务参数外允许出现的键
+NODE_KEYS = ('task', 'args', 'kwargs', 'pool', 'backend', 'cse', 'cache') + RETRY_KEYS
+
+
+def _wire(value, params, references):
+    """
+    解析参数中的引用："$name" 引用请求参数，"@node" 引用上游节点的结果，
+    "$$" 和 "@@" 开头表示字面量的 "$" 和 "@"
+    
+    Args:
+        value (any): 节点定义中的参数值
+        params (dict): 工作流声明的参数默认值
+        references (list): 收集 "@node" 引用的列表，为None时不允许引用节点
+    
+    Returns:
+        any: Param 占位符、None（由依赖结果填入）或原值
+    """
+    if isinstance(value, str):
+        if value.startswith('$$') or value.startswith('@@'):
+            return value[1:]
+        if value.startswith('$'):
+            name = value[1:]
+            return Param(name, params[name]) if name in params else Param(name)
+        if value.startswith('@'):
+            if references is None:
+                raise ValueError(f"节点引用 {value} 只能出现在 args 中")
+            references.append(value[1:])
+            return None
+        return value
+    if isinstance(value, list):
+        return tuple(_wire(item, params, None) for item in value)
+    if isinstance(value, dict):
+        return {key: _wire(item, params, None) for key, item in value.items()}
+    return value
+
+
+def compile_workflow(name, spec, template_name, configs, library):
+    """
+    将模板中声明的工作流编译为已校验、已拓扑排序的 Blueprint
+    
+    工作流定义格式:
+        
+        {
+            "description": "...",
+            "params": {"query": "示例查询"},
+            "nodes": {
+                "collect": {"task": "collect_data", "args": ["$query"]},
+                "report": {"task": "generate_report", "args": ["@collect"]}
+            },
+            "edges": [["collect", "report"]],
+            "output": "report"
+        }
+    
+    args 中的 "@node" 声明依赖并按出现顺序接收上游节点的结果；"edges" 可以省略，
+    给出时必须与 "@node" 引用一致。节点默认以 template_name 调用任务函数，
+    预估耗时和超时重试设置取自模板的任务配置，节点中的同名键优先。
+    
+    Args:
+        name (str): 工作流名称
+        spec (dict): 工作流定义
+        template_name (str): 所属模板名称
+        configs (dict): 所属模板解析后的任务配置，任务名称 -> TaskConfig
+        library (type): 提供任务函数的任务库类
+    
+    Returns:
+        Blueprint: 已编译的蓝图
+    
+    Raises:
+        ValueError: 工作流定义无效（未知任务或键、引用不存在的节点、边与引用不一致、有环等）
+    """
+    nodes = spec.get('nodes')
+    if not isinstance(nodes, dict) or not nodes:
+        raise ValueError(f"工作流 {name} 缺少'nodes'字段")
+    output = spec.get('output')
+    if output not in nodes:
+        raise ValueError(f"工作流 {name} 的输出节点 {output} 不存在")
+    params = spec.get('params', {})
+    
+    blueprint = Blueprint(name, output=output)
+    wiring = {}
+    for node_id, node_spec in nodes.items():
+        task_name = node_spec.get('task')
+        if task_name not in WORKFLOW_TASKS:
+            raise ValueError(f"工作流 {name} 的节点 {node_id} 使用了未知任务 {task_name}")
+        unknown = set(node_spec) - set(NODE_KEYS)
+        if unknown:
+            raise ValueError(f"工作流 {name} 的节点 {node_id} 包含未知的键: {sorted(unknown)}")
+        
+        references = []
+        args = tuple(_wire(arg, params, references) for arg in node_spec.get('args', []))
+        kwargs = _wire(node_spec.get('kwargs', {}), params, None)
+        kwargs.setdefault('template_name', template_name)
+        wiring[node_id] = references
+        
+        config = configs[task_name]
+        data = {
+            'func': getattr(library, task_name),
+            'estimated_duration': config.delay,
+            'pool': node_spec.get('pool', 'io'),
+            'cse': node_spec.get('cse', task_name not in SIDE_EFFECT_TASKS),
+            'cache': node_spec.get('cache', task_name not in SIDE_EFFECT_TASKS),
+            'args': args,
+            'kwargs': kwargs
+        }
+        data.update(config.retry_settings())
+        data.update((key, node_spec[key]) for key in RETRY_KEYS if key in node_spec)
+        if 'backend' in node_spec:
+            data['backend'] = node_spec['backend']
+        get_retry_settings(data)
+        blueprint.add_node(node_id, data)
+    
+    # 依赖顺序与 "@node" 在 args 中出现的顺序一致，执行时按该顺序填入结果
+    declared = {tuple(edge) for edge in spec.get('edges', [])}
+    wired = set()
+    for node_id, references in wiring.items():
+        for source_id in references:
+            if source_id not in nodes:
+                raise ValueError(f"工作流 {name} 的节点 {node_id} 引用了不存在的节点 {source_id}")
+            blueprint.add_edge(source_id, node_id)
+            wired.add((source_id, node_id))
+    if 'edges' in spec and declared != wired:
+        mismatched = sorted(declared ^ wired)
+        raise ValueError(f"工作流 {name} 的边与 args 中的节点引用不一致: {mismatched}")
+    
+    return blueprint.compile()
+
+
+def compile_workflows(template_name, data, configs, library):
+    """
+    编译模板文件中声明的所有工作流
+    
+    Args:
+        template_name (str): 模板名称
+        data (dict): 模板文件内容
+        configs (dict): 模板解析后的任务配置，任务名称 -> TaskConfig
+        library (type): 提供任务函数的任务库类
+    
+    Returns:
+        dict: 工作流名称 -> Blueprint
+    """
+    return {
+        name: compile_workflow(name, spec, template_name, configs, library)
+        for name, spec in data.get('workflows', {}).items()
+    }
@@ -0,0 +1,285 @@
+import asyncio
+from .executor import DAGExecutor, _invoke
+from .retry import get_retry_settings
+
+class AsyncDAGExecutor(DAGExecutor):
+    """
+    基于asyncio的DAG执行器
+    
+    在单个事件循环上调度所有节点：``async def`` 任务函数直接在事件循环中
+    执行，普通函数通过 ``run_in_executor`` 交给工作线程池（或进程池）。
+    依赖结果的传递规则与 DAGExecutor 完全相同。
+    
+    Example:
+        executor = AsyncDAGExecutor(dag)
+        results = await executor.run()
+    """
+    
+    _cancel_waiter = (None, None)  # (事件循环, asyncio.Event)，用于跨线程唤醒调度循环
+    
+    def execute(self, parallel=True, incremental=False):
+        """
+        在新的事件循环中同步执行DAG，便于在非异步代码中使用
+        
+        Args:
+            parallel (bool, optional): 是否并发执行不相关的任务，默认True
+            incremental (bool, optional): 是否增量执行，默认False
+        
+        Returns:
+            dict: 所有任务的执行结果
+        """
+        return asyncio.run(self.run(parallel=parallel, incremental=incremental))
+    
+    async def run(self, parallel=True, incremental=False):
+        """
+        执行DAG中的所有任务
+        
+        Args:
+            parallel (bool, optional): 是否并发执行不相关的任务，默认True
+            incremental (bool, optional): 是否增量执行，只重新执行输入变化的节点及其下游，默认False
+        
+        Returns:
+            dict: 所有任务的执行结果
+        """
+        if self.checkpoint is not None and not incremental:
+            self.checkpoint.delete(self.run_id)
+        
+        topological_order = self._plan(self.dag.topological_sort(), incremental)
+        
+        if parallel:
+            return await self._run_parallel(topological_order)
+        else:
+            return await self._run_serial(topological_order)
+    
+    async def resume_async(self, run_id=None, parallel=True):
+        """
+        在当前事件循环中从检查点恢复执行，语义与 DAGExecutor.resume 相同
+        
+        Args:
+            run_id (str, optional): 要恢复的执行ID，默认使用本执行器的 run_id
+            parallel (bool, optional): 是否并发执行，默认True
+        
+        Returns:
+            dict: 所有任务的执行结果
+        """
+        self._restore_checkpoint(run_id)
+        return await self.run(parallel=parallel, incremental=True)
+    
+    def cancel(self):
+        """
+        取消正在进行的执行，可以从任意线程调用
+        """
+        super().cancel()
+        loop, waiter = self._cancel_waiter
+        if loop is not None:
+            loop.call_soon_threadsafe(waiter.set)
+    
+    async def _run_serial(self, topological_order):
+        """
+        按拓扑顺序逐个执行任务
+        
+        Args:
+            topological_order (list): 拓扑排序后的节点ID列表
+        
+        Returns:
+            dict: 所有任务的执行结果
+        """
+        start_time = self._begin_run('串行')
+        pending = self._initial_pending_deps(topological_order)
+        
+        for node_id in topological_order:
+            # 失败节点的下游节点已被跳过
+            if node_id not in pending:
+                continue
+            if self.cancel_event.is_set():
+                break
+            del pending[node_id]
+            
+            hit, result = self._lookup_cache(node_id)
+            if not hit:
+                try:
+                    result = await self._run_with_retries(node_id)
+                except Exception as e:
+                    self._errors[node_id] = e
+                    self._skip_descendants(node_id, pending)
+                    if self.failure_policy == 'fail_fast':
+                        self.cancel_event.set()
+                    continue
+                self._store_cache(node_id, result)
+            self.results[node_id] = result
+            self.events.emit('node_completed', node_id, result=result)
+            self._save_checkpoint(node_id, result)
+        
+        return self._finish_run(topological_order, start_time)
+    
+    async def _run_parallel(self, topological_order):
+        """
+        基于入度计数并发执行任务，节点在最后一个依赖完成时立即启动
+        
+        Args:
+            topological_order (list): 拓扑排序后的节点ID列表
+        
+        Returns:
+            dict: 所有任务的执行结果
+        """
+        start_time = self._begin_run('并行')
+        
+        pending_deps = self._initial_pending_deps(topological_order)
+        running = {}
+        waiter = asyncio.Event()
+        self._cancel_waiter = (asyncio.get_running_loop(), waiter)
+        cancel_task = asyncio.ensure_future(waiter.wait())
+        
+        def start(node_id):
+            if self.trace is not None:
+                self._ready_ns[node_id] = self.trace.now()
+            task = asyncio.ensure_future(self._run_cached(node_id))
+            running[task] = node_id
+        
+        for node_id in topological_order:
+            if pending_deps[node_id] == 0:
+                del pending_deps[node_id]
+                start(node_id)
+        
+        try:
+            while running and not self.cancel_event.is_set():
+                done, _ = await asyncio.wait(
+                    [cancel_task, *running], return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task is cancel_task:
+                        continue
+                    node_id = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        # 记录失败并跳过所有下游节点
+                        self._errors[node_id] = error
+                        self._skip_descendants(node_id, pending_deps)
+                        if self.failure_policy == 'fail_fast':
+                            self.cancel_event.set()
+                        continue
+                    
+                    result = task.result()
+                    self.results[node_id] = result
+                    self.events.emit('node_completed', node_id, result=result)
+                    self._store_cache(node_id, result)
+                    self._save_checkpoint(node_id, result)
+                    
+                    for dependent_id in self.dag.nodes[node_id].dependents:
+                        if dependent_id in pending_deps:
+                            pending_deps[dependent_id] -= 1
+                            if pending_deps[dependent_id] == 0:
+                                del pending_deps[dependent_id]
+                                start(dependent_id)
+        finally:
+            # 快速失败、取消或调用方中断时取消仍在运行的协程
+            self._cancel_waiter = (None, None)
+            cancel_task.cancel()
+            for task in running:
+                task.cancel()
+        
+        return self._finish_run(topological_order, start_time)
+    
+    async def _run_cached(self, node_id):
+        """
+        命中缓存时直接返回缓存结果，否则执行节点
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            any: 任务执行结果
+        """
+        hit, result = self._lookup_cache(node_id)
+        if hit:
+            return result
+        return await self._run_with_retries(node_id)
+    
+    async def _run_with_retries(self, node_id):
+        """
+        按节点的超时与重试设置执行节点，退避等待期间不占用工作线程
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            any: 任务执行结果
+        """
+        settings = get_retry_settings(self.dag.nodes[node_id].data)
+        while True:
+            self._attempts[node_id] = self._attempts.get(node_id, 0) + 1
+            try:
+                if settings.timeout is None:
+                    return await self._run_node(node_id)
+                try:
+                    return await asyncio.wait_for(self._run_node(node_id), settings.timeout)
+                except asyncio.TimeoutError:
+                    raise self._timeout_error(node_id) from None
+            except Exception as e:
+                delay = self._retry_delay(node_id, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+    
+    async def _run_node(self, node_id):
+        """
+        执行单个节点的任务
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            any: 任务执行结果
+        """
+        node = self.dag.nodes[node_id]
+        start_ns = self.trace.now() if self.trace is not None else 0
+        
+        # 更新节点状态
+        node.state = 'running'
+        self.events.emit('node_started', node_id)
+        
+        try:
+            task_func, task_args, task_kwargs = self._prepare_call(node_id)
+            
+            if not task_func:
+                # 如果没有任务函数，直接返回节点ID
+                result = node_id
+            elif asyncio.iscoroutinefunction(task_func):
+                result = await task_func(*task_args, **task_kwargs)
+            else:
+                result = await self._run_sync(node_id, task_func, task_args, task_kwargs)
+            
+            node.state = 'completed'
+            self._trace_node(node_id, start_ns, result)
+            return result
+        
+        except Exception as e:
+            node.state = 'failed'
+            self._trace_node(node_id, start_ns, status='failed')
+            self.events.emit('node_failed', node_id, level='error', error=e)
+            raise
+    
+    async def _run_sync(self, node_id, task_func, task_args, task_kwargs):
+        """
+        按节点的执行后端运行同步任务函数
+        
+        Args:
+            node_id (str): 节点ID
+            task_func (callable): 任务函数
+            task_args (list): 位置参数
+            task_kwargs (dict): 关键字参数
+        
+        Returns:
+            any: 任务执行结果
+        """
+        backend = self._get_backend(node_id)
+        if backend == 'inline':
+            return task_func(*task_args, **task_kwargs)
+        
+        if backend == 'process':
+            executor = self.pool.get_process_executor()
+        else:
+            executor = self.pool.get_executor(self.dag.nodes[node_id].data.get('pool'))
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, _invoke, task_func, task_args, task_kwargs)
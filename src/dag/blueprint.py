@@ -0,0 +1,265 @@
+from .dag import DAG
+
+# Param 没有默认值时的占位对象
+REQUIRED = object()
+
+
+class Param:
+    """
+    蓝图中的参数占位符，实例化时替换为请求参数中的值
+    
+    可以直接作为节点数据的值，或者出现在节点数据的元组、列表和字典中，例如
+    'args': (Param('query', '示例查询'),)。
+    
+    Attributes:
+        name (str): 参数名称
+        default (any): 请求中没有该参数时使用的默认值，REQUIRED 表示必须提供
+    """
+    
+    __slots__ = ('name', 'default')
+    
+    def __init__(self, name, default=REQUIRED):
+        """
+        初始化参数占位符
+        
+        Args:
+            name (str): 参数名称
+            default (any, optional): 默认值，不提供时该参数必须出现在请求参数中
+        """
+        self.name = name
+        self.default = default
+    
+    def resolve(self, params):
+        """
+        从请求参数中取出参数值
+        
+        Args:
+            params (dict): 请求参数
+        
+        Returns:
+            any: 参数值
+        
+        Raises:
+            ValueError: 缺少必需的参数
+        """
+        value = params.get(self.name, self.default)
+        if value is REQUIRED:
+            raise ValueError(f"缺少参数 {self.name}")
+        return value
+    
+    def __repr__(self):
+        """
+        返回参数占位符的字符串表示
+        """
+        if self.default is REQUIRED:
+            return f"Param({self.name!r})"
+        return f"Param({self.name!r}, default={self.default!r})"
+
+
+def _contains_param(value):
+    if isinstance(value, Param):
+        return True
+    if isinstance(value, (tuple, list)):
+        return any(_contains_param(item) for item in value)
+    if isinstance(value, dict):
+        return any(_contains_param(item) for item in value.values())
+    return False
+
+
+def _collect_params(value, found):
+    if isinstance(value, Param):
+        found.setdefault(value.name, value)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _collect_params(item, found)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_params(item, found)
+
+
+def _bind(value, params):
+    if isinstance(value, Param):
+        return value.resolve(params)
+    if isinstance(value, tuple):
+        return tuple(_bind(item, params) for item in value)
+    if isinstance(value, list):
+        return [_bind(item, params) for item in value]
+    if isinstance(value, dict):
+        return {key: _bind(item, params) for key, item in value.items()}
+    return value
+
+
+class Blueprint:
+    """
+    DAG蓝图：预先构建、校验并拓扑排序的工作流结构
+    
+    同一类请求的DAG结构总是相同的，只有参数不同。蓝图在 compile() 时做一次
+    环检测和拓扑排序，并记录节点数据中哪些键包含 Param 占位符；之后每次
+    instantiate() 只复制节点数据、替换占位符并按记录的顺序添加节点和边，
+    不再做环检测，新DAG直接带上缓存的拓扑顺序。
+    
+    例如:
+        
+        blueprint = Blueprint(output='report')
+        blueprint.add_node('load', {'func': load, 'args': (Param('query'),)})
+        blueprint.add_node('report', {'func': report, 'args': (None,)})
+        blueprint.add_edge('load', 'report')
+        dag = blueprint.instantiate({'query': 'sales'})
+    
+    Attributes:
+        name (str): 蓝图名称
+        output (str): 最终节点ID，实例化后的结果从该节点读取
+        order (tuple): 编译后的拓扑顺序，未编译时为None
+    """
+    
+    def __init__(self, name=None, output=None):
+        """
+        初始化蓝图
+        
+        Args:
+            name (str, optional): 蓝图名称
+            output (str, optional): 最终节点ID
+        """
+        self.name = name
+        self.output = output
+        self.order = None
+        self._dag = DAG()
+        self._nodes = None  # [(节点ID, 节点数据模板, 包含占位符的键)]
+        self._edges = None  # [(源节点ID, 目标节点ID, 边数据)]
+    
+    @property
+    def compiled(self):
+        """
+        蓝图是否已编译
+        """
+        return self.order is not None
+    
+    def add_node(self, node_id, data=None):
+        """
+        添加节点
+        
+        Args:
+            node_id (str): 节点ID
+            data (dict, optional): 节点数据，可以包含 Param 占位符
+        
+        Returns:
+            Blueprint: 蓝图本身，便于链式调用
+        
+        Raises:
+            ValueError: 蓝图已编译，或者节点已存在
+        """
+        self._check_mutable()
+        self._dag.add_node(node_id, data)
+        return self
+    
+    def add_edge(self, source_id, target_id, data=None):
+        """
+        添加边（依赖关系），环在添加时立即检测
+        
+        Args:
+            source_id (str): 源节点ID
+            target_id (str): 目标节点ID
+            data (any, optional): 边数据，所有实例共享
+        
+        Returns:
+            Blueprint: 蓝图本身，便于链式调用
+        
+        Raises:
+            ValueError: 蓝图已编译，节点不存在，或者添加边会导致环
+        """
+        self._check_mutable()
+        self._dag.add_edge(source_id, target_id, data)
+        return self
+    
+    def _check_mutable(self):
+        if self.compiled:
+            raise ValueError(f"蓝图 {self.name} 已编译，不能再修改")
+    
+    def compile(self):
+        """
+        编译蓝图：拓扑排序并记录每个节点需要绑定参数的键，只需执行一次
+        
+        Returns:
+            Blueprint: 蓝图本身
+        
+        Raises:
+            ValueError: 最终节点不存在
+        """
+        if self.compiled:
+            return self
+        if self.output is not None and self.output not in self._dag.nodes:
+            raise ValueError(f"最终节点 {self.output} 不存在")
+        
+        self._nodes = [
+            (
+                node_id,
+                node.data,
+                tuple(key for key, value in node.data.items() if _contains_param(value))
+                if isinstance(node.data, dict) else ()
+            )
+            for node_id, node in self._dag.nodes.items()
+        ]
+        self._edges = [(edge.source, edge.target, edge.data) for edge in self._dag.edges]
+        self.order = tuple(self._dag.topological_sort())
+        return self
+    
+    @property
+    def params(self):
+        """
+        蓝图中出现的所有参数占位符
+        
+        Returns:
+            dict: 参数名称 -> Param
+        """
+        found = {}
+        for node in self._dag.nodes.values():
+            _collect_params(node.data, found)
+        return found
+    
+    def instantiate(self, params=None, dag=None, prefix=''):
+        """
+        用请求参数实例化蓝图
+        
+        每个实例拥有独立的节点数据字典（执行器和优化器可以安全地修改），
+        不含占位符的值在实例间共享。
+        
+        Args:
+            params (dict, optional): 请求参数，用于替换 Param 占位符
+            dag (DAG, optional): 要添加节点的DAG，默认创建新的DAG
+            prefix (str, optional): 节点ID前缀，用于在共享DAG中区分不同请求的节点
+        
+        Returns:
+            DAG: 添加了蓝图节点的DAG
+        
+        Raises:
+            ValueError: 缺少必需的参数，或者带前缀的节点ID已存在于 dag 中
+        """
+        if not self.compiled:
+            self.compile()
+        params = params or {}
+        created = dag is None
+        if created:
+            dag = DAG()
+        
+        # 蓝图已校验无环，新节点只与彼此相连，不会在已有的DAG中形成环
+        with dag.bulk(validate=False):
+            for node_id, template, param_keys in self._nodes:
+                data = template
+                if isinstance(template, dict):
+                    data = dict(template)
+                    for key in param_keys:
+                        data[key] = _bind(template[key], params)
+                dag.add_node(f"{prefix}{node_id}", data)
+            for source_id, target_id, data in self._edges:
+                dag.add_edge(f"{prefix}{source_id}", f"{prefix}{target_id}", data)
+        
+        # 节点和边的添加顺序与蓝图相同，拓扑顺序可以直接复用
+        if created:
+            dag._order = tuple(f"{prefix}{node_id}" for node_id in self.order)
+        return dag
+    
+    def __repr__(self):
+        """
+        返回蓝图的字符串表示
+        """
+        return f"Blueprint(name={self.name}, nodes={list(self._dag.nodes)}, output={self.output})"
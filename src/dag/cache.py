@@ -0,0 +1,258 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+import types
+from collections import OrderedDict
+
+
+def hash_value(value):
+    """
+    计算任意值的内容摘要
+    
+    优先使用pickle序列化后的SHA-256，无法pickle的值退回到repr。
+    
+    Args:
+        value (any): 要计算摘要的值
+    
+    Returns:
+        str: 十六进制摘要
+    """
+    try:
+        payload = pickle.dumps(value, protocol=4)
+    except Exception:
+        payload = repr(value).encode('utf-8', 'backslashreplace')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _hash_code(code, digest):
+    """
+    将代码对象的字节码、常量和引用的名称写入摘要
+    
+    嵌套的代码对象（推导式、lambda、内部函数）递归展开而不是使用 repr，
+    repr 中包含内存地址，会让同一份代码在不同进程中得到不同的指纹；
+    frozenset 常量按元素排序，不受字符串哈希随机化影响。
+    
+    Args:
+        code (types.CodeType): 代码对象
+        digest (hashlib._Hash): 要更新的摘要
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8', 'backslashreplace'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            digest.update(b'<code>')
+            _hash_code(const, digest)
+        elif isinstance(const, frozenset):
+            digest.update(repr(sorted(map(repr, const))).encode('utf-8', 'backslashreplace'))
+        else:
+            digest.update(repr(const).encode('utf-8', 'backslashreplace'))
+        digest.update(b'\x00')
+
+
+def fingerprint_function(func):
+    """
+    计算任务函数的指纹：模块名、限定名、字节码（包括嵌套的代码对象）、常量、默认参数和闭包变量
+    
+    函数代码或闭包捕获的值发生变化时指纹随之变化，磁盘缓存因此不会返回
+    旧版本代码的结果。绑定方法还包含所绑定对象的摘要，不同实例的同一个
+    方法得到不同的指纹。
+    
+    Args:
+        func (callable): 任务函数
+    
+    Returns:
+        str: 十六进制指纹
+    """
+    bound_to = getattr(func, '__self__', None)
+    func = getattr(func, '__func__', func)
+    digest = hashlib.sha256()
+    if bound_to is not None and not isinstance(bound_to, types.ModuleType):
+        digest.update(hash_value(bound_to).encode())
+    digest.update(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}".encode())
+    
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        _hash_code(code, digest)
+        digest.update(hash_value(getattr(func, '__defaults__', None)).encode())
+        closure = getattr(func, '__closure__', None) or ()
+        digest.update(hash_value([cell.cell_contents for cell in closure]).encode())
+    
+    return digest.hexdigest()
+
+
+def make_cache_key(func, args, kwargs, upstream_digests):
+    """
+    组合任务函数指纹、调用参数和上游结果摘要，生成缓存键
+    
+    Args:
+        func (callable): 任务函数
+        args (tuple): 节点上声明的位置参数（依赖占位符None保持原样）
+        kwargs (dict): 节点上声明的关键字参数
+        upstream_digests (list): 按依赖顺序排列的上游结果摘要
+    
+    Returns:
+        str: 缓存键
+    """
+    digest = hashlib.sha256()
+    digest.update(fingerprint_function(func).encode())
+    digest.update(hash_value(tuple(args)).encode())
+    digest.update(hash_value(sorted(kwargs.items())).encode())
+    for upstream in upstream_digests:
+        digest.update(upstream.encode())
+    return digest.hexdigest()
+
+
+class MemoryCache:
+    """
+    线程安全的内存LRU结果缓存
+    
+    Attributes:
+        maxsize (int): 最多缓存的条目数
+        default_ttl (float): 默认过期时间（秒），None表示永不过期
+    """
+    
+    def __init__(self, maxsize=1024, default_ttl=None):
+        """
+        初始化内存缓存
+        
+        Args:
+            maxsize (int, optional): 最多缓存的条目数，默认1024
+            default_ttl (float, optional): 默认过期时间（秒），默认None
+        """
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        查找缓存
+        
+        Args:
+            key (str): 缓存键
+        
+        Returns:
+            tuple: (是否命中, 缓存值)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+    
+    def set(self, key, value, ttl=None):
+        """
+        写入缓存
+        
+        Args:
+            key (str): 缓存键
+            value (any): 缓存值
+            ttl (float, optional): 过期时间（秒），默认使用default_ttl
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    基于pickle文件的磁盘结果缓存，可在进程重启后复用
+    
+    Attributes:
+        directory (str): 缓存目录
+        default_ttl (float): 默认过期时间（秒），None表示永不过期
+    """
+    
+    def __init__(self, directory, default_ttl=None):
+        """
+        初始化磁盘缓存
+        
+        Args:
+            directory (str): 缓存目录，不存在时自动创建
+            default_ttl (float, optional): 默认过期时间（秒），默认None
+        """
+        self.directory = directory
+        self.default_ttl = default_ttl
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+    
+    def get(self, key):
+        """
+        查找缓存
+        
+        Args:
+            key (str): 缓存键
+        
+        Returns:
+            tuple: (是否命中, 缓存值)
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        
+        if expires_at is not None and expires_at < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False, None
+        return True, value
+    
+    def set(self, key, value, ttl=None):
+        """
+        写入缓存（先写临时文件再原子替换）
+        
+        Args:
+            key (str): 缓存键
+            value (any): 缓存值，必须可以被pickle
+            ttl (float, optional): 过期时间（秒），默认使用default_ttl
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((expires_at, value), f, protocol=4)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # 写入或替换失败时删除临时文件，不在缓存目录中留下残留
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def clear(self):
+        """
+        清空缓存
+        """
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.pkl'):
+                os.remove(os.path.join(self.directory, filename))
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+CHECKPOINT_FORMATS = ('pickle', 'json')
+
+
+class FileCheckpointStore:
+    """
+    基于文件的检查点存储，每次执行（run_id）一个目录，每个节点一个文件
+    
+    Attributes:
+        directory (str): 检查点根目录
+        format (str): 序列化格式 (pickle, json)。json 格式要求节点结果可以被JSON序列化，
+            元组会被还原为列表
+    """
+    
+    def __init__(self, directory, format='pickle'):
+        """
+        初始化文件检查点存储
+        
+        Args:
+            directory (str): 检查点根目录，不存在时自动创建
+            format (str, optional): 序列化格式，默认'pickle'
+        """
+        if format not in CHECKPOINT_FORMATS:
+            raise ValueError(f"不支持的检查点格式: {format}")
+        self.directory = directory
+        self.format = format
+        os.makedirs(directory, exist_ok=True)
+    
+    def _run_dir(self, run_id):
+        return os.path.join(self.directory, str(run_id))
+    
+    def _path(self, run_id, node_id):
+        name = hashlib.sha256(str(node_id).encode()).hexdigest()
+        return os.path.join(self._run_dir(run_id), f"{name}.{'pkl' if self.format == 'pickle' else 'json'}")
+    
+    def save(self, run_id, node_id, fingerprint, result):
+        """
+        写入一个节点的检查点（先写临时文件再原子替换，进程崩溃不会留下半个文件）
+        
+        Args:
+            run_id (str): 执行ID
+            node_id (str): 节点ID
+            fingerprint (str): 节点输入指纹，恢复时用于判断节点定义是否发生变化
+            result (any): 节点执行结果
+        """
+        os.makedirs(self._run_dir(run_id), exist_ok=True)
+        path = self._path(run_id, node_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        entry = {'node_id': node_id, 'fingerprint': fingerprint, 'result': result, 'created_at': time.time()}
+        try:
+            if self.format == 'pickle':
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(entry, f, protocol=4)
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def load(self, run_id):
+        """
+        读取一次执行的所有检查点，损坏的文件被忽略
+        
+        Args:
+            run_id (str): 执行ID
+        
+        Returns:
+            dict: 节点ID -> (输入指纹, 结果)
+        """
+        run_dir = self._run_dir(run_id)
+        if not os.path.isdir(run_dir):
+            return {}
+        
+        entries = {}
+        for filename in os.listdir(run_dir):
+            path = os.path.join(run_dir, filename)
+            try:
+                if filename.endswith('.pkl'):
+                    with open(path, 'rb') as f:
+                        entry = pickle.load(f)
+                elif filename.endswith('.json'):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                else:
+                    continue
+            except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+                continue
+            entries[entry['node_id']] = (entry['fingerprint'], entry['result'])
+        return entries
+    
+    def delete(self, run_id):
+        """
+        删除一次执行的所有检查点
+        
+        Args:
+            run_id (str): 执行ID
+        """
+        run_dir = self._run_dir(run_id)
+        if not os.path.isdir(run_dir):
+            return
+        for filename in os.listdir(run_dir):
+            os.remove(os.path.join(run_dir, filename))
+        os.rmdir(run_dir)
+    
+    def list_runs(self):
+        """
+        获取所有保存了检查点的执行ID
+        
+        Returns:
+            list: 执行ID列表
+        """
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if os.path.isdir(os.path.join(self.directory, name))
+        )
+
+
+class SQLiteCheckpointStore:
+    """
+    基于SQLite的检查点存储，所有执行保存在同一个数据库文件中，结果使用pickle序列化
+    
+    Attributes:
+        path (str): 数据库文件路径
+    """
+    
+    def __init__(self, path):
+        """
+        初始化SQLite检查点存储
+        
+        Args:
+            path (str): 数据库文件路径，不存在时自动创建
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "run_id TEXT NOT NULL, node_id TEXT NOT NULL, fingerprint TEXT, "
+                "result BLOB, created_at REAL, PRIMARY KEY (run_id, node_id))"
+            )
+    
+    def save(self, run_id, node_id, fingerprint, result):
+        """
+        写入一个节点的检查点（每次写入单独提交事务）
+        
+        Args:
+            run_id (str): 执行ID
+            node_id (str): 节点ID
+            fingerprint (str): 节点输入指纹
+            result (any): 节点执行结果，必须可以被pickle
+        """
+        payload = pickle.dumps(result, protocol=4)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                (str(run_id), str(node_id), fingerprint, payload, time.time())
+            )
+    
+    def load(self, run_id):
+        """
+        读取一次执行的所有检查点
+        
+        Args:
+            run_id (str): 执行ID
+        
+        Returns:
+            dict: 节点ID -> (输入指纹, 结果)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node_id, fingerprint, result FROM checkpoints WHERE run_id = ?", (str(run_id),)
+            ).fetchall()
+        return {node_id: (fingerprint, pickle.loads(payload)) for node_id, fingerprint, payload in rows}
+    
+    def delete(self, run_id):
+        """
+        删除一次执行的所有检查点
+        
+        Args:
+            run_id (str): 执行ID
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (str(run_id),))
+    
+    def list_runs(self):
+        """
+        获取所有保存了检查点的执行ID
+        
+        Returns:
+            list: 执行ID列表
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT run_id FROM checkpoints ORDER BY run_id").fetchall()
+        return [row[0] for row in rows]
+    
+    def close(self):
+        """
+        关闭数据库连接
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,269 @@
+import heapq
+from array import array
+from collections import deque
+from .dag import DAG
+
+class CompactDAG:
+    """
+    紧凑的整数索引DAG，适用于数百万条边的超大图
+    
+    节点ID映射为连续的整数下标，边以两个 array('i') 缓冲区按添加顺序存储，
+    查询时按需构建CSR（压缩稀疏行）形式的出边和入边索引。每条边只占用
+    若干个机器整数，而不是一个Edge对象加两个集合条目。
+    
+    CompactDAG 提供与 DAG 相同的构建和遍历接口（add_node、add_edge、
+    topological_sort、get_roots、get_leaves、get_predecessors、get_successors、
+    validate），构建方式等价于 DAG.bulk()：add_edge 不做逐条环检测，
+    环在拓扑排序或 validate() 时统一报告。边数据和重复边检测不受支持。
+    需要执行时可以通过 to_dag() 转换为普通 DAG。
+    
+    Attributes:
+        ids (list[str]): 整数下标到节点ID的映射
+        index (dict): 节点ID到整数下标的映射
+        data (list): 节点数据，按整数下标存储
+    """
+    
+    def __init__(self):
+        """
+        初始化紧凑DAG
+        """
+        self.ids = []
+        self.index = {}
+        self.data = []
+        self._sources = array('i')
+        self._targets = array('i')
+        self._csr = None  # (出边偏移, 出边目标, 入边偏移, 入边源)
+    
+    @classmethod
+    def from_dag(cls, dag):
+        """
+        从普通DAG构建紧凑DAG
+        
+        Args:
+            dag (DAG): 源DAG对象
+        
+        Returns:
+            CompactDAG: 紧凑DAG对象
+        """
+        compact = cls()
+        for node_id, node in dag.nodes.items():
+            compact.add_node(node_id, node.data)
+        for node_id, node in dag.nodes.items():
+            for dep_id in node.dependencies:
+                compact.add_edge(dep_id, node_id)
+        return compact
+    
+    def to_dag(self):
+        """
+        转换为普通DAG，依赖顺序与边的添加顺序一致
+        
+        Returns:
+            DAG: 普通DAG对象
+        """
+        dag = DAG()
+        for node_id, data in zip(self.ids, self.data):
+            dag.add_node(node_id, data)
+        with dag.bulk():
+            for source, target in zip(self._sources, self._targets):
+                dag.add_edge(self.ids[source], self.ids[target])
+        return dag
+    
+    @property
+    def num_nodes(self):
+        """
+        节点数量
+        """
+        return len(self.ids)
+    
+    @property
+    def num_edges(self):
+        """
+        边数量
+        """
+        return len(self._sources)
+    
+    def add_node(self, node_id, data=None):
+        """
+        添加节点
+        
+        Args:
+            node_id (str): 节点ID
+            data (any, optional): 节点数据
+        
+        Returns:
+            int: 节点的整数下标
+        """
+        if node_id in self.index:
+            raise ValueError(f"节点 {node_id} 已存在")
+        
+        position = len(self.ids)
+        self.index[node_id] = position
+        self.ids.append(node_id)
+        self.data.append(data)
+        self._csr = None
+        return position
+    
+    def add_edge(self, source_id, target_id):
+        """
+        添加边（依赖关系），不做逐条环检测
+        
+        Args:
+            source_id (str): 源节点ID
+            target_id (str): 目标节点ID
+        
+        Raises:
+            ValueError: 如果源节点或目标节点不存在，或者是自环边
+        """
+        if source_id not in self.index:
+            raise ValueError(f"源节点 {source_id} 不存在")
+        if target_id not in self.index:
+            raise ValueError(f"目标节点 {target_id} 不存在")
+        if source_id == target_id:
+            raise ValueError(f"添加边 {source_id} -> {target_id} 会导致环")
+        
+        self._sources.append(self.index[source_id])
+        self._targets.append(self.index[target_id])
+        self._csr = None
+    
+    def _build_csr(self):
+        """
+        按需构建CSR索引（计数排序，保持边的添加顺序），复杂度 O(V+E)
+        
+        Returns:
+            tuple: (出边偏移, 出边目标, 入边偏移, 入边源)
+        """
+        if self._csr is None:
+            out_offsets, out_targets = self._group(self._sources, self._targets)
+            in_offsets, in_sources = self._group(self._targets, self._sources)
+            self._csr = (out_offsets, out_targets, in_offsets, in_sources)
+        return self._csr
+    
+    def _group(self, keys, values):
+        """
+        将边按keys分组，返回偏移数组和按组排列的values数组
+        """
+        count = len(self.ids)
+        offsets = array('i', bytes(4 * (count + 1)))
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(count):
+            offsets[i + 1] += offsets[i]
+        
+        grouped = array('i', bytes(4 * len(values)))
+        cursor = offsets[:-1]
+        for key, value in zip(keys, values):
+            grouped[cursor[key]] = value
+            cursor[key] += 1
+        return offsets, grouped
+    
+    def _node_position(self, node_id):
+        position = self.index.get(node_id)
+        if position is None:
+            raise ValueError(f"节点 {node_id} 不存在")
+        return position
+    
+    def get_predecessors(self, node_id):
+        """
+        获取节点的所有前置节点（直接依赖）
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            list: 前置节点ID列表
+        """
+        position = self._node_position(node_id)
+        _, _, in_offsets, in_sources = self._build_csr()
+        return [self.ids[i] for i in in_sources[in_offsets[position]:in_offsets[position + 1]]]
+    
+    def get_successors(self, node_id):
+        """
+        获取节点的所有后置节点（直接被依赖）
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            list: 后置节点ID列表
+        """
+        position = self._node_position(node_id)
+        out_offsets, out_targets, _, _ = self._build_csr()
+        return [self.ids[i] for i in out_targets[out_offsets[position]:out_offsets[position + 1]]]
+    
+    def get_roots(self):
+        """
+        获取所有根节点（没有入边的节点）
+        
+        Returns:
+            list: 根节点ID列表
+        """
+        _, _, in_offsets, _ = self._build_csr()
+        return [node_id for i, node_id in enumerate(self.ids) if in_offsets[i] == in_offsets[i + 1]]
+    
+    def get_leaves(self):
+        """
+        获取所有叶节点（没有出边的节点）
+        
+        Returns:
+            list: 叶节点ID列表
+        """
+        out_offsets, _, _, _ = self._build_csr()
+        return [node_id for i, node_id in enumerate(self.ids) if out_offsets[i] == out_offsets[i + 1]]
+    
+    def topological_sort(self, priority=None):
+        """
+        拓扑排序，返回节点执行顺序，语义与 DAG.topological_sort 相同
+        
+        Args:
+            priority (callable or dict, optional): 节点优先级，就绪节点中优先级高的先输出
+        
+        Returns:
+            list: 节点ID列表，按拓扑顺序排列
+        """
+        out_offsets, out_targets, in_offsets, _ = self._build_csr()
+        count = len(self.ids)
+        in_degree = array('i', (in_offsets[i + 1] - in_offsets[i] for i in range(count)))
+        order = array('i')
+        
+        if priority is None:
+            queue = deque(i for i in range(count) if in_degree[i] == 0)
+            while queue:
+                current = queue.popleft()
+                order.append(current)
+                for neighbor in out_targets[out_offsets[current]:out_offsets[current + 1]]:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        queue.append(neighbor)
+        else:
+            get_priority = priority.get if isinstance(priority, dict) else priority
+            ids = self.ids
+            heap = [(-(get_priority(ids[i]) or 0), i) for i in range(count) if in_degree[i] == 0]
+            heapq.heapify(heap)
+            while heap:
+                current = heapq.heappop(heap)[1]
+                order.append(current)
+                for neighbor in out_targets[out_offsets[current]:out_offsets[current + 1]]:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        heapq.heappush(heap, (-(get_priority(ids[neighbor]) or 0), neighbor))
+        
+        # 检查是否存在环
+        if len(order) != count:
+            raise ValueError("DAG中存在环，无法进行拓扑排序")
+        
+        return [self.ids[i] for i in order]
+    
+    def validate(self):
+        """
+        校验DAG是否无环
+        
+        Raises:
+            ValueError: 如果DAG中存在环
+        """
+        self.topological_sort()
+    
+    def __repr__(self):
+        """
+        返回紧凑DAG的字符串表示
+        """
+        return f"CompactDAG(nodes={self.num_nodes}, edges={self.num_edges})"
@@ -1,13 +1,20 @@
-from .node import Node
+import heapq
+from collections import deque
+from contextlib import contextmanager
+from .node import Node, NodeIdList
 from .edge import Edge
 
 class DAG:
     """
     DAG核心类，管理节点和边，提供DAG的构建和遍历功能
     
+    节点的邻接关系保存在 Node.dependencies / Node.dependents（NodeIdList，兼容列表接口）中，
+    边通过 (源节点ID, 目标节点ID) 索引，节点和边的增删查均为均摊 O(1)
+    （删除节点为 O(度数)）。
+    
     Attributes:
         nodes (dict): 节点字典，key为节点ID，value为Node对象
-        edges (list): 边列表，包含所有Edge对象
+        edges (list): 边列表，包含所有Edge对象（按添加顺序生成的副本，可以整体赋值替换所有边）
     """
     
     def __init__(self):
@@ -15,7 +22,55 @@ class DAG:
         初始化DAG
         """
         self.nodes = {}
-        self.edges = []
+        self._edges = {}  # (源节点ID, 目标节点ID) -> Edge
+        self._check_cycles = True
+        self._order = None  # 缓存的先进先出拓扑顺序，图结构变化时失效
+    
+    @property
+    def edges(self):
+        """
+        所有边的列表，按添加顺序排列
+        
+        每次访问返回新的列表，修改该列表不会改变DAG；需要通过 add_edge、remove_edge
+        或对 edges 整体赋值来修改边。
+        
+        Returns:
+            list: Edge对象列表
+        """
+        return list(self._edges.values())
+    
+    @edges.setter
+    def edges(self, edges):
+        """
+        用给定的边列表替换DAG中的所有边，节点的依赖关系随之重建
+        
+        Args:
+            edges (list): Edge对象列表，边的两端节点必须已存在
+        
+        Raises:
+            ValueError: 如果边的节点不存在，或者新的边构成环（此时保留原来的边）
+        """
+        previous = list(self._edges.values())
+        try:
+            self._reset_edges(edges)
+            if self._check_cycles:
+                self.validate()
+        except ValueError:
+            self._reset_edges(previous)
+            raise
+    
+    def _reset_edges(self, edges):
+        """
+        删除所有边后按顺序添加给定的边，不做环检测
+        
+        Args:
+            edges (list): Edge对象列表
+        """
+        for source_id, target_id in list(self._edges):
+            self.remove_edge(source_id, target_id)
+        with self.bulk(validate=False):
+            for edge in edges:
+                self.add_edge(edge.source, edge.target, edge.data)
     
     def add_node(self, node_id, data=None):
         """
@@ -33,6 +88,7 @@ class DAG:
         
         node = Node(node_id, data)
         self.nodes[node_id] = node
+        self._order = None
         return node
     
     def remove_node(self, node_id):
@@ -45,18 +101,19 @@ class DAG:
         if node_id not in self.nodes:
             raise ValueError(f"节点 {node_id} 不存在")
         
-        # 移除与该节点相关的所有边
-        self.edges = [edge for edge in self.edges if edge.source != node_id and edge.target != node_id]
+        node = self.nodes[node_id]
         
-        # 更新其他节点的依赖关系
-        for node in self.nodes.values():
-            if node_id in node.dependencies:
-                node.remove_dependency(node_id)
-            if node_id in node.dependents:
-                node.remove_dependent(node_id)
+        # 移除与该节点相关的所有边，并更新相邻节点的依赖关系
+        for dep_id in node.dependencies:
+            del self._edges[(dep_id, node_id)]
+            self.nodes[dep_id].remove_dependent(node_id)
+        for dependent_id in node.dependents:
+            del self._edges[(node_id, dependent_id)]
+            self.nodes[dependent_id].remove_dependency(node_id)
         
         # 移除节点
         del self.nodes[node_id]
+        self._order = None
     
     def add_edge(self, source_id, target_id, data=None):
         """
@@ -78,12 +135,18 @@ class DAG:
         if target_id not in self.nodes:
             raise ValueError(f"目标节点 {target_id} 不存在")
         
-        # 检查添加边是否会导致环
-        if self._would_cause_cycle(source_id, target_id):
+        # 重复添加已存在的边不报错，返回已有的边对象，依赖关系不变
+        edge = self._edges.get((source_id, target_id))
+        if edge is not None:
+            return edge
+        
+        # 检查添加边是否会导致环（批量构建模式下延迟到结束时统一校验）
+        if self._check_cycles and self._would_cause_cycle(source_id, target_id):
             raise ValueError(f"添加边 {source_id} -> {target_id} 会导致环")
         
         edge = Edge(source_id, target_id, data)
-        self.edges.append(edge)
+        self._edges[(source_id, target_id)] = edge
+        self._order = None
         
         # 更新节点的依赖关系
         self.nodes[target_id].add_dependency(source_id)
@@ -99,23 +162,83 @@ class DAG:
             source_id (str): 源节点ID
             target_id (str): 目标节点ID
         """
-        edge_to_remove = None
-        for edge in self.edges:
-            if edge.source == source_id and edge.target == target_id:
-                edge_to_remove = edge
-                break
-        
-        if edge_to_remove:
-            self.edges.remove(edge_to_remove)
-            
+        if self._edges.pop((source_id, target_id), None) is not None:
             # 更新节点的依赖关系
             self.nodes[target_id].remove_dependency(source_id)
             self.nodes[source_id].remove_dependent(target_id)
+            self._order = None
+    
+    def redirect_dependents(self, node_id, target_id):
+        """
+        将节点的所有出边改为从另一个节点出发
+        
+        后置节点依赖列表中的位置保持不变（执行时依赖结果按该顺序填入参数），
+        边数据随边一起迁移。
+        
+        Args:
+            node_id (str): 原源节点ID
+            target_id (str): 新源节点ID
+        
+        Raises:
+            ValueError: 如果节点不存在，或者某个后置节点已经依赖 target_id
+        """
+        if node_id not in self.nodes:
+            raise ValueError(f"节点 {node_id} 不存在")
+        if target_id not in self.nodes:
+            raise ValueError(f"节点 {target_id} 不存在")
+        
+        node = self.nodes[node_id]
+        target = self.nodes[target_id]
+        for dependent_id in node.dependents:
+            if (target_id, dependent_id) in self._edges:
+                raise ValueError(f"节点 {dependent_id} 已经依赖 {target_id}")
+        
+        for dependent_id in node.dependents:
+            dependent = self.nodes[dependent_id]
+            dependent.dependencies = NodeIdList(
+                target_id if dep_id == node_id else dep_id for dep_id in dependent.dependencies
+            )
+            edge = self._edges.pop((node_id, dependent_id))
+            edge.source = target_id
+            self._edges[(target_id, dependent_id)] = edge
+            target.add_dependent(dependent_id)
+        node.dependents = NodeIdList()
+        self._order = None
+    
+    def has_edge(self, source_id, target_id):
+        """
+        判断边是否存在
+        
+        Args:
+            source_id (str): 源节点ID
+            target_id (str): 目标节点ID
+        
+        Returns:
+            bool: 边存在返回True，否则返回False
+        """
+        return (source_id, target_id) in self._edges
+    
+    def get_edge(self, source_id, target_id):
+        """
+        获取边对象
+        
+        Args:
+            source_id (str): 源节点ID
+            target_id (str): 目标节点ID
+        
+        Returns:
+            Edge: 边对象，不存在时返回None
+        """
+        return self._edges.get((source_id, target_id))
     
     def _would_cause_cycle(self, source_id, target_id):
         """
         检查添加边是否会导致环
         
+        原图无环，因此新边 source -> target 只有在 target 已经能到达 source 时
+        才会形成环。这里只从 target 出发沿后置节点做一次迭代DFS，
+        复杂度与 target 可达的子图大小成正比，而不是整个图。
+        
         Args:
             source_id (str): 源节点ID
             target_id (str): 目标节点ID
@@ -123,74 +246,153 @@ class DAG:
         Returns:
             bool: 如果会导致环则返回True，否则返回False
         """
-        # 临时添加边
-        temp_edges = self.edges.copy()
-        temp_edges.append(Edge(source_id, target_id))
+        if source_id == target_id:
+            return True
         
-        # 使用DFS检查环
-        visited = set()
-        recursion_stack = set()
-        
-        def has_cycle(node_id):
-            if node_id not in visited:
-                visited.add(node_id)
-                recursion_stack.add(node_id)
-                
-                # 获取所有依赖该节点的节点（即所有以该节点为源的边的目标节点）
-                neighbors = [edge.target for edge in temp_edges if edge.source == node_id]
-                
-                for neighbor in neighbors:
-                    if neighbor not in visited:
-                        if has_cycle(neighbor):
-                            return True
-                    elif neighbor in recursion_stack:
-                        return True
-            
-            recursion_stack.discard(node_id)
-            return False
+        visited = {target_id}
+        stack = [target_id]
         
-        # 检查所有节点
-        for node_id in self.nodes:
-            if has_cycle(node_id):
-                return True
+        while stack:
+            node_id = stack.pop()
+            for neighbor in self.nodes[node_id].dependents:
+                if neighbor == source_id:
+                    return True
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
         
         return False
     
-    def topological_sort(self):
+    @contextmanager
+    def bulk(self, validate=True):
+        """
+        批量构建模式：在上下文中添加边时跳过逐条的环检测，退出时统一校验一次
+        
+        适合一次性构建大型工作流，例如:
+        
+            with dag.bulk():
+                for source, target in edges:
+                    dag.add_edge(source, target)
+        
+        退出时发现环，或上下文中抛出异常时，上下文中新增的节点和边全部撤销，DAG恢复到
+        进入上下文之前的结构（上下文中删除的节点和边不会恢复），然后重新抛出异常。
+        validate=False 时不做撤销，已添加的结构由调用方保证无环。
+        
+        Args:
+            validate (bool, optional): 退出时是否校验无环，默认True。
+                只有在添加的结构已经校验过时（例如从 Blueprint 实例化）才应设为False
+        
+        Raises:
+            ValueError: 如果退出时发现DAG中存在环
+        """
+        previous = self._check_cycles
+        validating = previous and validate
+        if validating:
+            nodes_before = set(self.nodes)
+            edges_before = set(self._edges)
+        
+        self._check_cycles = False
+        try:
+            yield self
+        except BaseException:
+            # 未经检测添加的边可能已经构成环，不能留在DAG中
+            if validating:
+                self._rollback(nodes_before, edges_before)
+            raise
+        finally:
+            self._check_cycles = previous
+        
+        # 上下文正常退出时统一做一次 O(V+E) 的拓扑排序
+        if validating:
+            try:
+                self.validate()
+            except ValueError:
+                self._rollback(nodes_before, edges_before)
+                raise
+    
+    def _rollback(self, nodes_before, edges_before):
+        """
+        删除不在快照中的边和节点，撤销批量构建上下文中新增的结构
+        
+        Args:
+            nodes_before (set): 进入上下文时的节点ID集合
+            edges_before (set): 进入上下文时的 (起始节点ID, 目标节点ID) 集合
+        """
+        for source_id, target_id in [key for key in self._edges if key not in edges_before]:
+            self.remove_edge(source_id, target_id)
+        for node_id in [node_id for node_id in self.nodes if node_id not in nodes_before]:
+            self.remove_node(node_id)
+    
+    def validate(self):
+        """
+        校验DAG是否无环
+        
+        Raises:
+            ValueError: 如果DAG中存在环
+        """
+        self.topological_sort()
+    
+    def topological_sort(self, priority=None):
         """
         拓扑排序，返回节点执行顺序
         
+        使用节点上维护的后置节点列表作为邻接表，时间复杂度 O(V+E)。
+        不带优先级的结果会被缓存，图结构不变时重复调用只需复制一次列表。
+        
+        Args:
+            priority (callable or dict, optional): 节点优先级，可以是 node_id -> 数值 的函数或字典。
+                多个节点同时就绪时优先级高的先输出，优先级相同时按节点添加顺序输出，
+                结果是确定的。默认None，按先进先出顺序输出
+        
         Returns:
             list: 节点ID列表，按拓扑顺序排列
         """
-        # Kahn算法实现拓扑排序
-        in_degree = {node_id: 0 for node_id in self.nodes}
-        
-        # 计算每个节点的入度
-        for edge in self.edges:
-            in_degree[edge.target] += 1
+        if priority is None and self._order is not None:
+            return list(self._order)
         
-        # 将入度为0的节点加入队列
-        queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        # Kahn算法实现拓扑排序
+        in_degree = {node_id: len(node.dependencies) for node_id, node in self.nodes.items()}
         
         topological_order = []
         
-        while queue:
-            current = queue.pop(0)
-            topological_order.append(current)
+        if priority is None:
+            # 将入度为0的节点加入队列
+            queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+            
+            while queue:
+                current = queue.popleft()
+                topological_order.append(current)
+                
+                for neighbor in self.nodes[current].dependents:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        queue.append(neighbor)
+        else:
+            get_priority = priority.get if isinstance(priority, dict) else priority
+            # 节点添加顺序，用于优先级相同时的确定性排序
+            order = {node_id: index for index, node_id in enumerate(self.nodes)}
             
-            # 获取所有依赖该节点的节点（即所有以该节点为源的边的目标节点）
-            neighbors = [edge.target for edge in self.edges if edge.source == current]
+            def entry(node_id):
+                return (-(get_priority(node_id) or 0), order[node_id], node_id)
             
-            for neighbor in neighbors:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
+            heap = [entry(node_id) for node_id, degree in in_degree.items() if degree == 0]
+            heapq.heapify(heap)
+            
+            while heap:
+                current = heapq.heappop(heap)[2]
+                topological_order.append(current)
+                
+                for neighbor in self.nodes[current].dependents:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        heapq.heappush(heap, entry(neighbor))
         
         # 检查是否存在环
         if len(topological_order) != len(self.nodes):
             raise ValueError("DAG中存在环，无法进行拓扑排序")
         
+        if priority is None:
+            self._order = tuple(topological_order)
         return topological_order
     
     def get_roots(self):
@@ -224,7 +426,7 @@ class DAG:
         if node_id not in self.nodes:
             raise ValueError(f"节点 {node_id} 不存在")
         
-        return self.nodes[node_id].dependencies.copy()
+        return list(self.nodes[node_id].dependencies)
     
     def get_successors(self, node_id):
         """
@@ -239,7 +441,7 @@ class DAG:
         if node_id not in self.nodes:
             raise ValueError(f"节点 {node_id} 不存在")
         
-        return self.nodes[node_id].dependents.copy()
+        return list(self.nodes[node_id].dependents)
     
     def __repr__(self):
         """
@@ -8,6 +8,9 @@ class Edge:
         data (any): 边存储的数据，通常用于描述依赖关系的属性
     """
     
+    # 使用__slots__去掉每个实例的__dict__，降低大图的内存占用
+    __slots__ = ('source', 'target', 'data')
+    
     def __init__(self, source, target, data=None):
         """
         初始化边
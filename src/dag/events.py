@@ -0,0 +1,251 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+# 事件级别，silent 表示完全静默
+LEVELS = {
+    'debug': 10,
+    'info': 20,
+    'warning': 30,
+    'error': 40,
+    'silent': 100
+}
+
+# 各类事件的默认消息模板
+MESSAGES = {
+    'run_started': '开始{mode}执行DAG...',
+    'run_completed': 'DAG执行完成，总耗时: {elapsed:.2f}秒',
+    'incremental_plan': '增量执行: {dirty}/{total} 个节点需要重新执行',
+    'node_started': '开始执行节点 {node_id}',
+    'node_completed': '节点 {node_id} 执行完成，结果: {result}',
+    'node_failed': '节点 {node_id} 执行失败: {error}',
+    'node_cache_hit': '节点 {node_id} 命中缓存，跳过执行',
+    'node_skipped': '节点 {node_id} 因上游节点 {cause} 失败被跳过',
+    'node_retry': '节点 {node_id} 第 {attempt}/{retries} 次重试将在 {delay:.2f}秒后开始: {error}',
+    'cache_store_failed': '节点 {node_id} 的结果写入缓存失败: {error}',
+    'checkpoint_failed': '节点 {node_id} 的检查点写入失败: {error}',
+    'checkpoint_resumed': '从检查点 {run_id} 恢复了 {restored} 个节点的结果',
+    'templates_reloaded': '模板目录 {directory} 已更新: 重新加载 {loaded} 个，移除 {removed} 个，失败 {failed} 个',
+    'templates_reload_failed': '模板目录 {directory} 重新加载失败: {error}',
+    'task_message': '{message}'
+}
+
+# 所有事件分发器，fork 后在子进程中重置它们的后台线程状态
+_dispatchers = weakref.WeakSet()
+
+
+class ExecutionEvent(namedtuple('ExecutionEvent', ['kind', 'level', 'node_id', 'timestamp', 'data'])):
+    """
+    结构化执行事件
+    
+    Attributes:
+        kind (str): 事件类型，例如 node_started、node_completed、node_failed、node_cache_hit
+        level (str): 事件级别 (debug, info, warning, error)
+        node_id (str): 相关节点ID，没有时为None
+        timestamp (float): 事件发生的时间戳
+        data (dict): 事件附带的数据，例如结果、异常、耗时
+    """
+    
+    __slots__ = ()
+    
+    def format(self):
+        """
+        按事件类型的消息模板生成可读文本（只在输出时格式化，发出事件时不做字符串拼接）
+        
+        Returns:
+            str: 事件文本
+        """
+        template = MESSAGES.get(self.kind)
+        if template is None:
+            return f"[{self.kind}] {self.node_id or ''} {self.data}"
+        return template.format(node_id=self.node_id, **self.data)
+
+
+class PrintSink:
+    """
+    将事件文本打印到标准输出的事件接收器
+    """
+    
+    def __call__(self, event):
+        print(event.format())
+
+
+class ListSink:
+    """
+    将事件保存在列表中的事件接收器，适合测试和事后分析
+    
+    Attributes:
+        events (list): 收到的事件列表
+    """
+    
+    def __init__(self):
+        self.events = []
+    
+    def __call__(self, event):
+        self.events.append(event)
+
+
+class EventDispatcher:
+    """
+    非阻塞的结构化事件分发器
+    
+    emit() 只做级别判断和一次入队，事件由后台线程交给各个事件接收器处理，
+    工作线程因此不会被标准输出等慢速I/O串行化。低于当前级别的事件在入队前
+    即被丢弃；级别设为 'silent' 时完全静默。
+    
+    Attributes:
+        sinks (list): 事件接收器列表，每个接收器是接收 ExecutionEvent 的可调用对象
+        level (str): 当前事件级别
+    """
+    
+    def __init__(self, sinks=None, level='info', background=True):
+        """
+        初始化事件分发器
+        
+        Args:
+            sinks (list, optional): 事件接收器列表，默认只有 PrintSink
+            level (str, optional): 事件级别，默认'info'
+            background (bool, optional): 是否在后台线程中分发事件，默认True；
+                为False时在调用线程中同步分发
+        """
+        self.sinks = list(sinks) if sinks is not None else [PrintSink()]
+        self.background = background
+        self.set_level(level)
+        self._queue = queue.SimpleQueue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        _dispatchers.add(self)
+    
+    def _reset_after_fork(self):
+        """
+        fork 后在子进程中调用：后台线程不会被复制到子进程，丢弃继承的队列、计数和锁，
+        下一次 emit() 时在子进程中重新启动后台线程（例如进程后端的工作进程）
+        """
+        self._queue = queue.SimpleQueue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def set_level(self, level):
+        """
+        设置事件级别
+        
+        Args:
+            level (str): 事件级别 (debug, info, warning, error, silent)
+        """
+        if level not in LEVELS:
+            raise ValueError(f"不支持的事件级别: {level}")
+        self.level = level
+        self._threshold = LEVELS[level]
+    
+    def is_enabled(self, level='info'):
+        """
+        判断指定级别的事件是否会被分发
+        
+        Args:
+            level (str, optional): 事件级别，默认'info'
+        
+        Returns:
+            bool: 会被分发返回True
+        """
+        return LEVELS[level] >= self._threshold and bool(self.sinks)
+    
+    def emit(self, kind, node_id=None, level='info', **data):
+        """
+        发出事件
+        
+        Args:
+            kind (str): 事件类型
+            node_id (str, optional): 相关节点ID
+            level (str, optional): 事件级别，默认'info'
+            **data: 事件附带的数据
+        """
+        if LEVELS[level] < self._threshold or not self.sinks:
+            return
+        
+        event = ExecutionEvent(kind, level, node_id, time.time(), data)
+        if not self.background:
+            self._deliver(event)
+            return
+        
+        if self._thread is None:
+            self._start()
+        with self._idle:
+            self._pending += 1
+        self._queue.put(event)
+    
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name='dag-events', daemon=True)
+                thread.start()
+                self._thread = thread
+    
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            self._deliver(event)
+            with self._idle:
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+    
+    def _deliver(self, event):
+        for sink in self.sinks:
+            try:
+                sink(event)
+            except Exception:
+                # 事件接收器的错误不能影响任务执行
+                pass
+    
+    def flush(self, timeout=None):
+        """
+        等待已发出的事件全部分发完毕
+        
+        Args:
+            timeout (float, optional): 最长等待时间（秒），默认一直等待
+        
+        Returns:
+            bool: 全部分发完毕返回True，超时返回False
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+
+def _after_fork_in_child():
+    for dispatcher in list(_dispatchers):
+        dispatcher._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+_default_dispatcher = EventDispatcher()
+atexit.register(_default_dispatcher.flush, 5)
+
+
+def get_default_dispatcher():
+    """
+    获取进程级默认事件分发器（后台线程 + PrintSink）
+    
+    Returns:
+        EventDispatcher: 默认事件分发器
+    """
+    return _default_dispatcher
+
+
+def set_level(level):
+    """
+    设置默认事件分发器的级别，'silent' 表示关闭所有执行和任务输出
+    
+    Args:
+        level (str): 事件级别 (debug, info, warning, error, silent)
+    """
+    _default_dispatcher.set_level(level)
@@ -1,6 +1,45 @@
+import heapq
+import itertools
+import queue
 import threading
 import time
+import uuid
+from .cache import hash_value, make_cache_key
 from .dag import DAG
+from .events import get_default_dispatcher
+from .pool import WorkerPool
+from .retry import NodeTimeoutError, backoff_delay, get_retry_settings
+from .scheduling import SCHEDULING_POLICIES, estimate_durations, upward_ranks
+from .trace import PROCESS_TID, ExecutionTrace
+
+BACKENDS = ('thread', 'process', 'inline')
+FAILURE_POLICIES = ('fail_fast', 'continue', 'skip_descendants')
+
+# 工作线程开始执行节点时放入完成队列的结果占位，调度循环据此开始计算超时
+_STARTED = object()
+
+
+class DAGExecutionError(RuntimeError):
+    """
+    DAG执行失败或被取消时抛出的异常
+    
+    Attributes:
+        report (dict): 结构化执行报告，包含已完成、失败、跳过和取消的节点
+        errors (dict): 失败节点ID到原始异常的映射
+    """
+    
+    def __init__(self, message, report, errors=None):
+        super().__init__(message)
+        self.report = report
+        self.errors = errors or {}
+
+
+def _invoke(func, args, kwargs):
+    """
+    在工作进程中调用任务函数（模块级函数，便于被pickle）
+    """
+    return func(*args, **kwargs)
+
 
 class DAGExecutor:
     """
@@ -10,37 +49,320 @@ class DAGExecutor:
         dag (DAG): 要执行的DAG对象
         results (dict): 任务执行结果，key为节点ID，value为执行结果
         lock (threading.Lock): 线程锁，用于保护共享资源
+        pool (WorkerPool): 并行执行使用的工作线程池
+        backend (str): 默认执行后端 (thread, process, inline)
+        cache (MemoryCache or DiskCache): 节点结果缓存，None表示不缓存
+        scheduling (str): 就绪节点多于空闲工作线程时的调度策略 (fifo, critical_path)
+        history (DurationHistory): 节点历史执行耗时记录
+        trace (ExecutionTrace): 节点级执行追踪，None表示不追踪
+        events (EventDispatcher): 结构化执行事件分发器
+        failure_policy (str): 节点失败时的处理策略 (fail_fast, continue, skip_descendants)
+        report (dict): 最近一次执行的结构化报告
+        cancel_event (threading.Event): 协作式取消信号，执行被取消或快速失败时置位
+        checkpoint (FileCheckpointStore or SQLiteCheckpointStore): 检查点存储，None表示不保存检查点
+        run_id (str): 本执行器写入检查点使用的执行ID
     """
     
-    def __init__(self, dag):
+    def __init__(self, dag, max_workers=None, pool=None, pool_limits=None, backend='thread', cache=None,
+                 scheduling='fifo', history=None, trace=None, events=None, failure_policy='fail_fast',
+                 checkpoint=None, run_id=None):
         """
         初始化DAG执行器
         
         Args:
             dag (DAG): 要执行的DAG对象
+            max_workers (int, optional): 并行执行的最大线程数，传入pool时忽略
+            pool (WorkerPool, optional): 共享的工作线程池，可在多个执行器间复用
+            pool_limits (dict, optional): 子池并发上限，例如 {'io': 32, 'cpu': 4}，传入pool时忽略
+            backend (str, optional): 默认执行后端，可被节点数据中的 'backend' 键覆盖，默认'thread'
+            cache (MemoryCache or DiskCache, optional): 节点结果缓存，可在多个执行器间共享。
+                节点数据中 'cache': False 表示不缓存该节点，'cache_ttl' 设置该节点结果的过期时间（秒）
+            scheduling (str, optional): 调度策略，默认'fifo'按拓扑顺序；'critical_path' 优先执行
+                向上秩（到汇点的最长剩余路径）最大的就绪节点
+            history (DurationHistory, optional): 历史耗时记录，执行完成的节点耗时会写入其中，
+                critical_path 策略优先使用它估计节点耗时，其次使用节点数据中的 'estimated_duration'
+            trace (bool or ExecutionTrace, optional): 为True时创建新的执行追踪，也可以传入共享的
+                ExecutionTrace；记录每个节点的开始/结束时间、线程、排队等待时间和结果大小
+            events (EventDispatcher, optional): 执行事件分发器，默认使用进程级默认分发器
+                （后台线程输出到标准输出，可通过 events.set_level('silent') 关闭）
+            failure_policy (str, optional): 节点失败时的处理策略，默认'fail_fast'
+                - fail_fast: 停止调度新节点，取消正在运行的节点，立即抛出 DAGExecutionError
+                - continue: 跳过失败节点的所有下游节点，继续执行独立分支，结束后抛出 DAGExecutionError
+                - skip_descendants: 同 continue，但不抛出异常，返回部分结果，失败信息见 report
+                需要感知取消的任务可以在 kwargs 中声明 'cancel_event' 键，执行时会被替换为 cancel_event
+                （process 后端的节点除外：threading.Event 不能发送到工作进程，保留声明的值）
+            checkpoint (FileCheckpointStore or SQLiteCheckpointStore, optional): 检查点存储，
+                每个节点完成时立即写入其结果，进程崩溃后可以用 resume(run_id) 跳过已完成的节点
+            run_id (str, optional): 检查点的执行ID，默认在启用检查点时随机生成
+        
+        节点数据中可以设置 timeout、retries、backoff、max_backoff 和 jitter（见 retry.get_retry_settings）。
+        超时从节点提交时开始计时，超时的尝试按失败处理，其工作线程无法被强制终止，迟到的结果会被丢弃；
+        等待重试的节点不占用工作线程，由调度循环在退避时间到期后重新放入就绪队列。
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"不支持的执行后端: {backend}")
+        if failure_policy not in FAILURE_POLICIES:
+            raise ValueError(f"不支持的失败处理策略: {failure_policy}")
+        if scheduling not in SCHEDULING_POLICIES:
+            raise ValueError(f"不支持的调度策略: {scheduling}")
+        
         self.dag = dag
         self.results = {}
         self.lock = threading.Lock()
+        self.backend = backend
+        self.cache = cache
+        self.scheduling = scheduling
+        self.history = history
+        self.trace = ExecutionTrace() if trace is True else (trace or None)
+        self.events = events if events is not None else get_default_dispatcher()
+        self.failure_policy = failure_policy
+        self.checkpoint = checkpoint
+        self.run_id = run_id if run_id is not None or checkpoint is None else uuid.uuid4().hex
+        self.report = None
+        self.cancel_event = threading.Event()
+        self._errors = {}
+        self._skipped = []
+        self._futures = {}
+        self._attempts = {}
+        self._completions = None
+        self._ready_ns = {}
+        self._durations = {}
+        self._cache_keys = {}
+        self._result_digests = {}
+        self._input_fingerprints = {}
+        self._invalidated = set()
+        self._owns_pool = pool is None
+        self.pool = pool if pool is not None else WorkerPool(max_workers=max_workers, limits=pool_limits)
     
-    def execute(self, parallel=True):
+    def execute(self, parallel=True, incremental=False):
         """
         执行DAG中的所有任务
         
         Args:
             parallel (bool, optional): 是否并行执行不相关的任务，默认True
+            incremental (bool, optional): 是否增量执行，默认False。为True时复用上一次执行的结果，
+                只重新执行输入（任务函数或参数）发生变化、被invalidate()标记的节点及其所有下游节点
         
         Returns:
             dict: 所有任务的执行结果
         """
+        # 全量执行时丢弃同一执行ID的旧检查点，避免恢复时混用两次执行的结果
+        if self.checkpoint is not None and not incremental:
+            self.checkpoint.delete(self.run_id)
+        
         # 获取拓扑排序
-        topological_order = self.dag.topological_sort()
+        topological_order = self._plan(self.dag.topological_sort(), incremental)
         
         if parallel:
             return self._execute_parallel(topological_order)
         else:
             return self._execute_serial(topological_order)
     
+    def resume(self, run_id=None, parallel=True):
+        """
+        从检查点恢复执行：已完成且输入未变化的节点直接使用检查点中的结果，
+        其余节点及其所有下游节点重新执行（与增量执行使用相同的脏节点计算）
+        
+        Args:
+            run_id (str, optional): 要恢复的执行ID，默认使用本执行器的 run_id
+            parallel (bool, optional): 是否并行执行，默认True
+        
+        Returns:
+            dict: 所有任务的执行结果
+        
+        Raises:
+            ValueError: 执行器没有配置检查点存储
+        """
+        self._restore_checkpoint(run_id)
+        return self.execute(parallel=parallel, incremental=True)
+    
+    def _restore_checkpoint(self, run_id):
+        """
+        将检查点中的节点结果和输入指纹载入执行器，作为增量执行的上一次结果
+        
+        Args:
+            run_id (str): 要恢复的执行ID，None表示使用本执行器的 run_id
+        """
+        if self.checkpoint is None:
+            raise ValueError("执行器没有配置检查点存储，无法恢复执行")
+        if run_id is not None:
+            self.run_id = run_id
+        
+        saved = {
+            node_id: entry for node_id, entry in self.checkpoint.load(self.run_id).items()
+            if node_id in self.dag.nodes
+        }
+        self.results = {node_id: result for node_id, (_, result) in saved.items()}
+        self._result_digests = {}
+        self._input_fingerprints = {node_id: fingerprint for node_id, (fingerprint, _) in saved.items()}
+        self.events.emit('checkpoint_resumed', run_id=self.run_id, restored=len(saved))
+    
+    def cancel(self):
+        """
+        取消正在进行的执行：不再调度新节点，已提交但未开始的节点被撤销，
+        正在运行的节点通过 cancel_event 收到协作式取消信号。可以从任意线程调用。
+        """
+        self.cancel_event.set()
+        completions = self._completions
+        if completions is not None:
+            # 唤醒调度循环
+            completions.put((None, None, None, None))
+    
+    def invalidate(self, node_ids):
+        """
+        标记节点需要在下一次增量执行时重新执行（其下游节点也会随之重新执行）
+        
+        Args:
+            node_ids (iterable): 节点ID列表
+        """
+        self._invalidated.update(node_ids)
+    
+    def _input_snapshot(self, node_id):
+        """
+        记录节点自身输入（任务函数和声明的参数，不含上游结果），只复制容器，不计算指纹
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            tuple: (任务函数, 位置参数, 关键字参数)
+        """
+        data = self.dag.nodes[node_id].data or {}
+        return (data.get('func'), tuple(data.get('args', ())), dict(data.get('kwargs', {})))
+    
+    @staticmethod
+    def _fingerprint(entry):
+        """
+        计算输入快照的指纹；从检查点恢复的条目已经是指纹，原样返回
+        
+        Args:
+            entry (tuple or str): _input_snapshot() 的结果、指纹或None
+        
+        Returns:
+            str: 十六进制指纹，entry 为None时返回None
+        """
+        if entry is None or isinstance(entry, str):
+            return entry
+        func, args, kwargs = entry
+        return make_cache_key(func, args, kwargs, [])
+    
+    def _input_changed(self, previous, current):
+        """
+        判断节点输入相对上一次执行是否变化
+        
+        任务函数和每个参数值都是同一个对象时直接视为未变化，不计算指纹；
+        因此原地修改参数对象（而不是替换参数）不会被检测到，需要时使用 invalidate()。
+        
+        Args:
+            previous (tuple or str): 上一次的输入快照或检查点中的指纹，None表示没有记录
+            current (tuple): 本次的输入快照
+        
+        Returns:
+            bool: 输入变化返回True
+        """
+        if isinstance(previous, tuple):
+            func, args, kwargs = previous
+            if (
+                func is current[0]
+                and len(args) == len(current[1])
+                and all(a is b for a, b in zip(args, current[1]))
+                and kwargs.keys() == current[2].keys()
+                and all(value is current[2][key] for key, value in kwargs.items())
+            ):
+                return False
+        return self._fingerprint(previous) != self._fingerprint(current)
+    
+    def _plan(self, topological_order, incremental):
+        """
+        计算本次需要执行的节点
+        
+        全量执行时返回所有节点。增量执行时，将输入指纹变化、没有上次结果或被显式
+        标记的节点作为变化源，沿 Node.dependents 向下游遍历得到脏节点集合，
+        其余节点保留上一次的结果。
+        
+        Args:
+            topological_order (list): 拓扑排序后的节点ID列表
+            incremental (bool): 是否增量执行
+        
+        Returns:
+            list: 需要执行的节点ID列表，保持拓扑顺序
+        """
+        # 只记录输入快照，指纹在下一次增量执行比较或写入检查点时才计算，
+        # 全量执行因此不需要为每个节点做序列化和哈希
+        snapshots = {node_id: self._input_snapshot(node_id) for node_id in topological_order}
+        previous = self._input_fingerprints
+        self._input_fingerprints = snapshots
+        invalidated = self._invalidated
+        self._invalidated = set()
+        
+        if not incremental:
+            self.results = {}
+            self._result_digests = {}
+            return topological_order
+        
+        # 丢弃已从DAG中移除的节点的结果
+        for node_id in list(self.results):
+            if node_id not in self.dag.nodes:
+                del self.results[node_id]
+                self._result_digests.pop(node_id, None)
+        
+        changed = [
+            node_id for node_id in topological_order
+            if node_id in invalidated
+            or node_id not in self.results
+            or self._input_changed(previous.get(node_id), snapshots[node_id])
+        ]
+        
+        dirty = set(changed)
+        stack = list(changed)
+        while stack:
+            for dependent_id in self.dag.nodes[stack.pop()].dependents:
+                if dependent_id not in dirty:
+                    dirty.add(dependent_id)
+                    stack.append(dependent_id)
+        
+        for node_id in topological_order:
+            if node_id in dirty:
+                self.results.pop(node_id, None)
+                self._result_digests.pop(node_id, None)
+            else:
+                self.dag.nodes[node_id].state = 'completed'
+        
+        self.events.emit('incremental_plan', dirty=len(dirty), total=len(topological_order))
+        return [node_id for node_id in topological_order if node_id in dirty]
+    
+    def _initial_pending_deps(self, topological_order):
+        """
+        计算待执行节点的剩余依赖数量（入度），只统计同样待执行的依赖节点
+        
+        Args:
+            topological_order (list): 待执行的节点ID列表
+        
+        Returns:
+            dict: 节点ID到剩余依赖数量的映射
+        """
+        if len(topological_order) == len(self.dag.nodes):
+            return {
+                node_id: len(self.dag.nodes[node_id].dependencies)
+                for node_id in topological_order
+            }
+        
+        scheduled = set(topological_order)
+        return {
+            node_id: sum(1 for dep_id in self.dag.nodes[node_id].dependencies if dep_id in scheduled)
+            for node_id in topological_order
+        }
+    
+    def shutdown(self, wait=True):
+        """
+        关闭执行器自己创建的工作线程池，共享的线程池由其所有者负责关闭
+        
+        Args:
+            wait (bool, optional): 是否等待正在执行的任务完成，默认True
+        """
+        if self._owns_pool:
+            self.pool.shutdown(wait=wait)
+    
     def _execute_serial(self, topological_order):
         """
         串行执行DAG中的任务
@@ -51,68 +373,681 @@ class DAGExecutor:
         Returns:
             dict: 所有任务的执行结果
         """
-        print("开始串行执行DAG...")
-        start_time = time.time()
+        start_time = self._begin_run('串行')
+        pending = self._initial_pending_deps(topological_order)
         
         for node_id in topological_order:
-            result = self._execute_node(node_id)
+            # 失败节点的下游节点已被跳过
+            if node_id not in pending:
+                continue
+            if self.cancel_event.is_set():
+                break
+            del pending[node_id]
+            
+            hit, result = self._lookup_cache(node_id)
+            if not hit:
+                start = time.perf_counter()
+                try:
+                    result = self._execute_node_with_retries(node_id)
+                except Exception as e:
+                    self._errors[node_id] = e
+                    self._skip_descendants(node_id, pending)
+                    if self.failure_policy == 'fail_fast':
+                        self.cancel_event.set()
+                    continue
+                self._durations[node_id] = time.perf_counter() - start
+                self._store_cache(node_id, result)
             self.results[node_id] = result
-            print(f"节点 {node_id} 执行完成，结果: {result}")
-        
-        end_time = time.time()
-        print(f"DAG执行完成，总耗时: {end_time - start_time:.2f}秒")
+            self.events.emit('node_completed', node_id, result=result)
+            self._save_checkpoint(node_id, result)
+            self._record_duration(node_id)
         
-        return self.results
+        return self._finish_run(topological_order, start_time)
     
     def _execute_parallel(self, topological_order):
         """
         并行执行DAG中的任务
         
+        基于入度计数的事件驱动调度：工作线程（或进程）完成节点后把结果
+        放入完成队列，调度循环据此更新后置节点的入度，并在最后一个依赖
+        完成时立即启动该节点，无需轮询等待。
+        
         Args:
             topological_order (list): 拓扑排序后的节点ID列表
         
         Returns:
             dict: 所有任务的执行结果
         """
-        print("开始并行执行DAG...")
-        start_time = time.time()
+        start_time = self._begin_run('并行')
         
-        # 创建线程池
-        threads = []
+        # 剩余未完成的依赖数量（入度）
+        pending_deps = self._initial_pending_deps(topological_order)
+        remaining = len(topological_order)
+        completions = queue.SimpleQueue()
+        self._completions = completions
+        
+        # 就绪节点按执行槽位（子池）分组放入优先队列，每个槽位最多同时运行其并发上限个节点，
+        # 多出的就绪节点按优先级（critical_path）或拓扑顺序（fifo）等待空闲槽位
+        ranks = self._compute_ranks(topological_order)
+        sequence = itertools.count()
+        ready = {}
+        in_flight = {}
+        running_slots = {}
+        deadlines = []  # (超时时间, 节点ID, 尝试次数)
+        retry_timers = []  # (重试时间, 序号, 节点ID)
+        
+        def push(node_id):
+            if self.trace is not None:
+                self._ready_ns[node_id] = self.trace.now()
+            slot = self._get_slot(node_id)
+            heapq.heappush(ready.setdefault(slot, []), (-ranks.get(node_id, 0.0), next(sequence), node_id))
         
-        # 为每个节点创建一个线程
         for node_id in topological_order:
-            # 等待依赖节点执行完成
-            dependencies = self.dag.get_predecessors(node_id)
-            for dep_id in dependencies:
-                while dep_id not in self.results:
-                    time.sleep(0.1)
+            if pending_deps[node_id] == 0:
+                push(node_id)
+        
+        while remaining > 0 and not self.cancel_event.is_set():
+            # 退避时间到期的节点重新进入就绪队列
+            now = time.monotonic()
+            while retry_timers and retry_timers[0][0] <= now:
+                push(heapq.heappop(retry_timers)[2])
+            
+            # 在每个槽位的并发上限内启动优先级最高的就绪节点
+            for slot, heap in ready.items():
+                capacity = self._get_slot_capacity(slot)
+                while heap and (capacity is None or in_flight.get(slot, 0) < capacity):
+                    node_id = heapq.heappop(heap)[2]
+                    in_flight[slot] = in_flight.get(slot, 0) + 1
+                    running_slots[node_id] = slot
+                    attempt = self._attempts[node_id] = self._attempts.get(node_id, 0) + 1
+                    # 线程后端的超时从工作线程开始执行时计算（见 _STARTED），
+                    # 在共享线程池中排队等待的时间不计入
+                    timeout = get_retry_settings(self.dag.nodes[node_id].data).timeout
+                    if timeout is not None and slot[0] != 'thread':
+                        heapq.heappush(deadlines, (now + timeout, node_id, attempt))
+                    self._start_node(node_id, completions)
+            
+            # 等待任意一个节点完成、超时或重试到期（或被 cancel() 唤醒）
+            wakeups = [entries[0][0] for entries in (deadlines, retry_timers) if entries]
+            wait = max(0.0, min(wakeups) - time.monotonic()) if wakeups else None
+            try:
+                node_id, attempt, result, error = completions.get(timeout=wait)
+            except queue.Empty:
+                node_id, attempt, result, error = self._pop_timed_out(deadlines, running_slots)
+                if node_id is None:
+                    continue
+            else:
+                if node_id is None:
+                    break
+                if node_id not in running_slots or attempt != self._attempts[node_id]:
+                    # 已超时的尝试迟到的结果
+                    continue
+                if result is _STARTED:
+                    timeout = get_retry_settings(self.dag.nodes[node_id].data).timeout
+                    heapq.heappush(deadlines, (time.monotonic() + timeout, node_id, attempt))
+                    continue
+            in_flight[running_slots.pop(node_id)] -= 1
+            self._futures.pop(node_id, None)
+            
+            if error is not None:
+                delay = self._retry_delay(node_id, error)
+                if delay is not None:
+                    heapq.heappush(retry_timers, (time.monotonic() + delay, next(sequence), node_id))
+                    continue
+                # 记录失败并跳过所有下游节点
+                self._errors[node_id] = error
+                remaining -= 1 + self._skip_descendants(node_id, pending_deps)
+                if self.failure_policy == 'fail_fast':
+                    self.cancel_event.set()
+                continue
+            
+            with self.lock:
+                self.results[node_id] = result
+            self.events.emit('node_completed', node_id, result=result)
+            self._store_cache(node_id, result)
+            self._save_checkpoint(node_id, result)
+            self._record_duration(node_id)
+            remaining -= 1
             
-            # 创建并启动线程
-            thread = threading.Thread(target=self._execute_node_with_result, args=(node_id,))
-            threads.append(thread)
-            thread.start()
+            # 更新后置节点的入度
+            for dependent_id in self.dag.nodes[node_id].dependents:
+                if dependent_id in pending_deps:
+                    pending_deps[dependent_id] -= 1
+                    if pending_deps[dependent_id] == 0:
+                        push(dependent_id)
+        
+        self._completions = None
+        if self.cancel_event.is_set():
+            # 撤销已提交但尚未开始的节点，正在运行的节点通过 cancel_event 协作退出
+            for node_id in running_slots:
+                future = self._futures.pop(node_id, None)
+                if future is not None:
+                    future.cancel()
+        
+        return self._finish_run(topological_order, start_time)
+    
+    def _begin_run(self, mode):
+        """
+        重置本次执行的失败、跳过和取消状态
+        
+        Args:
+            mode (str): 执行模式描述
+        
+        Returns:
+            float: 开始时间戳
+        """
+        self._errors = {}
+        self._skipped = []
+        self._futures = {}
+        self._attempts = {}
+        self.report = None
+        self.cancel_event = threading.Event()
+        self.events.emit('run_started', mode=mode)
+        return time.time()
+    
+    def _skip_descendants(self, node_id, pending):
+        """
+        将失败节点的所有下游节点标记为跳过，并从待执行集合中移除
         
-        # 等待所有线程完成
-        for thread in threads:
-            thread.join()
+        Args:
+            node_id (str): 失败节点ID
+            pending (dict): 尚未开始的节点（节点ID -> 剩余依赖数量）
+        
+        Returns:
+            int: 新跳过的节点数量
+        """
+        skipped = 0
+        stack = [node_id]
+        while stack:
+            for dependent_id in self.dag.nodes[stack.pop()].dependents:
+                if dependent_id in pending:
+                    del pending[dependent_id]
+                    self.dag.nodes[dependent_id].state = 'skipped'
+                    self._skipped.append(dependent_id)
+                    self.events.emit('node_skipped', dependent_id, level='warning', cause=node_id)
+                    stack.append(dependent_id)
+                    skipped += 1
+        return skipped
+    
+    def _finish_run(self, topological_order, start_time):
+        """
+        生成结构化执行报告，并按失败处理策略决定是否抛出异常
+        
+        Args:
+            topological_order (list): 本次执行的节点ID列表
+            start_time (float): 开始时间戳
+        
+        Returns:
+            dict: 所有任务的执行结果
+        
+        Raises:
+            DAGExecutionError: 执行被取消，或有节点失败且策略不是 skip_descendants
+        """
+        elapsed = time.time() - start_time
+        skipped = set(self._skipped)
+        cancelled = [
+            node_id for node_id in topological_order
+            if node_id not in self.results and node_id not in self._errors and node_id not in skipped
+        ]
+        for node_id in cancelled:
+            self.dag.nodes[node_id].state = 'cancelled'
+        
+        if cancelled:
+            status = 'cancelled' if not self._errors else 'failed'
+        elif self._errors:
+            status = 'partial' if self.failure_policy == 'skip_descendants' else 'failed'
+        else:
+            status = 'completed'
         
-        end_time = time.time()
-        print(f"DAG执行完成，总耗时: {end_time - start_time:.2f}秒")
+        self.report = {
+            'status': status,
+            'failure_policy': self.failure_policy,
+            'elapsed': elapsed,
+            'completed': [node_id for node_id in topological_order if node_id in self.results],
+            'failed': {
+                node_id: {'type': type(error).__name__, 'message': str(error)}
+                for node_id, error in self._errors.items()
+            },
+            'skipped': list(self._skipped),
+            'cancelled': cancelled,
+            'run_id': self.run_id,
+            'retried': {node_id: attempts - 1 for node_id, attempts in self._attempts.items() if attempts > 1}
+        }
+        self.events.emit('run_completed', elapsed=elapsed, status=status)
+        
+        if status == 'cancelled':
+            raise DAGExecutionError("DAG执行已取消", self.report)
+        if status == 'failed':
+            first_error = next(iter(self._errors.values()))
+            raise DAGExecutionError(
+                f"DAG执行失败: {len(self._errors)} 个节点失败，{len(self._skipped)} 个节点被跳过，"
+                f"{len(cancelled)} 个节点被取消",
+                self.report,
+                dict(self._errors)
+            ) from first_error
         
         return self.results
     
-    def _execute_node_with_result(self, node_id):
+    def _pop_timed_out(self, deadlines, running_slots):
         """
-        执行节点并保存结果
+        取出已到期的超时记录，返回第一个仍在运行的超时尝试
+        
+        提交到进程池后仍在排队、尚未开始运行的尝试不算超时，从当前时间重新计算超时。
+        
+        Args:
+            deadlines (list): (超时时间, 节点ID, 尝试次数) 小顶堆
+            running_slots (dict): 正在运行的节点ID -> 槽位
+        
+        Returns:
+            tuple: (节点ID, 尝试次数, None, NodeTimeoutError)，没有超时的尝试时节点ID为None
+        """
+        now = time.monotonic()
+        while deadlines and deadlines[0][0] <= now:
+            _, node_id, attempt = heapq.heappop(deadlines)
+            if node_id in running_slots and attempt == self._attempts[node_id]:
+                future = self._futures.get(node_id)
+                if future is not None and not future.running() and not future.done():
+                    timeout = get_retry_settings(self.dag.nodes[node_id].data).timeout
+                    heapq.heappush(deadlines, (now + timeout, node_id, attempt))
+                    continue
+                if future is not None:
+                    future.cancel()
+                return node_id, attempt, None, self._timeout_error(node_id)
+        return None, None, None, None
+    
+    def _timeout_error(self, node_id):
+        """
+        将节点标记为超时失败
         
         Args:
             node_id (str): 节点ID
+        
+        Returns:
+            NodeTimeoutError: 超时异常
         """
-        result = self._execute_node(node_id)
-        with self.lock:
-            self.results[node_id] = result
-            print(f"节点 {node_id} 执行完成，结果: {result}")
+        timeout = get_retry_settings(self.dag.nodes[node_id].data).timeout
+        error = NodeTimeoutError(f"节点 {node_id} 执行超时（{timeout}秒）")
+        self.dag.nodes[node_id].state = 'failed'
+        self.events.emit('node_failed', node_id, level='error', error=error)
+        return error
+    
+    def _retry_delay(self, node_id, error):
+        """
+        判断失败的节点是否还可以重试
+        
+        Args:
+            node_id (str): 节点ID
+            error (Exception): 本次尝试的异常
+        
+        Returns:
+            float: 下一次重试前的等待时间（秒），不再重试时返回None
+        """
+        settings = get_retry_settings(self.dag.nodes[node_id].data)
+        attempt = self._attempts.get(node_id, 1)
+        if attempt > settings.retries or self.cancel_event.is_set():
+            return None
+        
+        delay = backoff_delay(settings, attempt)
+        self.dag.nodes[node_id].state = 'retrying'
+        self.events.emit('node_retry', node_id, level='warning', attempt=attempt,
+                         retries=settings.retries, delay=delay, error=error)
+        return delay
+    
+    def _execute_node_with_retries(self, node_id):
+        """
+        在当前线程中执行节点，按节点的超时与重试设置处理失败（用于串行执行）
+        
+        设置了 timeout 的节点提交到工作线程池执行，调用线程在工作线程开始执行后
+        最多等待 timeout 秒，在线程池中排队的时间不计入超时。
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            any: 任务执行结果
+        """
+        data = self.dag.nodes[node_id].data or {}
+        settings = get_retry_settings(data)
+        while True:
+            self._attempts[node_id] = self._attempts.get(node_id, 0) + 1
+            try:
+                if settings.timeout is None:
+                    return self._execute_node(node_id)
+                
+                started = threading.Event()
+                future = self.pool.submit(self._execute_started_node, node_id, started, pool_name=data.get('pool'))
+                started.wait()
+                try:
+                    return future.result(timeout=settings.timeout)
+                except TimeoutError:
+                    if future.done():
+                        raise
+                    future.cancel()
+                    raise self._timeout_error(node_id) from None
+            except Exception as e:
+                delay = self._retry_delay(node_id, e)
+                if delay is None:
+                    raise
+                # 退避等待可以被 cancel() 打断
+                if self.cancel_event.wait(delay):
+                    raise
+    
+    def _execute_started_node(self, node_id, started):
+        """
+        在工作线程中执行节点，开始执行前置位 started
+        
+        Args:
+            node_id (str): 节点ID
+            started (threading.Event): 工作线程开始执行的信号
+        
+        Returns:
+            any: 任务执行结果
+        """
+        started.set()
+        return self._execute_node(node_id)
+    
+    def _get_backend(self, node_id):
+        """
+        获取节点使用的执行后端
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            str: 执行后端名称
+        """
+        backend = (self.dag.nodes[node_id].data or {}).get('backend', self.backend)
+        if backend not in BACKENDS:
+            raise ValueError(f"节点 {node_id} 使用了不支持的执行后端: {backend}")
+        return backend
+    
+    def _compute_ranks(self, topological_order):
+        """
+        计算就绪节点的调度优先级
+        
+        Args:
+            topological_order (list): 待执行的节点ID列表
+        
+        Returns:
+            dict: 节点ID到优先级的映射，fifo策略下为空
+        """
+        if self.scheduling != 'critical_path':
+            return {}
+        durations = estimate_durations(self.dag, self.history)
+        return upward_ranks(self.dag, durations, topological_order)
+    
+    def _get_slot(self, node_id):
+        """
+        获取节点占用的执行槽位，同一槽位共享一个并发上限
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            tuple: 槽位标识
+        """
+        backend = self._get_backend(node_id)
+        if backend == 'thread':
+            return (backend, self.pool.resolve_pool_name((self.dag.nodes[node_id].data or {}).get('pool')))
+        return (backend,)
+    
+    def _get_slot_capacity(self, slot):
+        """
+        获取执行槽位的并发上限
+        
+        Args:
+            slot (tuple): 槽位标识
+        
+        Returns:
+            int: 并发上限，None表示不限制
+        """
+        if slot[0] == 'thread':
+            return self.pool.get_limit(slot[1])
+        if slot[0] == 'process':
+            return self.pool.max_processes
+        return None
+    
+    def _record_duration(self, node_id):
+        """
+        将节点本次的执行耗时写入历史记录（命中缓存的节点没有耗时，不记录）
+        
+        节点数据中的 'history_key' 可以让不同ID的节点共享同一份历史，例如批量请求中
+        带命名空间前缀的同类任务。
+        
+        Args:
+            node_id (str): 节点ID
+        """
+        duration = self._durations.pop(node_id, None)
+        if self.history is not None and duration is not None:
+            data = self.dag.nodes[node_id].data or {}
+            self.history.record(data.get('history_key', node_id), duration)
+    
+    def _start_node(self, node_id, completions):
+        """
+        按节点的执行后端启动节点，完成后将 (节点ID, 结果, 异常) 放入完成队列
+        
+        - thread: 提交到工作线程池，节点数据中的 'pool' 键用于选择子池
+        - process: 在调度线程中解析参数，仅将函数和直接依赖的结果发送到工作进程
+        - inline: 在调度线程中直接执行，适合非常轻量的节点
+        
+        Args:
+            node_id (str): 节点ID
+            completions (queue.SimpleQueue): 完成队列
+        """
+        backend = self._get_backend(node_id)
+        data = self.dag.nodes[node_id].data or {}
+        
+        # 命中缓存时直接完成，跳过任务本身的耗时
+        attempt = self._attempts.get(node_id, 1)
+        hit, result = self._lookup_cache(node_id)
+        if hit:
+            completions.put((node_id, attempt, result, None))
+            return
+        
+        if backend == 'inline' or (backend == 'process' and not data.get('func')):
+            self._execute_node_with_result(node_id, completions, attempt)
+        elif backend == 'thread':
+            notify_start = get_retry_settings(data).timeout is not None
+            self._futures[node_id] = self.pool.submit(
+                self._execute_node_with_result, node_id, completions, attempt, notify_start, pool_name=data.get('pool')
+            )
+        else:
+            self._submit_to_process(node_id, completions, attempt)
+    
+    def _execute_node_with_result(self, node_id, completions, attempt=1, notify_start=False):
+        """
+        执行节点并将结果放入完成队列
+        
+        Args:
+            node_id (str): 节点ID
+            completions (queue.SimpleQueue): 完成队列
+            attempt (int, optional): 尝试次数，用于丢弃已超时尝试的迟到结果
+            notify_start (bool, optional): 是否在开始执行前放入 _STARTED，用于从此刻开始计算超时
+        """
+        if notify_start:
+            completions.put((node_id, attempt, _STARTED, None))
+        start = time.perf_counter()
+        try:
+            result = self._execute_node(node_id)
+        except Exception as e:
+            completions.put((node_id, attempt, None, e))
+        else:
+            self._durations[node_id] = time.perf_counter() - start
+            completions.put((node_id, attempt, result, None))
+    
+    def _submit_to_process(self, node_id, completions, attempt=1):
+        """
+        将节点提交到工作进程池执行，结果在父进程中写回
+        
+        Args:
+            node_id (str): 节点ID
+            completions (queue.SimpleQueue): 完成队列
+            attempt (int, optional): 尝试次数，用于丢弃已超时尝试的迟到结果
+        """
+        node = self.dag.nodes[node_id]
+        node.state = 'running'
+        self.events.emit('node_started', node_id)
+        
+        start = time.perf_counter()
+        start_ns = self.trace.now() if self.trace is not None else 0
+        try:
+            task_func, task_args, task_kwargs = self._prepare_call(node_id, inject_cancel=False)
+            future = self.pool.submit_process(_invoke, task_func, task_args, task_kwargs)
+            self._futures[node_id] = future
+        except Exception as e:
+            node.state = 'failed'
+            self.events.emit('node_failed', node_id, level='error', error=e)
+            completions.put((node_id, attempt, None, e))
+            return
+        
+        def on_done(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                node.state = 'failed'
+                self._trace_node(node_id, start_ns, status='failed', thread=(PROCESS_TID, 'process-pool'))
+                self.events.emit('node_failed', node_id, level='error', error=error)
+                completions.put((node_id, attempt, None, error))
+            else:
+                node.state = 'completed'
+                self._durations[node_id] = time.perf_counter() - start
+                self._trace_node(node_id, start_ns, future.result(), thread=(PROCESS_TID, 'process-pool'))
+                completions.put((node_id, attempt, future.result(), None))
+        
+        future.add_done_callback(on_done)
+    
+    def _result_digest(self, node_id):
+        """
+        获取节点结果的内容摘要（按需计算并缓存）
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            str: 十六进制摘要
+        """
+        digest = self._result_digests.get(node_id)
+        if digest is None:
+            digest = hash_value(self.results[node_id])
+            self._result_digests[node_id] = digest
+        return digest
+    
+    def _lookup_cache(self, node_id):
+        """
+        查找节点结果缓存，缓存键由任务函数指纹、声明的参数和上游结果摘要组成
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Returns:
+            tuple: (是否命中, 缓存的结果)
+        """
+        node = self.dag.nodes[node_id]
+        data = node.data or {}
+        if self.cache is None or not data.get('func') or not data.get('cache', True):
+            return False, None
+        
+        upstream = [self._result_digest(dep_id) for dep_id in node.dependencies]
+        key = make_cache_key(data['func'], data.get('args', ()), data.get('kwargs', {}), upstream)
+        hit, entry = self.cache.get(key)
+        if not hit:
+            self._cache_keys[node_id] = key
+            return False, None
+        
+        digest, result = entry
+        self._result_digests[node_id] = digest
+        node.state = 'completed'
+        if self.trace is not None:
+            self._trace_node(node_id, self.trace.now(), result, status='cache_hit')
+        self.events.emit('node_cache_hit', node_id)
+        return True, result
+    
+    def _store_cache(self, node_id, result):
+        """
+        将节点结果写入缓存
+        
+        Args:
+            node_id (str): 节点ID
+            result (any): 节点执行结果
+        """
+        key = self._cache_keys.pop(node_id, None)
+        if key is None:
+            return
+        
+        digest = hash_value(result)
+        self._result_digests[node_id] = digest
+        try:
+            self.cache.set(key, (digest, result), ttl=self.dag.nodes[node_id].data.get('cache_ttl'))
+        except Exception as e:
+            self.events.emit('cache_store_failed', node_id, level='warning', error=e)
+    
+    def _save_checkpoint(self, node_id, result):
+        """
+        将完成的节点结果写入检查点存储（未配置检查点时不做任何事）
+        
+        Args:
+            node_id (str): 节点ID
+            result (any): 节点执行结果
+        """
+        if self.checkpoint is None:
+            return
+        try:
+            fingerprint = self._fingerprint(self._input_fingerprints.get(node_id))
+            self.checkpoint.save(self.run_id, node_id, fingerprint, result)
+        except Exception as e:
+            self.events.emit('checkpoint_failed', node_id, level='warning', error=e)
+    
+    def _prepare_call(self, node_id, inject_cancel=True):
+        """
+        解析节点的任务函数和调用参数，并注入依赖节点的结果
+        
+        Args:
+            node_id (str): 节点ID
+            inject_cancel (bool, optional): 是否把声明的 'cancel_event' 参数替换为取消信号，
+                发送到工作进程的调用不能包含 threading.Event，默认True
+        
+        Returns:
+            tuple: (任务函数, 位置参数列表, 关键字参数字典)
+        """
+        node = self.dag.nodes[node_id]
+        
+        # 获取任务函数和参数
+        task_func = node.data.get('func')
+        task_args = list(node.data.get('args', ()))
+        task_kwargs = dict(node.data.get('kwargs', {}))
+        
+        # 收集依赖节点的结果
+        dependencies = self.dag.get_predecessors(node_id)
+        dep_results = {dep_id: self.results[dep_id] for dep_id in dependencies}
+        
+        # 如果有依赖节点，将其结果作为任务函数的参数
+        if dependencies:
+            # 获取依赖节点ID的列表
+            dep_ids = list(dep_results.keys())
+            
+            # 如果任务函数有None参数，将其替换为依赖结果
+            for i, arg in enumerate(task_args):
+                if arg is None:
+                    # 按顺序替换None参数为依赖结果
+                    if dep_ids:
+                        task_args[i] = dep_results[dep_ids[0]]
+                        dep_ids.pop(0)
+            
+            # 如果还有剩余的依赖结果，将其作为kwargs传递
+            if dep_ids:
+                for dep_id in dep_ids:
+                    task_kwargs[dep_id] = dep_results[dep_id]
+        
+        # 如果任务函数需要依赖结果字典，将其作为参数传递
+        if 'dependencies' in task_kwargs:
+            task_kwargs['dependencies'] = dep_results
+        
+        # 如果任务函数需要感知取消，将取消信号作为参数传递
+        if inject_cancel and 'cancel_event' in task_kwargs:
+            task_kwargs['cancel_event'] = self.cancel_event
+        
+        return task_func, task_args, task_kwargs
     
     def _execute_node(self, node_id):
         """
@@ -125,54 +1060,43 @@ class DAGExecutor:
             any: 任务执行结果
         """
         node = self.dag.nodes[node_id]
+        start_ns = self.trace.now() if self.trace is not None else 0
         
         # 更新节点状态
         node.state = 'running'
-        print(f"开始执行节点 {node_id}")
+        self.events.emit('node_started', node_id)
         
         try:
-            # 获取任务函数和参数
-            task_func = node.data.get('func')
-            task_args = list(node.data.get('args', ()))
-            task_kwargs = node.data.get('kwargs', {})
-            
-            # 收集依赖节点的结果
-            dependencies = self.dag.get_predecessors(node_id)
-            dep_results = {dep_id: self.results[dep_id] for dep_id in dependencies}
-            
-            # 如果有依赖节点，将其结果作为任务函数的参数
-            if dependencies:
-                # 获取依赖节点ID的列表
-                dep_ids = list(dep_results.keys())
-                
-                # 如果任务函数有None参数，将其替换为依赖结果
-                for i, arg in enumerate(task_args):
-                    if arg is None:
-                        # 按顺序替换None参数为依赖结果
-                        if dep_ids:
-                            task_args[i] = dep_results[dep_ids[0]]
-                            dep_ids.pop(0)
-                
-                # 如果还有剩余的依赖结果，将其作为kwargs传递
-                if dep_ids:
-                    for dep_id in dep_ids:
-                        task_kwargs[dep_id] = dep_results[dep_id]
-            
-            # 如果任务函数需要依赖结果字典，将其作为参数传递
-            if 'dependencies' in task_kwargs:
-                task_kwargs['dependencies'] = dep_results
+            task_func, task_args, task_kwargs = self._prepare_call(node_id)
             
             # 执行任务
             if task_func:
                 result = task_func(*task_args, **task_kwargs)
-                node.state = 'completed'
-                return result
             else:
                 # 如果没有任务函数，直接返回节点ID
-                node.state = 'completed'
-                return node_id
+                result = node_id
+            node.state = 'completed'
+            self._trace_node(node_id, start_ns, result)
+            return result
         
         except Exception as e:
             node.state = 'failed'
-            print(f"节点 {node_id} 执行失败: {e}")
-            raise
\ No newline at end of file
+            self._trace_node(node_id, start_ns, status='failed')
+            self.events.emit('node_failed', node_id, level='error', error=e)
+            raise
+    
+    def _trace_node(self, node_id, start_ns, result=None, status='completed', thread=None):
+        """
+        将节点的执行记录写入执行追踪（未开启追踪时不做任何事）
+        
+        Args:
+            node_id (str): 节点ID
+            start_ns (int): 节点开始执行的时间
+            result (any, optional): 节点结果
+            status (str, optional): 节点状态
+            thread (tuple, optional): (线程ID, 线程名)，默认当前线程
+        """
+        if self.trace is None:
+            return
+        ready_ns = self._ready_ns.pop(node_id, start_ns)
+        self.trace.record(node_id, min(ready_ns, start_ns), start_ns, self.trace.now(), result, status, thread)
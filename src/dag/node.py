@@ -1,3 +1,99 @@
+from collections.abc import Sequence
+
+
+class NodeIdList(Sequence):
+    """
+    按添加顺序排列、不重复的节点ID序列
+    
+    内部是值恒为None的有序字典，成员判断、添加和删除为 O(1)；同时提供列表的
+    只读接口（下标、切片、index、count、与列表比较）以及 append 和 remove，
+    兼容把 Node.dependencies / Node.dependents 当作列表使用的代码。
+    按下标访问需要 O(n)，遍历时应直接迭代。
+    """
+    
+    __slots__ = ('_ids',)
+    
+    def __init__(self, ids=()):
+        """
+        初始化节点ID序列
+        
+        Args:
+            ids (iterable, optional): 初始节点ID，重复的ID只保留第一次出现的位置
+        """
+        self._ids = dict.fromkeys(ids)
+    
+    def __contains__(self, node_id):
+        return node_id in self._ids
+    
+    def __iter__(self):
+        return iter(self._ids)
+    
+    def __reversed__(self):
+        return reversed(self._ids)
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def __getitem__(self, index):
+        return list(self._ids)[index]
+    
+    def __eq__(self, other):
+        if isinstance(other, (NodeIdList, list, tuple)):
+            return list(self._ids) == list(other)
+        return NotImplemented
+    
+    def __repr__(self):
+        return repr(list(self._ids))
+    
+    def append(self, node_id):
+        """
+        在末尾添加节点ID，已存在时保持原位置
+        
+        Args:
+            node_id (str): 节点ID
+        """
+        self._ids[node_id] = None
+    
+    def remove(self, node_id):
+        """
+        移除节点ID
+        
+        Args:
+            node_id (str): 节点ID
+        
+        Raises:
+            ValueError: 节点ID不存在
+        """
+        try:
+            del self._ids[node_id]
+        except KeyError:
+            raise ValueError(f"{node_id} 不在列表中") from None
+    
+    def discard(self, node_id):
+        """
+        移除节点ID，不存在时不做任何事
+        
+        Args:
+            node_id (str): 节点ID
+        """
+        self._ids.pop(node_id, None)
+    
+    def clear(self):
+        """
+        清空序列
+        """
+        self._ids.clear()
+    
+    def copy(self):
+        """
+        返回列表副本
+        
+        Returns:
+            list: 节点ID列表
+        """
+        return list(self._ids)
+
+
 class Node:
     """
     DAG节点类，代表一个任务
@@ -5,12 +101,15 @@ class Node:
     Attributes:
         id (str): 节点唯一标识符
         data (any): 节点存储的数据，通常是任务函数和参数
-        dependencies (list[str]): 依赖的节点ID列表
-        dependents (list[str]): 依赖该节点的节点ID列表
+        dependencies (NodeIdList): 依赖的节点ID，按添加顺序排列，兼容列表接口
+        dependents (NodeIdList): 依赖该节点的节点ID，按添加顺序排列，兼容列表接口
         state (str): 节点状态 (pending, running, completed, failed)
         result (any): 节点执行结果
     """
     
+    # 使用__slots__去掉每个实例的__dict__，降低大图的内存占用
+    __slots__ = ('id', 'data', 'dependencies', 'dependents', 'state', 'result')
+    
     def __init__(self, id, data=None):
         """
         初始化节点
@@ -21,8 +120,8 @@ class Node:
         """
         self.id = id
         self.data = data
-        self.dependencies = []  # 依赖的节点ID列表
-        self.dependents = []    # 依赖该节点的节点ID列表
+        self.dependencies = NodeIdList()  # 依赖的节点ID列表
+        self.dependents = NodeIdList()    # 依赖该节点的节点ID列表
         self.state = 'pending'  # 初始状态为待处理
         self.result = None      # 初始结果为None
     
@@ -33,8 +132,7 @@ class Node:
         Args:
             node_id (str): 依赖的节点ID
         """
-        if node_id not in self.dependencies:
-            self.dependencies.append(node_id)
+        self.dependencies.append(node_id)
     
     def add_dependent(self, node_id):
         """
@@ -43,8 +141,7 @@ class Node:
         Args:
             node_id (str): 依赖该节点的节点ID
         """
-        if node_id not in self.dependents:
-            self.dependents.append(node_id)
+        self.dependents.append(node_id)
     
     def remove_dependency(self, node_id):
         """
@@ -53,8 +150,7 @@ class Node:
         Args:
             node_id (str): 要移除的依赖节点ID
         """
-        if node_id in self.dependencies:
-            self.dependencies.remove(node_id)
+        self.dependencies.discard(node_id)
     
     def remove_dependent(self, node_id):
         """
@@ -63,8 +159,7 @@ class Node:
         Args:
             node_id (str): 要移除的依赖该节点的节点ID
         """
-        if node_id in self.dependents:
-            self.dependents.remove(node_id)
+        self.dependents.discard(node_id)
     
     def __repr__(self):
         """
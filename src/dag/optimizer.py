@@ -0,0 +1,71 @@
+from .cache import hash_value, make_cache_key
+from .retry import RETRY_KEYS
+
+# 影响节点执行方式的设置：设置不同的节点即使计算相同也不能合并，否则只有保留节点的设置生效
+POLICY_KEYS = ('backend', 'pool', 'cache', 'cache_ttl') + RETRY_KEYS
+
+
+def node_signature(dag, node_id, signatures):
+    """
+    计算节点的结构指纹：任务函数指纹、声明的参数、执行设置（POLICY_KEYS）和按依赖顺序排列的上游节点指纹
+    
+    Args:
+        dag (DAG): DAG对象
+        node_id (str): 节点ID
+        signatures (dict): 已计算的上游节点指纹
+    
+    Returns:
+        str: 结构指纹，不参与合并的节点（没有任务函数或 'cse' 为 False）返回None
+    """
+    data = dag.nodes[node_id].data or {}
+    if not data.get('func') or not data.get('cse', True):
+        return None
+    
+    upstream = [
+        signatures.get(dep_id) or f"node:{dep_id}"
+        for dep_id in dag.nodes[node_id].dependencies
+    ]
+    upstream.append(hash_value([data.get(key) for key in POLICY_KEYS]))
+    return make_cache_key(data['func'], data.get('args', ()), data.get('kwargs', {}), upstream)
+
+
+def eliminate_common_subexpressions(dag):
+    """
+    公共子表达式消除：合并结构完全相同的节点（相同的任务函数、参数、执行设置和上游节点），
+    被合并节点的后置节点改为依赖保留的节点，重复的计算只执行一次
+    
+    按拓扑顺序处理，上游合并后下游的指纹随之相同，整条重复的链会被逐层合并。
+    任务函数有副作用或结果不可共享的节点可以在节点数据中设置 'cse': False 退出合并。
+    
+    Args:
+        dag (DAG): 要优化的DAG，原地修改
+    
+    Returns:
+        dict: 被移除的节点ID -> 保留的节点ID，用于把执行结果映射回原节点
+    """
+    signatures = {}
+    canonical = {}
+    aliases = {}
+    
+    for node_id in dag.topological_sort():
+        signature = node_signature(dag, node_id, signatures)
+        if signature is None:
+            continue
+        
+        kept_id = canonical.get(signature)
+        if kept_id is None:
+            canonical[signature] = node_id
+            signatures[node_id] = signature
+            continue
+        
+        # 某个后置节点同时依赖两个相同节点时，合并会改变其参数个数，保留该节点
+        dependents = dag.nodes[node_id].dependents
+        if any(dag.has_edge(kept_id, dependent_id) for dependent_id in dependents):
+            signatures[node_id] = f"{signature}:{node_id}"
+            continue
+        
+        dag.redirect_dependents(node_id, kept_id)
+        dag.remove_node(node_id)
+        aliases[node_id] = kept_id
+    
+    return aliases
@@ -0,0 +1,171 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+class WorkerPool:
+    """
+    可复用的有界工作线程池，按名称划分为多个子池
+    
+    不同类型的节点（例如IO密集型和CPU密集型）可以通过节点数据中的
+    'pool' 键指定子池，从而使用不同的并发上限。未配置上限的子池名称
+    会落到默认子池。CPU密集型节点还可以使用按需创建的进程池，绕过GIL。
+    
+    Attributes:
+        max_workers (int): 默认子池的最大线程数
+        limits (dict): 子池名称到最大线程数的映射
+        max_processes (int): 进程池的最大进程数
+    """
+    
+    DEFAULT_POOL = 'default'
+    
+    def __init__(self, max_workers=None, limits=None, thread_name_prefix='dag-worker', max_processes=None):
+        """
+        初始化工作线程池
+        
+        Args:
+            max_workers (int, optional): 默认子池的最大线程数，默认 min(32, CPU数+4)
+            limits (dict, optional): 子池名称到最大线程数的映射，例如 {'io': 32, 'cpu': 4}
+            thread_name_prefix (str, optional): 工作线程名称前缀
+            max_processes (int, optional): 进程池的最大进程数，默认CPU数
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers 必须大于0")
+        
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.limits = dict(limits or {})
+        self.thread_name_prefix = thread_name_prefix
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self._executors = {}
+        self._process_executor = None
+        self._lock = threading.Lock()
+        self._shutdown = False
+    
+    def resolve_pool_name(self, pool_name=None):
+        """
+        解析子池名称，未配置的名称返回默认子池
+        
+        Args:
+            pool_name (str, optional): 子池名称
+        
+        Returns:
+            str: 实际使用的子池名称
+        """
+        if pool_name in self.limits:
+            return pool_name
+        return self.DEFAULT_POOL
+    
+    def get_limit(self, pool_name=None):
+        """
+        获取子池的并发上限
+        
+        Args:
+            pool_name (str, optional): 子池名称
+        
+        Returns:
+            int: 最大线程数
+        """
+        return self.limits.get(self.resolve_pool_name(pool_name), self.max_workers)
+    
+    def get_executor(self, pool_name=None):
+        """
+        获取（按需创建）子池对应的线程池执行器
+        
+        Args:
+            pool_name (str, optional): 子池名称
+        
+        Returns:
+            ThreadPoolExecutor: 线程池执行器
+        """
+        name = self.resolve_pool_name(pool_name)
+        executor = self._executors.get(name)
+        if executor is not None:
+            return executor
+        
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("工作线程池已关闭")
+            executor = self._executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.get_limit(name),
+                    thread_name_prefix=f"{self.thread_name_prefix}-{name}"
+                )
+                self._executors[name] = executor
+            return executor
+    
+    def submit(self, fn, *args, pool_name=None, **kwargs):
+        """
+        提交任务到指定子池
+        
+        Args:
+            fn (callable): 任务函数
+            *args: 位置参数
+            pool_name (str, optional): 子池名称
+            **kwargs: 关键字参数
+        
+        Returns:
+            concurrent.futures.Future: 任务的Future对象
+        """
+        return self.get_executor(pool_name).submit(fn, *args, **kwargs)
+    
+    def get_process_executor(self):
+        """
+        获取（按需创建）进程池执行器
+        
+        Returns:
+            ProcessPoolExecutor: 进程池执行器
+        """
+        executor = self._process_executor
+        if executor is not None:
+            return executor
+        
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("工作线程池已关闭")
+            if self._process_executor is None:
+                self._process_executor = ProcessPoolExecutor(max_workers=self.max_processes)
+            return self._process_executor
+    
+    def submit_process(self, fn, *args, **kwargs):
+        """
+        提交任务到进程池，函数和参数必须可以被pickle
+        
+        Args:
+            fn (callable): 任务函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+        
+        Returns:
+            concurrent.futures.Future: 任务的Future对象
+        """
+        return self.get_process_executor().submit(fn, *args, **kwargs)
+    
+    def shutdown(self, wait=True):
+        """
+        关闭所有子池和进程池
+        
+        Args:
+            wait (bool, optional): 是否等待正在执行的任务完成，默认True
+        """
+        with self._lock:
+            self._shutdown = True
+            executors = list(self._executors.values())
+            self._executors.clear()
+            if self._process_executor is not None:
+                executors.append(self._process_executor)
+                self._process_executor = None
+        
+        for executor in executors:
+            executor.shutdown(wait=wait)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+    
+    def __repr__(self):
+        """
+        返回线程池的字符串表示
+        """
+        return f"WorkerPool(max_workers={self.max_workers}, limits={self.limits}, max_processes={self.max_processes})"
@@ -0,0 +1,80 @@
+import random
+from collections import namedtuple
+
+# 节点数据中可用的超时与重试设置键，也可以在任务模板中为每个任务提供默认值
+RETRY_KEYS = ('timeout', 'retries', 'backoff', 'max_backoff', 'jitter')
+
+DEFAULT_BACKOFF = 0.1
+DEFAULT_MAX_BACKOFF = 30.0
+
+
+class NodeTimeoutError(TimeoutError):
+    """
+    节点执行时间超过其 timeout 设置时抛出的异常
+    """
+
+
+class RetrySettings(namedtuple('RetrySettings', RETRY_KEYS)):
+    """
+    单个节点的超时与重试设置
+    
+    Attributes:
+        timeout (float): 单次尝试的超时时间（秒），None 表示不限制
+        retries (int): 失败或超时后的最大重试次数
+        backoff (float): 第一次重试前的基础等待时间（秒），之后每次翻倍
+        max_backoff (float): 单次等待时间的上限（秒）
+        jitter (bool): 是否使用 full jitter（在 [0, 等待时间] 内均匀随机），避免重试同时涌向下游服务
+    """
+    
+    __slots__ = ()
+
+
+NO_RETRY = RetrySettings(None, 0, DEFAULT_BACKOFF, DEFAULT_MAX_BACKOFF, True)
+
+
+def get_retry_settings(data):
+    """
+    从节点数据中读取超时与重试设置
+    
+    Args:
+        data (dict): 节点数据
+    
+    Returns:
+        RetrySettings: 超时与重试设置，未设置的项使用默认值
+    
+    Raises:
+        ValueError: 设置值无效
+    """
+    if not data or not any(key in data for key in RETRY_KEYS):
+        return NO_RETRY
+    
+    settings = RetrySettings(
+        timeout=data.get('timeout'),
+        retries=int(data.get('retries', 0)),
+        backoff=float(data.get('backoff', DEFAULT_BACKOFF)),
+        max_backoff=float(data.get('max_backoff', DEFAULT_MAX_BACKOFF)),
+        jitter=bool(data.get('jitter', True))
+    )
+    if settings.timeout is not None and settings.timeout <= 0:
+        raise ValueError(f"timeout 必须为正数: {settings.timeout}")
+    if settings.retries < 0 or settings.backoff < 0 or settings.max_backoff < 0:
+        raise ValueError("retries、backoff 和 max_backoff 不能为负数")
+    return settings
+
+
+def backoff_delay(settings, attempt, rng=random):
+    """
+    计算第 attempt 次尝试失败后、下一次重试前的等待时间（指数退避）
+    
+    Args:
+        settings (RetrySettings): 超时与重试设置
+        attempt (int): 已失败的尝试次数（从1开始）
+        rng (random.Random, optional): 随机数生成器
+    
+    Returns:
+        float: 等待时间（秒）
+    """
+    delay = min(settings.max_backoff, settings.backoff * (2 ** (attempt - 1)))
+    if settings.jitter:
+        delay = rng.uniform(0, delay)
+    return delay
@@ -0,0 +1,108 @@
+import threading
+
+SCHEDULING_POLICIES = ('fifo', 'critical_path')
+
+
+class DurationHistory:
+    """
+    节点历史执行耗时记录，用于估计关键路径
+    
+    使用指数移动平均平滑每个键的耗时，可以在多个执行器之间共享，
+    例如由 AIAgent 持有并在所有请求间累积。
+    
+    Attributes:
+        alpha (float): 指数移动平均的平滑系数，越大越偏向最近一次耗时
+    """
+    
+    def __init__(self, alpha=0.3):
+        """
+        初始化耗时记录
+        
+        Args:
+            alpha (float, optional): 平滑系数，取值 (0, 1]，默认0.3
+        """
+        self.alpha = alpha
+        self._durations = {}
+        self._lock = threading.Lock()
+    
+    def record(self, key, duration):
+        """
+        记录一次执行耗时
+        
+        Args:
+            key (str): 记录键，通常是节点ID
+            duration (float): 耗时（秒）
+        """
+        with self._lock:
+            previous = self._durations.get(key)
+            if previous is None:
+                self._durations[key] = duration
+            else:
+                self._durations[key] = previous + self.alpha * (duration - previous)
+    
+    def get(self, key, default=None):
+        """
+        获取平滑后的耗时
+        
+        Args:
+            key (str): 记录键
+            default (float, optional): 没有记录时的返回值
+        
+        Returns:
+            float: 耗时（秒）
+        """
+        return self._durations.get(key, default)
+    
+    def __len__(self):
+        return len(self._durations)
+
+
+def estimate_durations(dag, history=None, default=1.0):
+    """
+    估计每个节点的执行耗时
+    
+    优先使用历史耗时，其次使用节点数据中的 'estimated_duration'
+    （例如任务模板中的 delay），都没有时使用默认值。历史耗时按节点数据中的
+    'history_key' 查找，未设置时使用节点ID。
+    
+    Args:
+        dag (DAG): DAG对象
+        history (DurationHistory, optional): 历史耗时记录
+        default (float, optional): 默认耗时（秒），默认1.0
+    
+    Returns:
+        dict: 节点ID到估计耗时的映射
+    """
+    estimates = {}
+    for node_id, node in dag.nodes.items():
+        data = node.data or {}
+        duration = history.get(data.get('history_key', node_id)) if history is not None else None
+        if duration is None:
+            duration = data.get('estimated_duration', default)
+        estimates[node_id] = duration
+    return estimates
+
+
+def upward_ranks(dag, durations, topological_order=None):
+    """
+    计算每个节点的向上秩（upward rank）：从该节点到任意汇点的最长路径耗时，包含节点自身
+    
+    就绪节点中向上秩越大，越可能位于关键路径上，应当优先执行。
+    
+    Args:
+        dag (DAG): DAG对象
+        durations (dict): 节点ID到估计耗时的映射
+        topological_order (list, optional): 拓扑排序结果，未提供时重新计算
+    
+    Returns:
+        dict: 节点ID到向上秩的映射
+    """
+    if topological_order is None:
+        topological_order = dag.topological_sort()
+    
+    ranks = {}
+    for node_id in reversed(topological_order):
+        successors = dag.nodes[node_id].dependents
+        longest = max((ranks[successor] for successor in successors if successor in ranks), default=0.0)
+        ranks[node_id] = durations.get(node_id, 0.0) + longest
+    return ranks
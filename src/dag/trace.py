@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+import threading
+import time
+
+# 排队等待事件和进程池节点在 Chrome Trace 中使用的虚拟线程ID
+QUEUE_TID = 0
+PROCESS_TID = 1
+
+
+class ExecutionTrace:
+    """
+    节点级执行追踪记录
+    
+    每个节点记录一条 (节点ID, 就绪时间, 开始时间, 结束时间, 线程ID, 线程名, 结果大小, 状态)，
+    时间为相对于追踪开始的纳秒数。记录只做一次列表追加，开销很低，可以在生产环境中开启。
+    结果可以导出为 Chrome Trace Event JSON，在 chrome://tracing 或 Perfetto 中打开。
+    
+    Attributes:
+        events (list): 追踪记录列表
+    """
+    
+    def __init__(self):
+        """
+        初始化执行追踪
+        """
+        self.events = []
+        self._origin = time.perf_counter_ns()
+    
+    def now(self):
+        """
+        获取相对于追踪开始的当前时间
+        
+        Returns:
+            int: 纳秒数
+        """
+        return time.perf_counter_ns() - self._origin
+    
+    def record(self, node_id, ready_ns, start_ns, end_ns, result=None, status='completed', thread=None):
+        """
+        记录一个节点的执行
+        
+        Args:
+            node_id (str): 节点ID
+            ready_ns (int): 节点就绪（依赖全部完成）的时间
+            start_ns (int): 节点开始执行的时间
+            end_ns (int): 节点执行结束的时间
+            result (any, optional): 节点结果，只记录其浅层大小
+            status (str, optional): 节点状态 (completed, failed, cache_hit)
+            thread (tuple, optional): (线程ID, 线程名)，默认当前线程
+        """
+        if thread is None:
+            current = threading.current_thread()
+            thread = (current.ident, current.name)
+        size = sys.getsizeof(result) if result is not None else 0
+        self.events.append((node_id, ready_ns, start_ns, end_ns, thread[0], thread[1], size, status))
+    
+    def summary(self):
+        """
+        汇总每个节点的排队等待时间和执行时间
+        
+        Returns:
+            list: 按开始时间排序的字典列表，时间单位为秒
+        """
+        rows = []
+        for node_id, ready_ns, start_ns, end_ns, _, thread_name, size, status in sorted(self.events, key=lambda e: e[2]):
+            rows.append({
+                'node_id': node_id,
+                'queue_wait': (start_ns - ready_ns) / 1e9,
+                'duration': (end_ns - start_ns) / 1e9,
+                'thread': thread_name,
+                'result_size': size,
+                'status': status
+            })
+        return rows
+    
+    def to_chrome_trace(self):
+        """
+        转换为 Chrome Trace Event 格式
+        
+        每个节点生成一个完整事件（ph=X），排队等待时间大于0时额外生成一个
+        等待事件，方便定位调度空隙和拖尾节点。
+        
+        Returns:
+            dict: Chrome Trace Event JSON对象
+        """
+        pid = os.getpid()
+        trace_events = []
+        threads = {}
+        
+        for node_id, ready_ns, start_ns, end_ns, tid, thread_name, size, status in self.events:
+            threads[tid] = thread_name
+            trace_events.append({
+                'name': node_id,
+                'cat': status,
+                'ph': 'X',
+                'ts': start_ns / 1000,
+                'dur': (end_ns - start_ns) / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': {
+                    'queue_wait_us': (start_ns - ready_ns) / 1000,
+                    'result_size': size,
+                    'status': status
+                }
+            })
+            if start_ns > ready_ns:
+                trace_events.append({
+                    'name': f"{node_id} (等待)",
+                    'cat': 'queue_wait',
+                    'ph': 'X',
+                    'ts': ready_ns / 1000,
+                    'dur': (start_ns - ready_ns) / 1000,
+                    'pid': pid,
+                    'tid': QUEUE_TID
+                })
+                threads.setdefault(QUEUE_TID, '排队等待')
+        
+        for tid, thread_name in threads.items():
+            trace_events.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': tid,
+                'args': {'name': thread_name}
+            })
+        
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+    
+    def export_chrome_trace(self, file_path):
+        """
+        导出为 Chrome Trace Event JSON 文件，可直接在 Perfetto (https://ui.perfetto.dev) 中打开
+        
+        Args:
+            file_path (str): 输出文件路径
+        
+        Returns:
+            str: 输出文件路径
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        return file_path
+    
+    def __len__(self):
+        return len(self.events)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+AI Agent JSONL 批量运行工具
+
+从JSONL文件或标准输入逐行流式读取请求（每行一个 {"type": ..., "params": {...}}），
+以固定并发交给 AIAgent 处理，每个请求完成后立即把结果作为一行JSON写出。
+结束时在标准错误输出吞吐量和按请求类型统计的 p50/p95/p99 延迟。
+输入不会一次性读入内存，同时在途的请求数不超过并发数的两倍。
+
+运行方式:
+    python -m src.utils.batch_runner requests.jsonl -o results.jsonl --concurrency 8
+    cat requests.jsonl | python -m src.utils.batch_runner - > results.jsonl
+"""
+
+import sys
+import os
+import json
+import math
+import time
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """
+    计算百分位数（最近秩法）
+    
+    Args:
+        sorted_values (list): 升序排列的数值
+        p (float): 百分位，取值 (0, 100]
+    
+    Returns:
+        float: 百分位数，没有数值时返回0.0
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def iter_requests(lines):
+    """
+    逐行解析JSONL请求，跳过空行
+    
+    Args:
+        lines (iterable): 文本行
+    
+    Yields:
+        tuple: (行号, 请求字典或None, 解析错误信息或None)
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("请求必须是JSON对象")
+        except ValueError as e:
+            yield line_number, None, f"无效的JSON: {e}"
+        else:
+            yield line_number, request, None
+
+
+def _timed(process, request):
+    start = time.perf_counter()
+    try:
+        return process(request), None, time.perf_counter() - start
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def run_batch(lines, process, output, concurrency=4):
+    """
+    流式处理JSONL请求并按完成顺序写出结果
+    
+    Args:
+        lines (iterable): 输入的文本行
+        process (callable): 处理单个请求的函数，例如 AIAgent.process_request
+        output (file): 结果输出流，每行一个JSON对象
+        concurrency (int, optional): 同时处理的请求数，默认4
+    
+    Returns:
+        dict: 统计信息，包含 total、succeeded、failed、elapsed、throughput，
+            以及 by_type（请求类型 -> {count, failed, p50, p95, p99}）
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency 必须为正整数")
+    
+    latencies = {}
+    failures = {}
+    counts = {'total': 0, 'failed': 0}
+    pending = {}
+    
+    def write(line_number, request_type, result, error, latency):
+        record = {'line': line_number, 'type': request_type, 'latency': latency}
+        if error is None:
+            record.update(status='ok', final_result=result.get('final_result'), results=result.get('results'))
+        else:
+            record.update(status='error', error=error)
+            counts['failed'] += 1
+            failures[request_type] = failures.get(request_type, 0) + 1
+        counts['total'] += 1
+        latencies.setdefault(request_type, []).append(latency)
+        output.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        output.flush()
+    
+    def drain(return_when):
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            line_number, request_type = pending.pop(future)
+            write(line_number, request_type, *future.result())
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch-runner') as executor:
+        for line_number, request, error in iter_requests(lines):
+            if request is None:
+                write(line_number, None, None, error, 0.0)
+                continue
+            
+            # 在途请求达到上限时先等待一部分完成，避免把整个输入读入内存
+            if len(pending) >= concurrency * 2:
+                drain(FIRST_COMPLETED)
+            future = executor.submit(_timed, process, request)
+            pending[future] = (line_number, request.get('type', 'analyze_data'))
+        
+        while pending:
+            drain(FIRST_COMPLETED)
+    elapsed = time.perf_counter() - start
+    
+    by_type = {}
+    for request_type, values in latencies.items():
+        values.sort()
+        by_type[request_type] = {
+            'count': len(values),
+            'failed': failures.get(request_type, 0),
+            **{f"p{p}": percentile(values, p) for p in PERCENTILES}
+        }
+    
+    return {
+        'total': counts['total'],
+        'succeeded': counts['total'] - counts['failed'],
+        'failed': counts['failed'],
+        'elapsed': elapsed,
+        'throughput': counts['total'] / elapsed if elapsed > 0 else 0.0,
+        'by_type': by_type
+    }
+
+
+def print_summary(stats, stream=sys.stderr):
+    """
+    打印吞吐量和延迟统计
+    
+    Args:
+        stats (dict): run_batch 返回的统计信息
+        stream (file, optional): 输出流，默认标准错误
+    """
+    print(f"\n处理完成: {stats['total']} 个请求，成功 {stats['succeeded']}，失败 {stats['failed']}", file=stream)
+    print(f"总耗时: {stats['elapsed']:.2f}秒，吞吐量: {stats['throughput']:.2f} 请求/秒", file=stream)
+    print(f"{'请求类型':<28}{'数量':>8}{'失败':>8}{'p50(秒)':>10}{'p95(秒)':>10}{'p99(秒)':>10}", file=stream)
+    for request_type, row in sorted(stats['by_type'].items(), key=lambda item: str(item[0])):
+        print(
+            f"{str(request_type):<28}{row['count']:>8}{row['failed']:>8}"
+            f"{row['p50']:>10.3f}{row['p95']:>10.3f}{row['p99']:>10.3f}",
+            file=stream
+        )
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='AI Agent JSONL 批量运行工具')
+    parser.add_argument('input', help="JSONL请求文件，'-' 表示标准输入")
+    parser.add_argument('-o', '--output', default='-', help="结果输出文件，默认 '-' 表示标准输出")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='同时处理的请求数')
+    parser.add_argument('--workers', type=int, help='Agent工作线程池的最大线程数')
+    parser.add_argument('--templates', help='启动时加载的模板目录')
+    parser.add_argument('--quiet', action='store_true', help='关闭执行事件输出')
+    args = parser.parse_args()
+    
+    from src.agent.agent import AIAgent
+    from src.agent.tasks import TaskLibrary
+    from src.dag import events
+    
+    if args.quiet:
+        events.set_level('silent')
+    if args.templates:
+        TaskLibrary.load_templates_from_directory(args.templates)
+    
+    input_file = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    
+    # 结果写到标准输出时，Agent和任务的日志改为输出到标准错误，保持结果为纯JSONL
+    original_stdout = sys.stdout
+    if output_file is original_stdout:
+        sys.stdout = sys.stderr
+    
+    agent = AIAgent(max_workers=args.workers)
+    try:
+        stats = run_batch(input_file, agent.process_request, output_file, concurrency=args.concurrency)
+    finally:
+        agent.shutdown()
+        events.get_default_dispatcher().flush()
+        sys.stdout = original_stdout
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    
+    print_summary(stats)
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
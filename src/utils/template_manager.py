@@ -7,6 +7,7 @@ AI Agent 模板管理工具
 
 import sys
 import os
+import time
 import argparse
 
 # 添加项目根目录到Python路径
@@ -32,6 +33,8 @@ def show_template(template_name):
     print(f"\n模板详情: {template_name}")
     print("-" * 50)
     print(f"模板名称: {template_info['name']}")
+    if template_info['extends']:
+        print(f"父模板: {template_info['extends']}")
     print(f"包含任务: {', '.join(template_info['tasks'])}")
     print()
     print("任务配置:")
@@ -39,6 +42,10 @@ def show_template(template_name):
         print(f"\n  {task_name}:")
         for key, value in task_config.items():
             print(f"    {key}: {value}")
+    
+    workflows = TaskLibrary.get_all_workflows().get(template_name)
+    if workflows:
+        print(f"\n工作流: {', '.join(workflows)}")
 
 def load_template(file_path):
     """从JSON文件加载模板"""
@@ -69,9 +76,22 @@ def delete_template(template_name):
     if TaskLibrary.delete_template(template_name):
         print(f"\n✓ 模板 {template_name} 删除成功!")
     else:
-        print(f"\n✗ 模板删除失败! 模板可能不存在或为默认模板.")
+        print(f"\n✗ 模板删除失败! 模板可能不存在、为默认模板或被其他模板继承.")
         sys.exit(1)
 
+def watch_templates(template_dir, interval):
+    """监视模板目录，文件变化时自动重新加载"""
+    store = TaskLibrary.get_template_store(template_dir)
+    store.start(interval)
+    print(f"\n正在监视 {template_dir}（每 {interval} 秒检查一次），按 Ctrl+C 退出")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n已停止监视")
+    finally:
+        store.stop()
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='AI Agent 模板管理工具')
@@ -103,6 +123,10 @@ def main():
     delete_parser = subparsers.add_parser('delete', help='删除模板')
     delete_parser.add_argument('template_name', help='模板名称')
     
+    # 监视模板目录命令
+    watch_parser = subparsers.add_parser('watch', help='监视模板目录，文件变化时自动重新加载')
+    watch_parser.add_argument('--interval', type=float, default=2.0, help='轮询间隔（秒）')
+    
     # 加载默认模板目录
     template_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'templates')
     if os.path.exists(template_dir):
@@ -124,6 +148,8 @@ def main():
         copy_template(args.source_name, args.new_name)
     elif args.command == 'delete':
         delete_template(args.template_name)
+    elif args.command == 'watch' and os.path.exists(template_dir):
+        watch_templates(template_dir, args.interval)
     else:
         parser.print_help()
 
@@ -0,0 +1,37 @@
+"""
+测试共用的任务函数：记录调用顺序，可以模拟节点失败
+"""
+
+# 按调用顺序记录的节点名称
+CALLS = []
+
+# 调用时抛出异常的节点名称
+FAILING = set()
+
+
+def reset():
+    """
+    清空调用记录和失败设置，在每个测试的 setUp 中调用
+    """
+    CALLS.clear()
+    FAILING.clear()
+
+
+def step(name, *args, **kwargs):
+    """
+    记录调用顺序的任务函数，名称在 FAILING 中时模拟崩溃
+    
+    返回列表而不是元组，结果经过检查点的JSON格式保存和恢复后仍然相等。
+    
+    Args:
+        name (str): 节点名称
+        *args: 位置参数，None（尚未填入的依赖占位符）被忽略
+        **kwargs: 关键字参数，按键排序后附加在结果末尾
+    
+    Returns:
+        list: [名称, 依赖结果和其他位置参数..., [键, 值]...]
+    """
+    CALLS.append(name)
+    if name in FAILING:
+        raise RuntimeError(f"{name} 崩溃")
+    return [name] + [value for value in args if value is not None] + [list(item) for item in sorted(kwargs.items())]
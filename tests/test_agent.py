@@ -0,0 +1,118 @@
+import unittest
+from unittest import mock
+from src.agent.agent import AIAgent, BATCH_SEPARATOR
+from src.agent.tasks import TaskLibrary
+from src.dag.dag import DAG
+
+
+def analyze_or_fail(data, template_name='default'):
+    """
+    查询为 'bad' 时失败的分析任务，其余查询返回固定的分析结果
+    """
+    if data['query'] == 'bad':
+        raise RuntimeError("分析失败")
+    return {
+        'data_summary': {'total_entries': 1, 'sources': data['sources'], 'query': data['query']},
+        'insights': ['洞察'],
+        'metrics': {'accuracy': 0.9, 'completeness': 0.9, 'relevance': 0.9}
+    }
+
+
+class TestProcessBatch(unittest.TestCase):
+    """
+    AIAgent 批量处理测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作：将默认模板中所有任务的 delay 设为0，关闭事件输出
+        """
+        self.default_template = TaskLibrary.templates.thaw('default')
+        template = TaskLibrary.templates.thaw('default')
+        for config in template.values():
+            config['delay'] = 0
+        TaskLibrary.register_template('default', template)
+        TaskLibrary.events.set_level('silent')
+        self.agent = AIAgent(max_workers=4)
+    
+    def tearDown(self):
+        """
+        测试后的清理工作
+        """
+        self.agent.shutdown()
+        TaskLibrary.events.set_level('info')
+        TaskLibrary.register_template('default', self.default_template)
+    
+    def request(self, query, request_type='analyze_data'):
+        return {'type': request_type, 'params': {'query': query}}
+    
+    def test_namespaced_node_ids(self):
+        """
+        测试同一个DAG中的多个请求的节点ID带有请求序号前缀，互不冲突
+        """
+        dag = DAG()
+        params = {'query': 'sales'}
+        _, first = self.agent._build_dag('analyze_data', params, dag, prefix=f"0{BATCH_SEPARATOR}")
+        _, second = self.agent._build_dag('analyze_data', params, dag, prefix=f"1{BATCH_SEPARATOR}")
+        
+        self.assertEqual((first, second), ('0/generate_report', '1/generate_report'))
+        self.assertEqual(len(dag.nodes), 8)
+        self.assertIn('1/collect_data', dag.nodes['1/clean_data'].dependencies)
+        self.assertNotIn('0/collect_data', dag.nodes['1/clean_data'].dependencies)
+    
+    def test_results_split_per_request(self):
+        """
+        测试结果和最终结果按请求拆分，节点ID不带前缀
+        """
+        outputs = self.agent.process_batch(
+            [self.request('sales'), self.request('churn', 'send_report')], dedupe=False
+        )
+        
+        self.assertEqual([output['request']['params']['query'] for output in outputs], ['sales', 'churn'])
+        self.assertEqual(
+            set(outputs[0]['results']), {'collect_data', 'clean_data', 'analyze_data', 'generate_report'}
+        )
+        self.assertIn('send_email', outputs[1]['results'])
+        self.assertIs(outputs[0]['final_result'], outputs[0]['results']['generate_report'])
+        self.assertIs(outputs[1]['final_result'], outputs[1]['results']['send_email'])
+        self.assertEqual(outputs[0]['results']['collect_data']['query'], 'sales')
+        self.assertEqual(outputs[1]['results']['collect_data']['query'], 'churn')
+        self.assertEqual([output['errors'] for output in outputs], [{}, {}])
+    
+    def test_failure_is_isolated(self):
+        """
+        测试单个请求失败时只跳过该请求的下游节点，其他请求正常完成
+        """
+        with mock.patch.object(TaskLibrary, 'analyze_data', staticmethod(analyze_or_fail)):
+            agent = AIAgent(max_workers=4)
+            try:
+                outputs = agent.process_batch([self.request('sales'), self.request('bad'), self.request('churn')])
+            finally:
+                agent.shutdown()
+        
+        good, bad, other = outputs
+        self.assertEqual(set(bad['errors']), {'analyze_data'})
+        self.assertIsNone(bad['final_result'])
+        self.assertNotIn('generate_report', bad['results'])
+        self.assertIn('clean_data', bad['results'])
+        for output in (good, other):
+            self.assertEqual(output['errors'], {})
+            self.assertIsNotNone(output['final_result'])
+    
+    def test_duplicate_requests_share_aliased_results(self):
+        """
+        测试去重后被合并的请求通过别名得到保留节点的结果，副作用节点和报告生成节点不合并
+        """
+        outputs = self.agent.process_batch(
+            [self.request('sales', 'send_report'), self.request('sales', 'send_report')]
+        )
+        
+        first, second = outputs
+        self.assertEqual(set(first['results']), set(second['results']))
+        self.assertIs(first['results']['analyze_data'], second['results']['analyze_data'])
+        self.assertIsNot(first['results']['generate_report'], second['results']['generate_report'])
+        self.assertIsNot(first['results']['send_email'], second['results']['send_email'])
+        self.assertIsNot(first['final_result'], second['final_result'])
+
+if __name__ == "__main__":
+    unittest.main()
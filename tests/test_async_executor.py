@@ -0,0 +1,116 @@
+import asyncio
+import time
+import unittest
+from src.dag.dag import DAG
+from src.dag.async_executor import AsyncDAGExecutor
+
+class TestAsyncDAGExecutor(unittest.TestCase):
+    """
+    异步DAG执行器测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.dag = DAG()
+    
+    def test_mixed_async_and_sync_tasks(self):
+        """
+        测试协程任务和同步任务混合执行，依赖结果按相同规则传递
+        """
+        async def fetch(query):
+            await asyncio.sleep(0.01)
+            return {'query': query}
+        
+        def clean(data):
+            return {**data, 'cleaned': True}
+        
+        async def report(data, title):
+            return f"{title}: {data['query']} {data['cleaned']}"
+        
+        self.dag.add_node("fetch", data={'func': fetch, 'args': ('sales',)})
+        self.dag.add_node("clean", data={'func': clean, 'args': (None,)})
+        self.dag.add_node("report", data={'func': report, 'args': (None, 'T')})
+        self.dag.add_edge("fetch", "clean")
+        self.dag.add_edge("clean", "report")
+        
+        results = asyncio.run(AsyncDAGExecutor(self.dag).run())
+        
+        self.assertEqual(results["report"], "T: sales True")
+        self.assertEqual(self.dag.nodes["report"].state, 'completed')
+    
+    def test_wide_dag_runs_concurrently_on_one_loop(self):
+        """
+        测试大量IO等待型协程在同一个事件循环上并发执行
+        """
+        async def wait(*args, **kwargs):
+            await asyncio.sleep(0.05)
+        
+        for i in range(200):
+            self.dag.add_node(f"io{i}", data={'func': wait})
+        
+        start = time.perf_counter()
+        AsyncDAGExecutor(self.dag).execute()
+        
+        self.assertLess(time.perf_counter() - start, 0.5)
+    
+    def test_failure_propagates(self):
+        """
+        测试协程任务失败时异常传递给调用方
+        """
+        async def fail():
+            raise RuntimeError("boom")
+        
+        self.dag.add_node("a", data={'func': fail})
+        
+        with self.assertRaises(RuntimeError):
+            AsyncDAGExecutor(self.dag).execute()
+        self.assertEqual(self.dag.nodes["a"].state, 'failed')
+    
+    def test_skip_descendants_keeps_independent_branches(self):
+        """
+        测试skip_descendants策略下独立分支继续执行，失败节点的下游被跳过
+        """
+        async def fail():
+            raise RuntimeError("boom")
+        
+        async def ok(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return 'ok'
+        
+        self.dag.add_node("a", data={'func': fail})
+        self.dag.add_node("b", data={'func': ok})
+        self.dag.add_node("c", data={'func': ok})
+        self.dag.add_edge("a", "b")
+        
+        executor = AsyncDAGExecutor(self.dag, failure_policy='skip_descendants')
+        results = executor.execute()
+        
+        self.assertEqual(results, {'c': 'ok'})
+        self.assertEqual(executor.report['skipped'], ['b'])
+        self.assertEqual(executor.report['status'], 'partial')
+    
+    def test_timeout_and_retry(self):
+        """
+        测试协程任务超时后重试
+        """
+        calls = []
+        
+        async def slow_then_fast():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+            return 'ok'
+        
+        self.dag.add_node("a", data={'func': slow_then_fast, 'timeout': 0.05, 'retries': 1, 'backoff': 0})
+        
+        start = time.perf_counter()
+        executor = AsyncDAGExecutor(self.dag)
+        self.assertEqual(executor.execute()["a"], 'ok')
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(executor.report['retried'], {'a': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
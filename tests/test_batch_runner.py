@@ -0,0 +1,80 @@
+import io
+import json
+import threading
+import time
+import unittest
+from src.utils.batch_runner import percentile, run_batch
+
+
+class TestBatchRunner(unittest.TestCase):
+    """
+    JSONL批量运行工具测试用例
+    """
+    
+    def test_streams_results_and_reports_percentiles(self):
+        """
+        测试逐行处理请求、按完成顺序写出结果并按类型统计延迟
+        """
+        def process(request):
+            if request['type'] == 'bad':
+                raise ValueError("不支持的请求类型: bad")
+            time.sleep(request['params']['delay'])
+            return {'final_result': request['params']['delay'], 'results': {}}
+        
+        lines = [json.dumps({'type': 'fast', 'params': {'delay': 0.0}}) for _ in range(5)]
+        lines.insert(0, json.dumps({'type': 'slow', 'params': {'delay': 0.05}}))
+        lines += ['', '{not json', json.dumps({'type': 'bad'})]
+        
+        output = io.StringIO()
+        stats = run_batch(iter(lines), process, output, concurrency=2)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        
+        self.assertEqual(stats['total'], 8)
+        self.assertEqual(stats['failed'], 2)
+        self.assertEqual(len(records), 8)
+        # slow 请求最先读入，但在 fast 请求之后完成
+        self.assertNotEqual(records[0]['type'], 'slow')
+        self.assertEqual({record['line'] for record in records}, {1, 2, 3, 4, 5, 6, 8, 9})
+        self.assertEqual([r['status'] for r in records if r['line'] == 8], ['error'])
+        self.assertEqual(stats['by_type']['fast']['count'], 5)
+        self.assertGreaterEqual(stats['by_type']['slow']['p99'], 0.05)
+        self.assertEqual(stats['by_type']['bad']['failed'], 1)
+        self.assertGreater(stats['throughput'], 0)
+    
+    def test_bounded_in_flight(self):
+        """
+        测试输入按需读取，在途请求数不超过并发数的两倍
+        """
+        lock = threading.Lock()
+        state = {'read': 0, 'done': 0, 'peak': 0}
+        
+        def lines():
+            for _ in range(50):
+                with lock:
+                    state['read'] += 1
+                    state['peak'] = max(state['peak'], state['read'] - state['done'])
+                yield json.dumps({'type': 't'})
+        
+        def process(request):
+            time.sleep(0.002)
+            with lock:
+                state['done'] += 1
+            return {}
+        
+        stats = run_batch(lines(), process, io.StringIO(), concurrency=3)
+        
+        self.assertEqual(stats['total'], 50)
+        self.assertLessEqual(state['peak'], 3 * 2 + 1)
+    
+    def test_percentile(self):
+        """
+        测试最近秩法百分位数
+        """
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from src.dag.blueprint import Blueprint, Param
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutor
+from tests.recorder import reset, step
+
+
+class TestBlueprint(unittest.TestCase):
+    """
+    DAG蓝图测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        reset()
+        self.blueprint = Blueprint('pipeline', output='report')
+        self.blueprint.add_node('load', {'func': step, 'args': ('load', Param('query'))})
+        self.blueprint.add_node('clean', {'func': step, 'args': ('clean', None)})
+        self.blueprint.add_node('report', {
+            'func': step,
+            'args': ('report', None),
+            'kwargs': {'to': Param('recipient', 'nobody')}
+        })
+        self.blueprint.add_edge('load', 'clean')
+        self.blueprint.add_edge('clean', 'report')
+    
+    def test_instantiate_binds_params(self):
+        """
+        测试实例化时替换参数占位符，实例之间互不影响
+        """
+        first = self.blueprint.instantiate({'query': 'sales', 'recipient': 'a@example.com'})
+        second = self.blueprint.instantiate({'query': 'users'})
+        
+        self.assertEqual(first.nodes['load'].data['args'], ('load', 'sales'))
+        self.assertEqual(second.nodes['load'].data['args'], ('load', 'users'))
+        self.assertEqual(second.nodes['report'].data['kwargs'], {'to': 'nobody'})
+        self.assertIsNot(first.nodes['clean'].data, second.nodes['clean'].data)
+        self.assertEqual(first.topological_sort(), ['load', 'clean', 'report'])
+        self.assertEqual(set(self.blueprint.params), {'query', 'recipient'})
+        
+        results = DAGExecutor(first).execute()
+        self.assertEqual(
+            results['report'],
+            ['report', ['clean', ['load', 'sales']], ['to', 'a@example.com']]
+        )
+    
+    def test_instantiate_into_shared_dag(self):
+        """
+        测试带前缀实例化到同一个DAG中，拓扑顺序与重新排序的结果一致
+        """
+        dag = DAG()
+        self.blueprint.instantiate({'query': 'a'}, dag, prefix='0/')
+        self.blueprint.instantiate({'query': 'b'}, dag, prefix='1/')
+        
+        self.assertEqual(len(dag.nodes), 6)
+        self.assertEqual(list(dag.nodes['1/report'].dependencies), ['1/clean'])
+        self.assertEqual(dag.topological_sort(), ['0/load', '1/load', '0/clean', '1/clean', '0/report', '1/report'])
+        
+        with self.assertRaises(ValueError):
+            self.blueprint.instantiate({'query': 'c'}, dag, prefix='0/')
+    
+    def test_validation(self):
+        """
+        测试环在构建蓝图时报告，编译后不能修改，缺少必需参数时报错
+        """
+        with self.assertRaises(ValueError):
+            self.blueprint.add_edge('report', 'load')
+        
+        self.blueprint.compile()
+        with self.assertRaises(ValueError):
+            self.blueprint.add_node('extra')
+        with self.assertRaises(ValueError):
+            self.blueprint.instantiate({})
+        
+        with self.assertRaises(ValueError):
+            Blueprint(output='missing').compile()
+    
+    def test_cached_order_invalidated(self):
+        """
+        测试实例DAG被修改后拓扑顺序重新计算
+        """
+        dag = self.blueprint.instantiate({'query': 'sales'})
+        dag.add_node('extra')
+        dag.add_edge('extra', 'load')
+        
+        self.assertEqual(dag.topological_sort(), ['extra', 'load', 'clean', 'report'])
+
+if __name__ == "__main__":
+    unittest.main()
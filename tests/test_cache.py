@@ -0,0 +1,159 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutor
+from src.dag.cache import MemoryCache, DiskCache, make_cache_key
+from tests.recorder import CALLS, reset, step
+
+
+def tag_words(words):
+    """
+    包含推导式和集合常量的任务函数，用于测试指纹跨进程稳定
+    """
+    return [(word, word in {'alpha', 'beta', 'gamma'}) for word in words]
+
+
+class Scaler:
+    """
+    以绑定方法作为任务函数的服务对象
+    """
+    
+    def __init__(self, factor):
+        self.factor = factor
+    
+    def scale(self, value):
+        return self.factor * value
+
+class TestResultCache(unittest.TestCase):
+    """
+    节点结果缓存测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        reset()
+    
+    def build(self, query, **summary_options):
+        dag = DAG()
+        dag.add_node("load", data={'func': step, 'args': ("load", query)})
+        dag.add_node("summarize", data={'func': step, 'args': ("summarize", None), **summary_options})
+        dag.add_edge("load", "summarize")
+        return dag
+    
+    def test_repeated_run_hits_cache(self):
+        """
+        测试相同参数的重复执行命中缓存，参数变化时重新执行
+        """
+        cache = MemoryCache()
+        first = DAGExecutor(self.build("sales"), cache=cache).execute(parallel=True)
+        second = DAGExecutor(self.build("sales"), cache=cache).execute(parallel=False)
+        DAGExecutor(self.build("churn"), cache=cache).execute(parallel=True)
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first["summarize"], ["summarize", ["load", "sales"]])
+        self.assertEqual(CALLS, ["load", "summarize", "load", "summarize"])
+    
+    def test_opt_out_and_ttl(self):
+        """
+        测试节点级别的缓存关闭和过期时间
+        """
+        cache = MemoryCache()
+        DAGExecutor(self.build("sales", cache=False), cache=cache).execute()
+        DAGExecutor(self.build("sales", cache=False), cache=cache).execute()
+        self.assertEqual(CALLS, ["load", "summarize", "summarize"])
+        
+        cache.set("key", "value", ttl=0.01)
+        self.assertEqual(cache.get("key"), (True, "value"))
+        time.sleep(0.02)
+        self.assertEqual(cache.get("key"), (False, None))
+    
+    def test_lru_eviction(self):
+        """
+        测试内存缓存按最近最少使用淘汰
+        """
+        cache = MemoryCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("a"), (True, 1))
+    
+    def test_disk_cache_survives_new_instance(self):
+        """
+        测试磁盘缓存可以被新的缓存实例复用
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            DAGExecutor(self.build("sales"), cache=DiskCache(directory)).execute()
+            results = DAGExecutor(self.build("sales"), cache=DiskCache(directory)).execute()
+        
+        self.assertEqual(results["summarize"], ["summarize", ["load", "sales"]])
+        self.assertEqual(len(CALLS), 2)
+    
+    def test_key_depends_on_function_args_and_upstream(self):
+        """
+        测试缓存键随函数、参数和上游结果变化
+        """
+        key = make_cache_key(step, ("a",), {}, [])
+        self.assertEqual(key, make_cache_key(step, ("a",), {}, []))
+        self.assertNotEqual(key, make_cache_key(tag_words, ("a",), {}, []))
+        self.assertNotEqual(key, make_cache_key(step, ("b",), {}, []))
+        self.assertNotEqual(key, make_cache_key(step, ("a",), {}, ["upstream"]))
+    
+    def test_bound_methods_of_different_instances(self):
+        """
+        测试不同实例的同一个绑定方法使用不同的缓存键，不会互相返回结果
+        """
+        cache = MemoryCache()
+        results = []
+        for factor in (2, 3, 3):
+            dag = DAG()
+            dag.add_node("scale", data={'func': Scaler(factor).scale, 'args': (5,)})
+            results.append(DAGExecutor(dag, cache=cache).execute()["scale"])
+        
+        self.assertEqual(results, [10, 15, 15])
+        self.assertEqual(len(cache), 2)
+    
+    def test_disk_cache_removes_temporary_file_on_failure(self):
+        """
+        测试无法pickle的值写入失败时不留下临时文件
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory)
+            with self.assertRaises(Exception):
+                cache.set("key", lambda: None)
+            self.assertEqual(os.listdir(directory), [])
+            self.assertEqual(cache.get("key"), (False, None))
+    
+    def test_fingerprint_is_stable_across_processes(self):
+        """
+        测试包含推导式的函数在新进程（不同的字符串哈希种子）中得到相同的指纹
+        """
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        script = (
+            "from src.dag.cache import fingerprint_function\n"
+            "from tests.test_cache import tag_words\n"
+            "print(fingerprint_function(tag_words))"
+        )
+        outputs = {
+            subprocess.run(
+                [sys.executable, '-c', script],
+                cwd=root,
+                env={**os.environ, 'PYTHONHASHSEED': seed},
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout.strip()
+            for seed in ('1', '2', '3')
+        }
+        self.assertEqual(len(outputs), 1)
+
+if __name__ == "__main__":
+    unittest.main()
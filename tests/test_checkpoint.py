@@ -0,0 +1,165 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutionError, DAGExecutor
+from src.dag.checkpoint import FileCheckpointStore, SQLiteCheckpointStore
+from tests.recorder import CALLS, FAILING, reset, step
+
+
+def build_dag():
+    """
+    构建测试用的DAG：load -> clean -> report，以及独立的 side
+    """
+    dag = DAG()
+    dag.add_node("load", data={'func': step, 'args': ('load',)})
+    dag.add_node("clean", data={'func': step, 'args': ('clean', None)})
+    dag.add_node("report", data={'func': step, 'args': ('report', None)})
+    dag.add_node("side", data={'func': step, 'args': ('side',)})
+    dag.add_edge("load", "clean")
+    dag.add_edge("clean", "report")
+    return dag
+
+
+# 在独立进程中执行（崩溃）或恢复测试DAG，最后一行输出实际调用的节点
+PROCESS_SCRIPT = '''
+import sys
+from src.dag.checkpoint import FileCheckpointStore
+from src.dag.executor import DAGExecutionError, DAGExecutor
+from tests.recorder import CALLS, FAILING
+from tests.test_checkpoint import build_dag
+
+directory, run_id, mode = sys.argv[1:]
+executor = DAGExecutor(build_dag(), checkpoint=FileCheckpointStore(directory), run_id=run_id, failure_policy='continue')
+try:
+    if mode == 'crash':
+        FAILING.add('clean')
+        executor.execute()
+    else:
+        executor.resume(run_id)
+except DAGExecutionError:
+    pass
+executor.events.flush()
+print('CALLS:' + ','.join(sorted(CALLS)))
+'''
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    检查点与恢复执行测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        reset()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dag = build_dag()
+    
+    def tearDown(self):
+        """
+        测试后的清理工作
+        """
+        self.tmp.cleanup()
+    
+    def _crash_and_resume(self, make_store, parallel):
+        store = make_store()
+        FAILING.add('clean')
+        executor = DAGExecutor(self.dag, checkpoint=store, failure_policy='continue')
+        with self.assertRaises(DAGExecutionError):
+            executor.execute(parallel=parallel)
+        run_id = executor.run_id
+        self.assertEqual(sorted(store.load(run_id)), ['load', 'side'])
+        
+        # 模拟进程重启：新的存储对象和执行器
+        reset()
+        executor = DAGExecutor(self.dag, checkpoint=make_store())
+        results = executor.resume(run_id, parallel=parallel)
+        
+        self.assertEqual(sorted(CALLS), ['clean', 'report'])
+        self.assertEqual(results['report'], ['report', ['clean', ['load']]])
+        self.assertEqual(results['side'], ['side'])
+        self.assertEqual(sorted(store.load(run_id)), ['clean', 'load', 'report', 'side'])
+        self.assertEqual(executor.report['run_id'], run_id)
+    
+    def test_resume_skips_completed_nodes(self):
+        """
+        测试恢复执行时跳过已完成的节点，只执行失败节点及其下游
+        """
+        directory = os.path.join(self.tmp.name, 'pickle')
+        for parallel in (True, False):
+            self._crash_and_resume(lambda: FileCheckpointStore(directory), parallel)
+        
+        directory = os.path.join(self.tmp.name, 'json')
+        self._crash_and_resume(lambda: FileCheckpointStore(directory, format='json'), True)
+        
+        path = os.path.join(self.tmp.name, 'checkpoints.db')
+        stores = []
+        self._crash_and_resume(lambda: stores.append(SQLiteCheckpointStore(path)) or stores[-1], True)
+        for store in stores:
+            store.close()
+    
+    def test_resume_in_new_process(self):
+        """
+        测试在新进程中恢复时检查点的指纹仍然匹配，只执行失败节点及其下游
+        """
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        
+        def run(mode, seed):
+            output = subprocess.run(
+                [sys.executable, '-c', PROCESS_SCRIPT, self.tmp.name, 'run-process', mode],
+                cwd=root,
+                env={**os.environ, 'PYTHONHASHSEED': seed},
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+            return [line for line in output.splitlines() if line.startswith('CALLS:')][-1]
+        
+        self.assertEqual(run('crash', '1'), 'CALLS:clean,load,side')
+        self.assertEqual(run('resume', '2'), 'CALLS:clean,report')
+    
+    def test_resume_reruns_changed_nodes(self):
+        """
+        测试节点定义在恢复前发生变化时，该节点及其下游重新执行
+        """
+        store = FileCheckpointStore(self.tmp.name)
+        executor = DAGExecutor(self.dag, checkpoint=store, run_id='run-1')
+        executor.execute()
+        
+        CALLS.clear()
+        self.dag.nodes["clean"].data['kwargs'] = {'strict': True}
+        results = DAGExecutor(self.dag, checkpoint=store).resume('run-1')
+        
+        self.assertEqual(sorted(CALLS), ['clean', 'report'])
+        self.assertEqual(results['load'], ['load'])
+    
+    def test_store_operations(self):
+        """
+        测试检查点存储的读写、列出和删除
+        """
+        stores = [
+            FileCheckpointStore(os.path.join(self.tmp.name, 'files')),
+            SQLiteCheckpointStore(os.path.join(self.tmp.name, 'checkpoints.db'))
+        ]
+        for store in stores:
+            store.save('r1', 'a', 'fp-a', {'value': 1})
+            store.save('r1', 'a', 'fp-a2', {'value': 2})
+            store.save('r2', 'b', None, [1, 2])
+            
+            self.assertEqual(store.load('r1'), {'a': ('fp-a2', {'value': 2})})
+            self.assertEqual(store.list_runs(), ['r1', 'r2'])
+            store.delete('r1')
+            self.assertEqual(store.load('r1'), {})
+            self.assertEqual(store.list_runs(), ['r2'])
+        stores[1].close()
+        
+        with self.assertRaises(ValueError):
+            FileCheckpointStore(self.tmp.name, format='yaml')
+        with self.assertRaises(ValueError):
+            DAGExecutor(self.dag).resume('r1')
+
+if __name__ == "__main__":
+    unittest.main()
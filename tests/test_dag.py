@@ -2,6 +2,7 @@ import unittest
 from src.dag.dag import DAG
 from src.dag.node import Node
 from src.dag.edge import Edge
+from src.dag.compact import CompactDAG
 
 class TestDAG(unittest.TestCase):
     """
@@ -69,6 +70,52 @@ class TestDAG(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.dag.add_edge("node2", "node1")  # 会导致环
     
+    def test_add_self_loop_edge(self):
+        """
+        测试添加自环边
+        """
+        self.dag.add_node("node1")
+        with self.assertRaises(ValueError):
+            self.dag.add_edge("node1", "node1")
+    
+    def test_bulk_validates_once_at_end(self):
+        """
+        测试批量构建模式在退出时统一检测环
+        """
+        for node_id in ["1", "2", "3"]:
+            self.dag.add_node(node_id)
+        
+        with self.dag.bulk():
+            self.dag.add_edge("1", "2")
+            self.dag.add_edge("2", "3")
+        self.assertEqual(self.dag.topological_sort(), ["1", "2", "3"])
+        
+        with self.assertRaises(ValueError):
+            with self.dag.bulk():
+                self.dag.add_node("4")
+                self.dag.add_edge("3", "4")
+                self.dag.add_edge("3", "1")
+        
+        # 校验失败时撤销上下文中新增的节点和边
+        self.assertEqual(list(self.dag.nodes), ["1", "2", "3"])
+        self.assertEqual([(edge.source, edge.target) for edge in self.dag.edges], [("1", "2"), ("2", "3")])
+        self.assertEqual(self.dag.topological_sort(), ["1", "2", "3"])
+        
+        # 退出批量模式后恢复逐条检测
+        with self.assertRaises(ValueError):
+            self.dag.add_edge("3", "1")
+        
+        # 上下文中抛出异常时同样撤销，不留下未经检测的环
+        with self.assertRaises(KeyError):
+            with self.dag.bulk():
+                self.dag.add_node("5")
+                self.dag.add_edge("3", "5")
+                self.dag.add_edge("5", "1")
+                raise KeyError("构建失败")
+        self.assertEqual(list(self.dag.nodes), ["1", "2", "3"])
+        self.assertEqual(len(self.dag.edges), 2)
+        self.assertEqual(self.dag.topological_sort(), ["1", "2", "3"])
+    
     def test_remove_node(self):
         """
         测试移除节点
@@ -97,6 +144,75 @@ class TestDAG(unittest.TestCase):
         self.assertEqual(len(self.dag.nodes["node2"].dependencies), 0)
         self.assertEqual(len(self.dag.nodes["node1"].dependents), 0)
     
+    def test_edge_lookup(self):
+        """
+        测试按源节点和目标节点查找边，以及重复添加边
+        """
+        self.dag.add_node("node1")
+        self.dag.add_node("node2")
+        edge = self.dag.add_edge("node1", "node2")
+        
+        self.assertTrue(self.dag.has_edge("node1", "node2"))
+        self.assertFalse(self.dag.has_edge("node2", "node1"))
+        self.assertIs(self.dag.get_edge("node1", "node2"), edge)
+        self.assertIsNone(self.dag.get_edge("node2", "node1"))
+        
+        # 重复添加边不报错，返回已有的边，依赖关系不变
+        self.assertIs(self.dag.add_edge("node1", "node2"), edge)
+        self.assertEqual(len(self.dag.edges), 1)
+        self.assertEqual(self.dag.nodes["node2"].dependencies, ["node1"])
+    
+    def test_list_compatible_adjacency(self):
+        """
+        测试依赖列表和边列表保持列表接口：下标、append、remove、与列表比较和整体赋值
+        """
+        for node_id in ["1", "2", "3"]:
+            self.dag.add_node(node_id)
+        self.dag.add_edge("1", "3")
+        self.dag.add_edge("2", "3")
+        
+        dependencies = self.dag.nodes["3"].dependencies
+        self.assertEqual(dependencies, ["1", "2"])
+        self.assertEqual((dependencies[0], dependencies[-1], dependencies[:1]), ("1", "2", ["1"]))
+        self.assertEqual(dependencies.index("2"), 1)
+        self.assertEqual(repr(self.dag.nodes["3"]), "Node(id=3, state=pending, dependencies=['1', '2'])")
+        
+        dependents = self.dag.nodes["1"].dependents
+        dependents.append("2")
+        dependents.remove("2")
+        self.assertEqual(dependents, ["3"])
+        with self.assertRaises(ValueError):
+            dependents.remove("2")
+        
+        edges = self.dag.edges
+        self.dag.edges = edges[:1]
+        self.assertEqual([(edge.source, edge.target) for edge in self.dag.edges], [("1", "3")])
+        self.assertEqual(self.dag.nodes["3"].dependencies, ["1"])
+        self.assertEqual(self.dag.nodes["2"].dependents, [])
+        
+        # 赋值的边构成环时保留原来的边
+        with self.assertRaises(ValueError):
+            self.dag.edges = edges + [Edge("3", "1")]
+        self.assertEqual(self.dag.topological_sort(), ["1", "2", "3"])
+        self.assertEqual(len(self.dag.edges), 1)
+    
+    def test_remove_middle_node_keeps_other_edges(self):
+        """
+        测试移除中间节点只删除与其相关的边，其余依赖顺序保持不变
+        """
+        for node_id in ["1", "2", "3", "4"]:
+            self.dag.add_node(node_id)
+        self.dag.add_edge("1", "4")
+        self.dag.add_edge("2", "4")
+        self.dag.add_edge("3", "4")
+        self.dag.add_edge("1", "2")
+        
+        self.dag.remove_node("2")
+        
+        self.assertEqual(self.dag.get_predecessors("4"), ["1", "3"])
+        self.assertEqual(self.dag.get_successors("1"), ["4"])
+        self.assertEqual([(e.source, e.target) for e in self.dag.edges], [("1", "4"), ("3", "4")])
+    
     def test_topological_sort(self):
         """
         测试拓扑排序
@@ -115,6 +231,22 @@ class TestDAG(unittest.TestCase):
         self.assertEqual(topological_order[-1], "3")
         self.assertLess(topological_order.index("2"), topological_order.index("3"))
     
+    def test_topological_sort_priority(self):
+        """
+        测试拓扑排序按优先级确定性地打破平局
+        """
+        for node_id in ["a", "b", "c", "d"]:
+            self.dag.add_node(node_id)
+        self.dag.add_edge("a", "d")
+        
+        # 默认按添加顺序输出就绪节点
+        self.assertEqual(self.dag.topological_sort(), ["a", "b", "c", "d"])
+        
+        # 优先级高的就绪节点先输出，相同优先级按添加顺序
+        order = self.dag.topological_sort(priority={"c": 2, "d": 5})
+        self.assertEqual(order, ["c", "a", "d", "b"])
+        self.assertEqual(self.dag.topological_sort(priority=lambda node_id: 0), ["a", "b", "c", "d"])
+    
     def test_get_roots(self):
         """
         测试获取根节点
@@ -147,5 +279,43 @@ class TestDAG(unittest.TestCase):
         self.assertIn("2", leaves)
         self.assertIn("3", leaves)
 
+class TestCompactDAG(unittest.TestCase):
+    """
+    紧凑DAG测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.dag = CompactDAG()
+        for node_id in ["1", "2", "3", "4"]:
+            self.dag.add_node(node_id, data=f"data{node_id}")
+        self.dag.add_edge("1", "3")
+        self.dag.add_edge("2", "3")
+        self.dag.add_edge("3", "4")
+    
+    def test_queries_match_dag(self):
+        """
+        测试紧凑DAG的查询结果与普通DAG一致
+        """
+        dag = self.dag.to_dag()
+        
+        self.assertEqual(self.dag.topological_sort(), dag.topological_sort())
+        self.assertEqual(self.dag.get_roots(), dag.get_roots())
+        self.assertEqual(self.dag.get_leaves(), dag.get_leaves())
+        self.assertEqual(self.dag.get_predecessors("3"), dag.get_predecessors("3"))
+        self.assertEqual(self.dag.get_successors("3"), dag.get_successors("3"))
+        self.assertEqual(dag.nodes["2"].data, "data2")
+        self.assertEqual(CompactDAG.from_dag(dag).get_predecessors("3"), ["1", "2"])
+    
+    def test_cycle_reported_on_validate(self):
+        """
+        测试紧凑DAG在校验时报告环
+        """
+        self.dag.add_edge("4", "1")
+        with self.assertRaises(ValueError):
+            self.dag.validate()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
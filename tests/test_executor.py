@@ -0,0 +1,492 @@
+import json
+import os
+import tempfile
+import time
+import threading
+import unittest
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutionError, DAGExecutor
+from src.dag.events import EventDispatcher, ListSink
+from src.dag.pool import WorkerPool
+from src.dag.retry import NodeTimeoutError, backoff_delay, get_retry_settings
+from src.dag.scheduling import DurationHistory, upward_ranks
+from tests.recorder import CALLS, reset, step
+
+
+def flaky(name, failures, delay=0):
+    """
+    前 failures 次调用失败（或睡眠 delay 秒）的任务函数，用于重试测试
+    """
+    attempt = CALLS.count(name)
+    CALLS.append(name)
+    if attempt < failures:
+        if delay:
+            time.sleep(delay)
+        else:
+            raise ConnectionError(f"{name} 第 {attempt + 1} 次调用失败")
+    return name
+
+
+def square(x):
+    """
+    可被pickle的模块级任务函数，用于进程后端测试
+    """
+    return x * x
+
+
+def cancel_aware(x, cancel_event=None):
+    """
+    声明了 cancel_event 参数的模块级任务函数，用于进程后端测试
+    """
+    return x, cancel_event
+
+class TestDAGExecutor(unittest.TestCase):
+    """
+    DAG执行器测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        reset()
+        self.dag = DAG()
+    
+    def test_parallel_passes_dependency_results(self):
+        """
+        测试并行执行时依赖结果按顺序传递
+        """
+        self.dag.add_node("a", data={'func': lambda: 1})
+        self.dag.add_node("b", data={'func': lambda x: x + 1, 'args': (None,)})
+        self.dag.add_node("c", data={'func': lambda x: x * 10, 'args': (None,)})
+        self.dag.add_edge("a", "b")
+        self.dag.add_edge("b", "c")
+        
+        results = DAGExecutor(self.dag).execute(parallel=True)
+        
+        self.assertEqual(results, {"a": 1, "b": 2, "c": 20})
+        self.assertEqual(self.dag.nodes["c"].state, 'completed')
+    
+    def test_parallel_starts_ready_nodes_without_polling(self):
+        """
+        测试节点在最后一个依赖完成后立即启动，宽DAG完全并行
+        """
+        def slow(*args, **kwargs):
+            time.sleep(0.05)
+        
+        self.dag.add_node("root", data={'func': slow})
+        for i in range(10):
+            self.dag.add_node(f"leaf{i}", data={'func': slow})
+            self.dag.add_edge("root", f"leaf{i}")
+        
+        start = time.perf_counter()
+        DAGExecutor(self.dag, max_workers=10).execute(parallel=True)
+        elapsed = time.perf_counter() - start
+        
+        # 关键路径为两个节点（0.1秒），轮询实现至少需要额外的0.1秒
+        self.assertLess(elapsed, 0.18)
+    
+    def test_parallel_failure_does_not_hang(self):
+        """
+        测试节点失败时并行执行抛出异常而不是挂起
+        """
+        def fail():
+            raise RuntimeError("boom")
+        
+        self.dag.add_node("a", data={'func': fail})
+        self.dag.add_node("b", data={'func': lambda x: x, 'args': (None,)})
+        self.dag.add_edge("a", "b")
+        
+        with self.assertRaises(RuntimeError):
+            DAGExecutor(self.dag).execute(parallel=True)
+        self.assertEqual(self.dag.nodes["a"].state, 'failed')
+        self.assertEqual(self.dag.nodes["b"].state, 'skipped')
+    
+    def test_failure_policies(self):
+        """
+        测试continue和skip_descendants策略：独立分支继续执行，失败节点的下游被跳过
+        """
+        def fail(*args, **kwargs):
+            raise KeyError("boom")
+        
+        self.dag.add_node("a", data={'func': fail})
+        self.dag.add_node("b", data={'func': step, 'args': ('b',)})
+        self.dag.add_node("c", data={'func': step, 'args': ('c',)})
+        self.dag.add_node("d", data={'func': step, 'args': ('d',)})
+        self.dag.add_edge("a", "b")
+        self.dag.add_edge("b", "c")
+        
+        for parallel in (True, False):
+            executor = DAGExecutor(self.dag, failure_policy='continue')
+            with self.assertRaises(DAGExecutionError) as ctx:
+                executor.execute(parallel=parallel)
+            report = ctx.exception.report
+            self.assertIsInstance(ctx.exception.__cause__, KeyError)
+            self.assertEqual(report['status'], 'failed')
+            self.assertEqual(report['completed'], ['d'])
+            self.assertEqual(report['failed']['a']['type'], 'KeyError')
+            self.assertEqual(report['skipped'], ['b', 'c'])
+            
+            executor = DAGExecutor(self.dag, failure_policy='skip_descendants')
+            results = executor.execute(parallel=parallel)
+            self.assertEqual(results, {'d': ['d']})
+            self.assertEqual(executor.report['status'], 'partial')
+            self.assertEqual(self.dag.nodes["c"].state, 'skipped')
+        
+        with self.assertRaises(ValueError):
+            DAGExecutor(self.dag, failure_policy='ignore')
+    
+    def test_fail_fast_cancels_running_and_queued_nodes(self):
+        """
+        测试fail_fast策略：失败后不再调度新节点，运行中的节点通过cancel_event收到取消信号
+        """
+        seen = {}
+        
+        def slow(cancel_event=None):
+            seen['cancelled'] = cancel_event.wait(5)
+        
+        def fail():
+            time.sleep(0.02)
+            raise RuntimeError("boom")
+        
+        self.dag.add_node("slow", data={'func': slow, 'kwargs': {'cancel_event': None}})
+        self.dag.add_node("fail", data={'func': fail})
+        self.dag.add_node("queued", data={'func': step, 'args': ('queued',)})
+        
+        executor = DAGExecutor(self.dag, max_workers=2)
+        start = time.perf_counter()
+        with self.assertRaises(DAGExecutionError) as ctx:
+            executor.execute(parallel=True)
+        
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(ctx.exception.report['failed']['fail']['message'], 'boom')
+        self.assertIn('queued', ctx.exception.report['cancelled'])
+        self.assertEqual(self.dag.nodes["queued"].state, 'cancelled')
+        executor.shutdown()
+        self.assertTrue(seen['cancelled'])
+    
+    def test_cancel_from_another_thread(self):
+        """
+        测试从其他线程调用cancel()时执行立即停止并报告被取消的节点
+        """
+        def wait(cancel_event=None):
+            cancel_event.wait(5)
+        
+        self.dag.add_node("wait", data={'func': wait, 'kwargs': {'cancel_event': None}})
+        self.dag.add_node("after", data={'func': step, 'args': ('after',)})
+        self.dag.add_edge("wait", "after")
+        
+        executor = DAGExecutor(self.dag)
+        threading.Timer(0.05, executor.cancel).start()
+        start = time.perf_counter()
+        with self.assertRaises(DAGExecutionError) as ctx:
+            executor.execute(parallel=True)
+        
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(ctx.exception.report['status'], 'cancelled')
+        self.assertIn('after', ctx.exception.report['cancelled'])
+    
+    def test_retries_with_backoff(self):
+        """
+        测试节点失败后按退避时间重试，等待重试时不占用工作线程
+        """
+        self.dag.add_node("flaky", data={'func': flaky, 'args': ('flaky', 2),
+                                         'retries': 2, 'backoff': 0.1, 'jitter': False})
+        self.dag.add_node("other", data={'func': step, 'args': ('other',)})
+        
+        executor = DAGExecutor(self.dag, max_workers=1)
+        results = executor.execute(parallel=True)
+        
+        self.assertEqual(results["flaky"], 'flaky')
+        self.assertEqual(executor.report['retried'], {'flaky': 2})
+        # 唯一的工作线程在flaky退避期间执行了other
+        self.assertEqual(CALLS, ['flaky', 'other', 'flaky', 'flaky'])
+        
+        CALLS.clear()
+        executor = DAGExecutor(self.dag)
+        self.assertEqual(executor.execute(parallel=False)["flaky"], 'flaky')
+        self.assertEqual(executor.report['retried'], {'flaky': 2})
+        
+        # 重试次数用尽后抛出最后一次的异常
+        CALLS.clear()
+        self.dag.nodes["flaky"].data['retries'] = 1
+        with self.assertRaises(DAGExecutionError) as ctx:
+            DAGExecutor(self.dag).execute(parallel=True)
+        self.assertIsInstance(ctx.exception.errors["flaky"], ConnectionError)
+    
+    def test_timeout_bounds_latency(self):
+        """
+        测试超时的尝试按失败处理并重试，迟到的结果被丢弃
+        """
+        self.dag.add_node("slow", data={'func': flaky, 'args': ('slow', 1, 0.5),
+                                        'timeout': 0.05, 'retries': 1, 'backoff': 0})
+        
+        for parallel in (True, False):
+            CALLS.clear()
+            start = time.perf_counter()
+            executor = DAGExecutor(self.dag)
+            self.assertEqual(executor.execute(parallel=parallel)["slow"], 'slow')
+            self.assertLess(time.perf_counter() - start, 0.4)
+            self.assertEqual(executor.report['retried'], {'slow': 1})
+        
+        CALLS.clear()
+        self.dag.nodes["slow"].data['retries'] = 0
+        start = time.perf_counter()
+        with self.assertRaises(DAGExecutionError) as ctx:
+            DAGExecutor(self.dag).execute(parallel=True)
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertIsInstance(ctx.exception.errors["slow"], NodeTimeoutError)
+    
+    def test_timeout_excludes_queue_wait(self):
+        """
+        测试共享线程池饱和时，节点在池中排队的时间不计入超时
+        """
+        def slow():
+            time.sleep(0.1)
+            return 'done'
+        
+        for parallel in (True, False):
+            errors = []
+            
+            def run(pool):
+                dag = DAG()
+                dag.add_node("slow", data={'func': slow, 'timeout': 0.2})
+                try:
+                    DAGExecutor(dag, pool=pool).execute(parallel=parallel)
+                except DAGExecutionError as e:
+                    errors.append(e)
+            
+            with WorkerPool(max_workers=1) as pool:
+                threads = [threading.Thread(target=run, args=(pool,)) for _ in range(4)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            
+            self.assertEqual(errors, [])
+    
+    def test_retry_settings(self):
+        """
+        测试超时与重试设置的读取、校验和指数退避
+        """
+        settings = get_retry_settings({'retries': 5, 'backoff': 0.5, 'max_backoff': 3, 'jitter': False})
+        self.assertIsNone(settings.timeout)
+        self.assertEqual([backoff_delay(settings, n) for n in range(1, 5)], [0.5, 1.0, 2.0, 3.0])
+        
+        settings = settings._replace(jitter=True)
+        for n in range(1, 5):
+            self.assertLessEqual(backoff_delay(settings, n), 3.0)
+        
+        self.assertEqual(get_retry_settings({}).retries, 0)
+        with self.assertRaises(ValueError):
+            get_retry_settings({'timeout': 0})
+        with self.assertRaises(ValueError):
+            get_retry_settings({'retries': -1})
+    
+    def test_max_workers_bounds_concurrency(self):
+        """
+        测试max_workers限制同时运行的节点数量，子池使用各自的上限
+        """
+        lock = threading.Lock()
+        running = {'default': 0, 'io': 0}
+        peak = {'default': 0, 'io': 0}
+        
+        def track(pool_name):
+            def task(*args, **kwargs):
+                with lock:
+                    running[pool_name] += 1
+                    peak[pool_name] = max(peak[pool_name], running[pool_name])
+                time.sleep(0.01)
+                with lock:
+                    running[pool_name] -= 1
+            return task
+        
+        for i in range(12):
+            self.dag.add_node(f"cpu{i}", data={'func': track('default')})
+            self.dag.add_node(f"io{i}", data={'func': track('io'), 'pool': 'io'})
+        
+        with WorkerPool(max_workers=2, limits={'io': 4}) as pool:
+            DAGExecutor(self.dag, pool=pool).execute(parallel=True)
+            # 同一个线程池可以被多个执行器复用
+            DAGExecutor(self.dag, pool=pool).execute(parallel=True)
+        
+        self.assertLessEqual(peak['default'], 2)
+        self.assertLessEqual(peak['io'], 4)
+    
+    def test_backends_per_dag_and_per_node(self):
+        """
+        测试执行后端可以按DAG设置并被节点数据覆盖，进程后端的结果写回父进程
+        """
+        self.dag.add_node("a", data={'func': lambda: 3, 'backend': 'inline'})
+        self.dag.add_node("b", data={'func': square, 'args': (None,), 'backend': 'process'})
+        self.dag.add_node("c", data={'func': lambda x: x + 1, 'args': (None,)})
+        self.dag.add_edge("a", "b")
+        self.dag.add_edge("b", "c")
+        
+        with WorkerPool(max_workers=2, max_processes=1) as pool:
+            results = DAGExecutor(self.dag, pool=pool, backend='thread').execute(parallel=True)
+        
+        self.assertEqual(results, {"a": 3, "b": 9, "c": 10})
+        self.assertEqual(self.dag.nodes["b"].state, 'completed')
+    
+    def test_process_backend_does_not_receive_cancel_event(self):
+        """
+        测试进程后端的节点不注入无法pickle的取消信号，保留声明的参数值
+        """
+        self.dag.add_node("a", data={'func': cancel_aware, 'args': (3,), 'kwargs': {'cancel_event': None},
+                                     'backend': 'process'})
+        
+        with WorkerPool(max_workers=1, max_processes=1) as pool:
+            results = DAGExecutor(self.dag, pool=pool).execute(parallel=True)
+        
+        self.assertEqual(results["a"], (3, None))
+    
+    def test_incremental_reruns_only_downstream_of_changes(self):
+        """
+        测试增量执行只重新执行输入变化的节点及其下游节点
+        """
+        self.dag.add_node("collect", data={'func': step, 'args': ("collect", "q")})
+        self.dag.add_node("report", data={'func': step, 'args': ("report", None)})
+        self.dag.add_node("email", data={'func': step, 'args': ("email", None, "a@example.com")})
+        self.dag.add_node("save", data={'func': step, 'args': ("save", None)})
+        self.dag.add_edge("collect", "report")
+        self.dag.add_edge("report", "email")
+        self.dag.add_edge("collect", "save")
+        
+        executor = DAGExecutor(self.dag)
+        executor.execute(parallel=True)
+        self.assertEqual(sorted(CALLS), ["collect", "email", "report", "save"])
+        
+        # 只修改收件人，只有发送邮件节点重新执行
+        CALLS.clear()
+        self.dag.nodes["email"].data['args'] = ("email", None, "b@example.com")
+        results = executor.execute(parallel=True, incremental=True)
+        self.assertEqual(CALLS, ["email"])
+        self.assertEqual(results["email"][-1], "b@example.com")
+        self.assertEqual(set(results), {"collect", "report", "email", "save"})
+        
+        # 显式标记的节点及其下游重新执行
+        CALLS.clear()
+        executor.invalidate(["report"])
+        executor.execute(parallel=False, incremental=True)
+        self.assertEqual(CALLS, ["report", "email"])
+    
+    def test_critical_path_scheduling(self):
+        """
+        测试就绪节点多于工作线程时优先执行关键路径上的节点，并记录历史耗时
+        """
+        self.dag.add_node("short", data={'func': step, 'args': ("short",), 'estimated_duration': 1})
+        self.dag.add_node("long1", data={'func': step, 'args': ("long1",), 'estimated_duration': 1})
+        self.dag.add_node("long2", data={'func': step, 'args': ("long2", None), 'estimated_duration': 5})
+        self.dag.add_edge("long1", "long2")
+        
+        ranks = upward_ranks(self.dag, {"short": 1, "long1": 1, "long2": 5})
+        self.assertEqual(ranks, {"short": 1, "long1": 6, "long2": 5})
+        
+        history = DurationHistory()
+        DAGExecutor(self.dag, max_workers=1, scheduling='critical_path', history=history).execute(parallel=True)
+        self.assertEqual(CALLS, ["long1", "long2", "short"])
+        self.assertEqual(len(history), 3)
+        
+        CALLS.clear()
+        DAGExecutor(self.dag, max_workers=1, scheduling='fifo').execute(parallel=True)
+        self.assertEqual(CALLS, ["short", "long1", "long2"])
+    
+    def test_trace_records_nodes_and_exports_chrome_trace(self):
+        """
+        测试执行追踪记录每个节点并导出为Chrome Trace Event JSON
+        """
+        self.dag.add_node("a", data={'func': step, 'args': ("a",)})
+        self.dag.add_node("b", data={'func': step, 'args': ("b", None)})
+        self.dag.add_edge("a", "b")
+        
+        executor = DAGExecutor(self.dag, trace=True)
+        executor.execute(parallel=True)
+        
+        summary = executor.trace.summary()
+        self.assertEqual([row['node_id'] for row in summary], ["a", "b"])
+        self.assertTrue(all(row['queue_wait'] >= 0 and row['duration'] >= 0 for row in summary))
+        self.assertTrue(all(row['thread'].startswith('dag-worker') for row in summary))
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = executor.trace.export_chrome_trace(os.path.join(directory, "trace.json"))
+            with open(path, encoding='utf-8') as f:
+                events = json.load(f)['traceEvents']
+        
+        spans = [event for event in events if event['ph'] == 'X' and event['cat'] == 'completed']
+        self.assertEqual(sorted(event['name'] for event in spans), ["a", "b"])
+        self.assertTrue(any(event['ph'] == 'M' for event in events))
+    
+    def test_structured_events(self):
+        """
+        测试执行事件通过后台队列分发到事件接收器，并支持级别过滤和静默模式
+        """
+        def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+        
+        self.dag.add_node("a", data={'func': step, 'args': ("a",)})
+        self.dag.add_node("b", data={'func': fail, 'args': (None,)})
+        self.dag.add_edge("a", "b")
+        
+        sink = ListSink()
+        events = EventDispatcher(sinks=[sink])
+        with self.assertRaises(RuntimeError):
+            DAGExecutor(self.dag, events=events).execute(parallel=True)
+        self.assertTrue(events.flush(timeout=1))
+        
+        kinds = [(event.kind, event.node_id) for event in sink.events]
+        self.assertIn(('node_started', 'a'), kinds)
+        self.assertIn(('node_completed', 'a'), kinds)
+        self.assertIn(('node_failed', 'b'), kinds)
+        self.assertEqual(sink.events[kinds.index(('node_completed', 'a'))].data['result'], ["a"])
+        self.assertEqual(sink.events[kinds.index(('node_failed', 'b'))].format(), "节点 b 执行失败: boom")
+        
+        # 只保留错误事件
+        sink.events.clear()
+        events.set_level('error')
+        with self.assertRaises(RuntimeError):
+            DAGExecutor(self.dag, events=events).execute(parallel=False)
+        events.flush(timeout=1)
+        self.assertEqual([event.kind for event in sink.events], ['node_failed'])
+        
+        # 静默模式
+        sink.events.clear()
+        events.set_level('silent')
+        DAGExecutor(DAG(), events=events).execute()
+        events.flush(timeout=1)
+        self.assertEqual(sink.events, [])
+    
+    @unittest.skipUnless(hasattr(os, 'fork'), "需要 os.fork")
+    def test_events_after_fork(self):
+        """
+        测试后台线程启动后 fork 的子进程（如进程后端的工作进程）发出的事件仍能被分发
+        """
+        read_fd, write_fd = os.pipe()
+        events = EventDispatcher(sinks=[lambda event: os.write(write_fd, event.format().encode() + b'\n')])
+        events.emit('task_message', message='parent')
+        self.assertTrue(events.flush(timeout=1))
+        
+        pid = os.fork()
+        if pid == 0:
+            try:
+                events.emit('task_message', message='child')
+                os._exit(0 if events.flush(timeout=1) else 1)
+            finally:
+                os._exit(2)
+        _, status = os.waitpid(pid, 0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as f:
+            lines = f.read().decode().splitlines()
+        
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(lines, ['parent', 'child'])
+    
+    def test_unknown_backend(self):
+        """
+        测试不支持的执行后端
+        """
+        with self.assertRaises(ValueError):
+            DAGExecutor(self.dag, backend='gpu')
+
+if __name__ == "__main__":
+    unittest.main()
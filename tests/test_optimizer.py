@@ -0,0 +1,99 @@
+import unittest
+from src.dag.dag import DAG
+from src.dag.executor import DAGExecutor
+from src.dag.optimizer import eliminate_common_subexpressions
+from tests.recorder import CALLS, reset, step
+
+
+def combine(left, right):
+    """
+    按参数顺序组合两个依赖结果的任务函数
+    """
+    return ('combine', left, right)
+
+class TestOptimizer(unittest.TestCase):
+    """
+    公共子表达式消除测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        reset()
+        self.dag = DAG()
+    
+    def _add_chain(self, prefix, query, final):
+        self.dag.add_node(f"{prefix}load", data={'func': step, 'args': ('load', query)})
+        self.dag.add_node(f"{prefix}clean", data={'func': step, 'args': ('clean', None)})
+        self.dag.add_node(f"{prefix}{final}", data={'func': step, 'args': (final, None)})
+        self.dag.add_edge(f"{prefix}load", f"{prefix}clean")
+        self.dag.add_edge(f"{prefix}clean", f"{prefix}{final}")
+    
+    def test_merges_identical_chains(self):
+        """
+        测试相同的上游链被合并为一条，不同的下游节点共享其结果
+        """
+        self._add_chain("a/", 'sales', 'report')
+        self._add_chain("b/", 'sales', 'email')
+        self._add_chain("c/", 'users', 'report')
+        
+        aliases = eliminate_common_subexpressions(self.dag)
+        
+        self.assertEqual(aliases, {'b/load': 'a/load', 'b/clean': 'a/clean'})
+        self.assertEqual(list(self.dag.nodes['a/clean'].dependents), ['a/report', 'b/email'])
+        self.assertEqual(list(self.dag.nodes['b/email'].dependencies), ['a/clean'])
+        self.assertEqual(self.dag.get_edge('a/clean', 'b/email').source, 'a/clean')
+        
+        results = DAGExecutor(self.dag).execute()
+        self.assertEqual(CALLS.count('load'), 2)
+        self.assertEqual(CALLS.count('clean'), 2)
+        self.assertEqual(results['b/email'], ['email', ['clean', ['load', 'sales']]])
+    
+    def test_preserves_dependency_order(self):
+        """
+        测试重定向后后置节点的依赖顺序不变，依赖结果仍按原顺序填入参数
+        """
+        self.dag.add_node("x1", data={'func': step, 'args': ('x',)})
+        self.dag.add_node("y", data={'func': step, 'args': ('y',)})
+        self.dag.add_node("x2", data={'func': step, 'args': ('x',)})
+        self.dag.add_node("out", data={'func': combine, 'args': (None, None)})
+        self.dag.add_edge("x2", "out")
+        self.dag.add_edge("y", "out")
+        
+        self.assertEqual(eliminate_common_subexpressions(self.dag), {'x2': 'x1'})
+        self.assertEqual(list(self.dag.nodes['out'].dependencies), ['x1', 'y'])
+        self.assertEqual(DAGExecutor(self.dag).execute()['out'], ('combine', ['x'], ['y']))
+    
+    def test_execution_settings_prevent_merge(self):
+        """
+        测试任务函数和参数相同、但超时、执行后端等设置不同的节点不被合并
+        """
+        self.dag.add_node("x1", data={'func': step, 'args': ('x',), 'timeout': 1})
+        self.dag.add_node("x2", data={'func': step, 'args': ('x',), 'timeout': 5})
+        self.dag.add_node("x3", data={'func': step, 'args': ('x',), 'timeout': 5})
+        self.dag.add_node("x4", data={'func': step, 'args': ('x',), 'timeout': 5, 'backend': 'inline'})
+        
+        self.assertEqual(eliminate_common_subexpressions(self.dag), {'x3': 'x2'})
+        self.assertEqual(self.dag.nodes['x1'].data['timeout'], 1)
+    
+    def test_opt_out_and_shared_dependents(self):
+        """
+        测试 'cse': False 的节点和被同一后置节点同时依赖的相同节点不被合并
+        """
+        self.dag.add_node("send1", data={'func': step, 'args': ('send',), 'cse': False})
+        self.dag.add_node("send2", data={'func': step, 'args': ('send',), 'cse': False})
+        self.dag.add_node("x1", data={'func': step, 'args': ('x',)})
+        self.dag.add_node("x2", data={'func': step, 'args': ('x',)})
+        self.dag.add_node("out", data={'func': combine, 'args': (None, None)})
+        self.dag.add_edge("x1", "out")
+        self.dag.add_edge("x2", "out")
+        
+        self.assertEqual(eliminate_common_subexpressions(self.dag), {})
+        self.assertEqual(len(self.dag.nodes), 5)
+        
+        with self.assertRaises(ValueError):
+            self.dag.redirect_dependents("x2", "x1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import threading
+import unittest
+from src.agent.registry import TemplateRegistry
+from src.agent.tasks import TaskLibrary
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    """
+    写时复制模板注册表测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.registry = TemplateRegistry({
+            'default': {
+                'collect_data': {'delay': 1, 'sources': ['数据库', 'API']},
+                'send_email': {'delay': 1}
+            }
+        })
+    
+    def test_snapshots_are_immutable(self):
+        """
+        测试快照只读，修改模板时旧快照保持不变，未修改的任务配置被共享
+        """
+        before = self.registry.snapshot
+        
+        with self.assertRaises(TypeError):
+            before['default']['collect_data']['delay'] = 5
+        self.assertEqual(before['default']['collect_data']['sources'], ('数据库', 'API'))
+        
+        self.assertTrue(self.registry.update_task('default', 'collect_data', {'delay': 5}))
+        after = self.registry.snapshot
+        
+        self.assertEqual(self.registry.version, 1)
+        self.assertEqual(before['default']['collect_data']['delay'], 1)
+        self.assertEqual(after['default']['collect_data']['delay'], 5)
+        self.assertIs(before['default']['send_email'], after['default']['send_email'])
+    
+    def test_write_operations(self):
+        """
+        测试注册、复制、删除模板和导出可修改副本
+        """
+        template = {'collect_data': {'delay': 2}}
+        self.registry.set('custom', template)
+        template['collect_data']['delay'] = 9
+        self.assertEqual(self.registry.get('custom')['collect_data']['delay'], 2)
+        
+        self.assertTrue(self.registry.copy('custom', 'copied'))
+        self.assertFalse(self.registry.copy('missing', 'other'))
+        self.assertIs(self.registry.get('copied'), self.registry.get('custom'))
+        
+        self.assertTrue(self.registry.delete('custom'))
+        self.assertFalse(self.registry.delete('custom'))
+        self.assertFalse(self.registry.update_task('custom', 'collect_data', {}))
+        self.assertEqual(self.registry.names(), ['default', 'copied'])
+        self.assertEqual(self.registry.version, 3)
+        
+        exported = self.registry.thaw('default')
+        exported['send_email']['delay'] = 3
+        self.assertEqual(json.loads(json.dumps(exported))['collect_data']['sources'], ['数据库', 'API'])
+        self.assertEqual(self.registry.get('default')['send_email']['delay'], 1)
+    
+    def test_concurrent_updates(self):
+        """
+        测试并发写入不丢失更新，读者始终看到完整的模板
+        """
+        errors = []
+        stop = threading.Event()
+        
+        def reader():
+            while not stop.is_set():
+                config = self.registry.get('default')['collect_data']
+                if config.get('a') != config.get('b'):
+                    errors.append(dict(config))
+        
+        def writer(task_name):
+            for i in range(200):
+                self.registry.update_task('default', task_name, {'a': i, 'b': i})
+        
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in readers:
+            thread.start()
+        writers = [threading.Thread(target=writer, args=(name,)) for name in ('collect_data', 'send_email')]
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(self.registry.version, 400)
+        template = self.registry.get('default')
+        self.assertEqual(template['collect_data']['a'], 199)
+        self.assertEqual(template['send_email']['a'], 199)
+    
+    def test_task_library_uses_registry(self):
+        """
+        测试TaskLibrary的模板修改通过注册表原子替换
+        """
+        self.assertTrue(TaskLibrary.copy_template('default', 'registry_test'))
+        try:
+            previous = TaskLibrary.get_task_config('collect_data', 'registry_test')
+            version = TaskLibrary.templates.version
+            
+            self.assertTrue(TaskLibrary.update_task_config('registry_test', 'collect_data', {'delay': 0}))
+            
+            self.assertEqual(TaskLibrary.get_task_config('collect_data', 'registry_test')['delay'], 0)
+            self.assertEqual(previous['delay'], TaskLibrary.get_task_config('collect_data')['delay'])
+            self.assertEqual(TaskLibrary.templates.version, version + 1)
+        finally:
+            TaskLibrary.delete_template('registry_test')
+
+if __name__ == "__main__":
+    unittest.main()
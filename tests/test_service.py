@@ -0,0 +1,255 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from src.agent.service import AgentService
+
+
+class FakeAgent:
+    """
+    模拟AIAgent的最小实现，release 未置位时阻塞执行
+    """
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.batches = []
+    
+    def process_request(self, request):
+        self.release.wait(5)
+        if request.get('type') == 'bad':
+            raise ValueError(f"不支持的请求类型: {request['type']}")
+        if request.get('type') == 'fail':
+            raise RuntimeError("DAG执行失败: 1 个节点失败")
+        return {'request': request, 'final_result': request.get('params', {}).get('x'), 'errors': {}}
+    
+    def process_batch(self, requests):
+        self.batches.append(len(requests))
+        if any(request.get('type') == 'bad' for request in requests):
+            raise ValueError("不支持的请求类型: bad")
+        
+        outputs = []
+        for request in requests:
+            if request.get('type') == 'fail':
+                # 批量执行中节点失败不抛出异常，错误记录在该请求的 errors 中
+                errors = {'analyze': {'type': 'RuntimeError', 'message': '分析失败'}}
+                outputs.append({'request': request, 'results': {}, 'final_result': None, 'errors': errors})
+            else:
+                outputs.append(self.process_request(request))
+        return outputs
+
+
+async def http(reader, writer, method, path, body=None):
+    """
+    在已有连接上发送一个HTTP/1.1请求并读取JSON响应
+    """
+    payload = b'' if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    await writer.drain()
+    
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode().partition(':')
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers['content-length']))
+    return status, json.loads(data)
+
+
+async def call(address, method, path, body=None):
+    """
+    新建连接发送一个请求
+    """
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address[:2])
+    try:
+        return await http(reader, writer, method, path, body)
+    finally:
+        writer.close()
+
+class TestAgentService(unittest.TestCase):
+    """
+    常驻服务测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.agent = FakeAgent()
+    
+    def run_service(self, scenario, **kwargs):
+        async def main():
+            service = AgentService(self.agent, **kwargs)
+            await service.start(port=0)
+            try:
+                return await scenario(service, service.addresses[0])
+            finally:
+                await service.stop()
+        return asyncio.run(main())
+    
+    def test_requests_and_keep_alive(self):
+        """
+        测试在同一个连接上连续提交请求、查询状态和健康检查
+        """
+        async def scenario(service, address):
+            reader, writer = await asyncio.open_connection(*address[:2])
+            responses = [
+                await http(reader, writer, 'GET', '/health'),
+                await http(reader, writer, 'POST', '/requests', {'type': 'ok', 'params': {'x': 1}}),
+                await http(reader, writer, 'POST', '/requests', {'type': 'bad'}),
+                await http(reader, writer, 'POST', '/requests', b'{not json'),
+                await http(reader, writer, 'GET', '/missing'),
+                await http(reader, writer, 'GET', '/stats')
+            ]
+            writer.close()
+            return responses
+        
+        health, ok, bad, invalid, missing, stats = self.run_service(scenario)
+        
+        self.assertEqual(health, (200, {'status': 'ok'}))
+        self.assertEqual(ok[0], 200)
+        self.assertEqual(ok[1]['final_result'], 1)
+        self.assertIn('latency', ok[1])
+        self.assertEqual(bad[0], 400)
+        self.assertEqual(invalid[0], 400)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(stats[1]['completed'], 1)
+        self.assertEqual(stats[1]['failed'], 1)
+        self.assertEqual(stats[1]['queue_depth'], 0)
+    
+    def test_backpressure_and_batching(self):
+        """
+        测试队列满时立即返回503，排队的请求合并为一个批次执行
+        """
+        self.agent.release.clear()
+        
+        async def scenario(service, address):
+            first = asyncio.ensure_future(call(address, 'POST', '/requests', {'params': {'x': 0}}))
+            while service.get_stats()['in_flight'] == 0:
+                await asyncio.sleep(0.01)
+            
+            queued = [
+                asyncio.ensure_future(call(address, 'POST', '/requests', {'params': {'x': i}}))
+                for i in (1, 2)
+            ]
+            while service.queue_depth < 2:
+                await asyncio.sleep(0.01)
+            
+            rejected = await call(address, 'POST', '/requests', {'params': {'x': 3}})
+            stats = (await call(address, 'GET', '/stats'))[1]
+            self.agent.release.set()
+            return rejected, stats, await first, await asyncio.gather(*queued)
+        
+        rejected, stats, first, queued = self.run_service(scenario, max_queue=2, concurrency=1)
+        
+        self.assertEqual(rejected[0], 503)
+        self.assertEqual(stats['queue_depth'], 2)
+        self.assertEqual(stats['in_flight'], 1)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(first[1]['final_result'], 0)
+        self.assertEqual([response[1]['final_result'] for response in queued], [1, 2])
+        self.assertEqual(self.agent.batches, [2])
+    
+    def test_failed_request_status_does_not_depend_on_batching(self):
+        """
+        测试节点失败的请求无论单独执行还是合并执行都返回500
+        """
+        self.agent.release.clear()
+        
+        async def scenario(service, address):
+            first = asyncio.ensure_future(call(address, 'POST', '/requests', {'params': {'x': 0}}))
+            while service.get_stats()['in_flight'] == 0:
+                await asyncio.sleep(0.01)
+            
+            queued = [
+                asyncio.ensure_future(call(address, 'POST', '/requests', body))
+                for body in ({'params': {'x': 1}}, {'type': 'fail'})
+            ]
+            while service.queue_depth < 2:
+                await asyncio.sleep(0.01)
+            self.agent.release.set()
+            await first
+            batched = await asyncio.gather(*queued)
+            alone = await call(address, 'POST', '/requests', {'type': 'fail'})
+            return batched, alone
+        
+        (ok, batched_failure), alone = self.run_service(scenario, concurrency=1)
+        
+        self.assertEqual(self.agent.batches, [2])
+        self.assertEqual(ok[0], 200)
+        self.assertEqual(batched_failure[0], 500)
+        self.assertEqual(alone[0], 500)
+        self.assertIn('DAGExecutionError', batched_failure[1]['error'])
+    
+    def test_invalid_content_length(self):
+        """
+        测试非整数或负数的 Content-Length 返回400并关闭连接
+        """
+        async def scenario(service, address):
+            responses = []
+            for value in ('abc', '-1'):
+                reader, writer = await asyncio.open_connection(*address[:2])
+                writer.write(f"POST /requests HTTP/1.1\r\nContent-Length: {value}\r\n\r\n".encode())
+                await writer.drain()
+                responses.append((await reader.read()).split(b'\r\n', 1)[0])
+                writer.close()
+            return responses, (await call(address, 'GET', '/health'))[0]
+        
+        responses, health = self.run_service(scenario)
+        
+        self.assertEqual(responses, [b'HTTP/1.1 400 Bad Request'] * 2)
+        self.assertEqual(health, 200)
+    
+    def test_stop_does_not_block_event_loop(self):
+        """
+        测试停止服务时等待正在执行的批次，期间事件循环上的其他协程照常运行
+        """
+        self.agent.release.clear()
+        
+        async def main():
+            service = AgentService(self.agent, concurrency=1)
+            await service.start(port=0)
+            request = asyncio.ensure_future(call(service.addresses[0], 'POST', '/requests', {'params': {'x': 1}}))
+            while service.get_stats()['in_flight'] == 0:
+                await asyncio.sleep(0.01)
+            
+            stopping = asyncio.ensure_future(service.stop())
+            await asyncio.sleep(0.05)
+            waiting = not stopping.done()
+            self.agent.release.set()
+            await stopping
+            await asyncio.gather(request, return_exceptions=True)
+            return waiting
+        
+        self.assertTrue(asyncio.run(main()))
+    
+    def test_unix_socket(self):
+        """
+        测试通过Unix socket访问服务
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'agent.sock')
+            
+            async def main():
+                service = AgentService(self.agent)
+                await service.start(port=None, unix_socket=path)
+                try:
+                    return await call(path, 'POST', '/requests', {'params': {'x': 7}})
+                finally:
+                    await service.stop()
+            
+            status, output = asyncio.run(main())
+        
+        self.assertEqual(status, 200)
+        self.assertEqual(output['final_result'], 7)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import json
+import os
+import tempfile
+import unittest
+from src.agent.agent import AIAgent
+from src.agent.task_config import TASK_DEFAULTS, resolve_template
+from src.agent.tasks import TaskLibrary
+
+
+class TestTaskConfig(unittest.TestCase):
+    """
+    模板继承与解析后任务配置的测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.templates = {
+            'base': {
+                'collect_data': {'delay': 2, 'sources': ['API', '文件系统'], 'timeout': 5},
+                'send_email': {'default_subject': '周报'}
+            },
+            'child': {
+                'collect_data': {'delay': 0.5}
+            }
+        }
+        self.parents = {'child': 'base'}
+    
+    def tearDown(self):
+        """
+        测试后的清理工作
+        """
+        for name in ('config_child', 'config_broken', 'config_parent'):
+            TaskLibrary.delete_template(name)
+    
+    def test_inheritance_is_flattened(self):
+        """
+        测试子模板按配置项覆盖父模板，未设置的项沿用父模板或默认值
+        """
+        configs = resolve_template('child', self.templates, self.parents)
+        
+        self.assertEqual(set(configs), set(TASK_DEFAULTS))
+        self.assertEqual(configs['collect_data'].delay, 0.5)
+        self.assertEqual(configs['collect_data'].sources, ('API', '文件系统'))
+        self.assertEqual(configs['collect_data'].retry_settings(), {'timeout': 5})
+        self.assertEqual(configs['send_email'].default_subject, '周报')
+        self.assertEqual(configs['clean_data'].max_duplicates, TASK_DEFAULTS['clean_data']['max_duplicates'])
+    
+    def test_invalid_templates(self):
+        """
+        测试未知任务、未知配置项、类型错误、范围错误和继承错误都在解析时报告
+        """
+        cases = [
+            {'child': {'unknown_task': {}}},
+            {'child': {'collect_data': {'dealy': 1}}},
+            {'child': {'collect_data': {'delay': '1'}}},
+            {'child': {'clean_data': {'max_duplicates': 1.5}}},
+            {'child': {'analyze_data': {'min_insights': 9, 'max_insights': 3}}},
+            {'child': {'learn_agent_architecture': {'components': ['感知模块']}}},
+            {'child': {'send_email': {'retries': -1}}},
+            {'base': None}
+        ]
+        for case in cases:
+            templates = {**self.templates, **case}
+            if templates['base'] is None:
+                del templates['base']
+            with self.subTest(case=case), self.assertRaises(ValueError):
+                resolve_template('child', templates, self.parents)
+        
+        with self.assertRaises(ValueError):
+            resolve_template('base', self.templates, {'child': 'base', 'base': 'child'})
+    
+    def test_builtin_templates_resolve(self):
+        """
+        测试所有内置模板和模板目录中的模板都能解析
+        """
+        templates_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
+        for file_name in os.listdir(templates_dir):
+            if file_name.endswith('.json'):
+                with open(os.path.join(templates_dir, file_name), 'rb') as f:
+                    data = json.loads(f.read().decode('utf-8'))
+                with self.subTest(file=file_name):
+                    resolve_template(data['name'], {data['name']: data['tasks']}, {})
+        for name in TaskLibrary.get_all_templates():
+            for task_name in TASK_DEFAULTS:
+                with self.subTest(template=name, task=task_name):
+                    TaskLibrary.get_resolved_config(task_name, name)
+    
+    def test_resolved_lookup(self):
+        """
+        测试解析结果按版本号缓存，修改模板后失效，未知模板不再回退到default
+        """
+        TaskLibrary.register_template('config_parent', {'send_email': {'delay': 0.1, 'retries': 2}})
+        TaskLibrary.register_template('config_child', {'save_to_database': {}}, extends='config_parent')
+        
+        config = TaskLibrary.get_resolved_config('send_email', 'config_child')
+        self.assertEqual((config.delay, config.retries), (0.1, 2))
+        self.assertIs(TaskLibrary.get_resolved_config('send_email', 'config_child'), config)
+        self.assertEqual(TaskLibrary.get_template_info('config_child')['extends'], 'config_parent')
+        
+        self.assertTrue(TaskLibrary.update_task_config('config_parent', 'send_email', {'delay': 0.2}))
+        self.assertEqual(TaskLibrary.get_resolved_config('send_email', 'config_child').delay, 0.2)
+        
+        with self.assertRaises(ValueError):
+            TaskLibrary.update_task_config('config_parent', 'send_email', {'delay': 'slow'})
+        with self.assertRaises(ValueError):
+            TaskLibrary.register_template('config_broken', {}, extends='missing')
+        with self.assertRaises(ValueError):
+            TaskLibrary.get_resolved_config('send_email', 'config_broken')
+        self.assertEqual(TaskLibrary.get_task_config('send_email', 'config_broken'), TaskLibrary.get_task_config('send_email'))
+    
+    def test_inherited_template_cannot_be_deleted(self):
+        """
+        测试被继承的父模板不能删除，子模板删除后才可以删除
+        """
+        TaskLibrary.register_template('config_parent', {'collect_data': {'delay': 0.3}})
+        TaskLibrary.register_template('config_child', {}, extends='config_parent')
+        
+        self.assertFalse(TaskLibrary.delete_template('config_parent'))
+        self.assertEqual(TaskLibrary.get_resolved_config('collect_data', 'config_child').delay, 0.3)
+        self.assertTrue(TaskLibrary.delete_template('config_child'))
+        self.assertTrue(TaskLibrary.delete_template('config_parent'))
+    
+    def test_unknown_template_in_agent_requests(self):
+        """
+        测试任务不读取模板的请求类型在模板未知时沿用default模板，读取模板的请求类型报错
+        """
+        agent = AIAgent(max_workers=1)
+        try:
+            durations = {}
+            for template_name in ('config_missing', 'default'):
+                dag, _ = agent._build_dag('analyze_data', {'template_name': template_name})
+                durations[template_name] = {node_id: node.data['estimated_duration'] for node_id, node in dag.nodes.items()}
+            self.assertEqual(durations['config_missing'], durations['default'])
+            agent._build_dag('send_report', {'template_name': 'config_missing'})
+            with self.assertRaises(ValueError):
+                agent._build_dag('learn_agent_architecture', {'template_name': 'config_missing'})
+        finally:
+            agent.shutdown()
+    
+    def test_load_and_save_extends(self):
+        """
+        测试模板文件中的 extends 在加载时校验，保存时写回
+        """
+        TaskLibrary.register_template('config_parent', {'collect_data': {'delay': 0.3}})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'child.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'name': 'config_child', 'extends': 'config_parent', 'tasks': {}}, f)
+            self.assertTrue(TaskLibrary.load_template_from_file(path))
+            self.assertEqual(TaskLibrary.get_resolved_config('collect_data', 'config_child').delay, 0.3)
+            
+            saved = os.path.join(tmp, 'saved', 'child.json')
+            self.assertTrue(TaskLibrary.save_template_to_file('config_child', saved))
+            with open(saved, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['extends'], 'config_parent')
+            
+            broken = os.path.join(tmp, 'broken.json')
+            with open(broken, 'w', encoding='utf-8') as f:
+                json.dump({'name': 'config_broken', 'tasks': {'clean_data': {'min_invalid': 30}}}, f)
+            self.assertFalse(TaskLibrary.load_template_from_file(broken))
+        self.assertNotIn('config_broken', TaskLibrary.get_all_templates())
+
+if __name__ == "__main__":
+    unittest.main()
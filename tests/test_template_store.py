@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.agent.tasks import TaskLibrary
+from src.agent.template_store import TemplateStore
+
+
+class TestTemplateStore(unittest.TestCase):
+    """
+    模板目录索引与热重载测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.directory = tempfile.mkdtemp()
+        self.store = TemplateStore(self.directory, TaskLibrary)
+        self.mtime = time.time_ns()
+        self.write('a.json', 'store_a', delay=1)
+        self.write('b.json', 'store_b', delay=2)
+    
+    def tearDown(self):
+        """
+        测试后的清理工作
+        """
+        self.store.stop()
+        for name in ('store_child', 'store_a', 'store_b', 'store_c'):
+            TaskLibrary.delete_template(name)
+        shutil.rmtree(self.directory)
+    
+    def write(self, file_name, template_name, delay, raw=None, extends=None):
+        path = os.path.join(self.directory, file_name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(raw if raw is not None else json.dumps({
+                'name': template_name,
+                'extends': extends,
+                'tasks': {'collect_data': {'delay': delay}}
+            }))
+        # 显式推进修改时间，避免文件系统时间精度导致两次写入的修改时间相同
+        self.mtime += 10 ** 9
+        os.utime(path, ns=(self.mtime, self.mtime))
+    
+    def delay(self, template_name):
+        return TaskLibrary.templates.get(template_name)['collect_data']['delay']
+    
+    def test_incremental_refresh(self):
+        """
+        测试只重新加载变化的文件，内容未变的文件不重新解析，删除的文件移除模板
+        """
+        result = self.store.refresh()
+        self.assertEqual((result['loaded'], result['unchanged']), (2, 0))
+        self.assertEqual(self.delay('store_a'), 1)
+        
+        result = self.store.refresh()
+        self.assertEqual((result['loaded'], result['unchanged']), (0, 2))
+        
+        version = TaskLibrary.templates.version
+        self.write('a.json', 'store_a', delay=1)
+        self.assertEqual(self.store.refresh()['unchanged'], 2)
+        self.assertEqual(TaskLibrary.templates.version, version)
+        
+        self.write('a.json', 'store_a', delay=5)
+        result = self.store.refresh()
+        self.assertEqual((result['loaded'], result['unchanged']), (1, 1))
+        self.assertEqual(self.delay('store_a'), 5)
+        
+        os.remove(os.path.join(self.directory, 'b.json'))
+        self.assertEqual(self.store.refresh()['removed'], 1)
+        self.assertNotIn('store_b', TaskLibrary.get_all_templates())
+    
+    def test_failed_and_renamed_files(self):
+        """
+        测试解析失败时保留之前的模板，文件改名模板时移除旧模板
+        """
+        self.store.refresh()
+        
+        self.write('a.json', 'store_a', delay=0, raw='{broken')
+        result = self.store.refresh()
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(self.delay('store_a'), 1)
+        self.assertEqual(self.store.refresh()['failed'], 0)
+        
+        self.write('a.json', 'store_c', delay=3)
+        self.store.refresh()
+        self.assertNotIn('store_a', TaskLibrary.get_all_templates())
+        self.assertEqual(self.delay('store_c'), 3)
+        
+        os.remove(os.path.join(self.directory, 'a.json'))
+        self.store.refresh()
+        self.assertNotIn('store_c', TaskLibrary.get_all_templates())
+    
+    def test_removed_parent_and_overridden_builtin(self):
+        """
+        测试被继承的模板在子模板移除后才移除，覆盖内置模板的文件删除后恢复内置定义
+        """
+        builtin = TaskLibrary.templates.get('fast')
+        self.write('child.json', 'store_child', delay=4, extends='store_a')
+        self.write('fast.json', 'fast', delay=9)
+        self.store.refresh()
+        self.assertEqual(self.delay('fast'), 9)
+        
+        os.remove(os.path.join(self.directory, 'a.json'))
+        os.remove(os.path.join(self.directory, 'fast.json'))
+        self.assertEqual(self.store.refresh()['removed'], 1)
+        self.assertEqual(TaskLibrary.templates.get('fast'), builtin)
+        self.assertEqual(TaskLibrary.get_resolved_config('collect_data', 'store_child').delay, 4)
+        self.assertIn('store_a', TaskLibrary.get_all_templates())
+        
+        os.remove(os.path.join(self.directory, 'child.json'))
+        self.assertEqual(self.store.refresh()['removed'], 2)
+        self.assertNotIn('store_child', TaskLibrary.get_all_templates())
+        self.assertNotIn('store_a', TaskLibrary.get_all_templates())
+    
+    def test_watcher_picks_up_changes(self):
+        """
+        测试后台监视线程在轮询间隔内加载修改后的模板
+        """
+        self.store.refresh()
+        self.store.start(interval=0.02)
+        self.assertTrue(self.store.watching)
+        
+        self.write('b.json', 'store_b', delay=7)
+        deadline = time.time() + 5
+        while self.delay('store_b') != 7 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        self.assertEqual(self.delay('store_b'), 7)
+        self.store.stop()
+        self.assertFalse(self.store.watching)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import unittest
+from src.agent.task_config import validate_template
+from src.agent.tasks import TaskLibrary
+from src.agent.workflows import compile_workflow
+from src.dag.executor import DAGExecutor
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+
+class FakeLibrary:
+    """
+    模拟任务库，任务函数直接返回调用参数
+    """
+    
+    @staticmethod
+    def collect_data(query, template_name='default'):
+        return ('collect', query, template_name)
+    
+    @staticmethod
+    def analyze_data(data, template_name='default'):
+        return ('analyze', data)
+    
+    @staticmethod
+    def send_email(report, recipient, template_name='default'):
+        return ('email', report, recipient)
+
+
+class TestWorkflows(unittest.TestCase):
+    """
+    模板工作流测试用例
+    """
+    
+    def setUp(self):
+        """
+        测试前的准备工作
+        """
+        self.spec = {
+            'params': {'recipient': 'team@example.com'},
+            'nodes': {
+                'collect': {'task': 'collect_data', 'args': ['$query']},
+                'analyze': {'task': 'analyze_data', 'args': ['@collect'], 'retries': 2},
+                'notify': {'task': 'send_email', 'args': ['@analyze', '$recipient']}
+            },
+            'edges': [['collect', 'analyze'], ['analyze', 'notify']],
+            'output': 'notify'
+        }
+        self.configs = validate_template('demo', {'collect_data': {'delay': 2.5, 'timeout': 5}}, None, {}, {})
+    
+    def tearDown(self):
+        """
+        测试后的清理工作
+        """
+        for name in ('data_analysis', 'broken_workflow'):
+            TaskLibrary.delete_template(name)
+    
+    def test_compile_and_execute(self):
+        """
+        测试工作流编译为蓝图，参数和上游结果按声明接入
+        """
+        blueprint = compile_workflow('digest', self.spec, 'demo', self.configs, FakeLibrary)
+        
+        self.assertEqual(blueprint.order, ('collect', 'analyze', 'notify'))
+        dag = blueprint.instantiate({'query': 'sales'})
+        self.assertEqual(dag.nodes['collect'].data['estimated_duration'], 2.5)
+        self.assertEqual(dag.nodes['collect'].data['timeout'], 5)
+        self.assertEqual(dag.nodes['analyze'].data['retries'], 2)
+        self.assertFalse(dag.nodes['notify'].data['cse'])
+        self.assertFalse(dag.nodes['notify'].data['cache'])
+        self.assertTrue(dag.nodes['analyze'].data['cse'])
+        self.assertTrue(dag.nodes['analyze'].data['cache'])
+        
+        results = DAGExecutor(dag).execute()
+        self.assertEqual(
+            results[blueprint.output],
+            ('email', ('analyze', ('collect', 'sales', 'demo')), 'team@example.com')
+        )
+    
+    def test_invalid_workflows(self):
+        """
+        测试未知任务、未知节点引用、边与引用不一致和环都在编译时报告
+        """
+        cases = [
+            ('nodes', 'collect', {'task': 'delete_template'}),
+            ('nodes', 'analyze', {'task': 'analyze_data', 'args': ['@missing']}),
+            ('edges', None, [['collect', 'notify']]),
+            ('nodes', 'collect', {'task': 'collect_data', 'args': ['@notify']})
+        ]
+        for field, key, value in cases:
+            spec = json.loads(json.dumps(self.spec))
+            if key is None:
+                spec[field] = value
+            else:
+                spec[field][key] = value
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                compile_workflow('digest', spec, 'demo', self.configs, FakeLibrary)
+    
+    def test_load_from_template_file(self):
+        """
+        测试加载模板文件时编译工作流，内容相同的文件复用编译结果，无效工作流导致加载失败
+        """
+        path = os.path.join(TEMPLATES_DIR, 'data_analysis.json')
+        self.assertTrue(TaskLibrary.load_template_from_file(path))
+        blueprint = TaskLibrary.get_workflow('metrics_digest', 'data_analysis')
+        self.assertEqual(blueprint.output, 'notify')
+        self.assertIs(TaskLibrary.get_workflow('metrics_digest'), blueprint)
+        
+        self.assertTrue(TaskLibrary.load_template_from_file(path))
+        self.assertIs(TaskLibrary.get_workflow('metrics_digest', 'data_analysis'), blueprint)
+        
+        # 内容变化后重新编译，并替换该模板的旧缓存条目
+        with open(path, 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+        data['workflows']['metrics_digest']['params']['query'] = '留存率'
+        cached = len(TaskLibrary._compiled_workflows)
+        for _ in range(3):
+            data['description'] += '.'
+            TaskLibrary.load_template_content(json.dumps(data).encode('utf-8'))
+        reloaded = TaskLibrary.get_workflow('metrics_digest', 'data_analysis')
+        self.assertIsNot(reloaded, blueprint)
+        self.assertEqual(len(TaskLibrary._compiled_workflows), cached)
+        self.assertIs(TaskLibrary._compiled_workflows['data_analysis'][1]['metrics_digest'], reloaded)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            broken = os.path.join(tmp, 'broken.json')
+            with open(broken, 'w', encoding='utf-8') as f:
+                json.dump({'name': 'broken_workflow', 'tasks': {}, 'workflows': {'bad': self.spec | {'output': 'x'}}}, f)
+            self.assertFalse(TaskLibrary.load_template_from_file(broken))
+        self.assertNotIn('broken_workflow', TaskLibrary.get_all_templates())
+
+if __name__ == "__main__":
+    unittest.main()